@@ -0,0 +1,166 @@
+"""
+Data augmentation on packed binary images.
+
+Images stay packed as one uint32 word per row, bit c = pixel column c
+(pack_rows()), so every transform is integer work on 28 words per image
+instead of 784 float pixels:
+
+  shift   up to max_shift pixels each way: rows move by indexing the
+          word array with zero fill, columns by << / >> on every word
+  rotate  a small angle from a fixed set; each angle has a precomputed
+          (source row, source bit) map per output pixel, gathered from
+          the words and OR-ed back into words (nearest neighbour, zero
+          fill)
+  flip    XOR with a random mask, each pixel flipped with probability p
+
+All three are vectorized over the batch. The network still needs 0/1
+pixels, so unpack_rows() runs once per batch after augmenting:
+
+    aug = Augmenter(max_shift=2, max_angle=10, flip=0.01)
+    words = pack_rows(images)                     # once
+    batch = unpack_rows(aug(words[order], rng))   # every epoch
+
+Run as a script for the throughput on the verifying set.
+"""
+
+import functools
+
+import numpy as np
+
+import bnn_profile as profile
+
+SIZE     = 28
+ROW_MASK = np.uint32((1 << SIZE) - 1)
+ANGLE_STEP = 5                # degrees between precomputed rotation maps
+
+# ---------------------------------------------------------------------------
+# Packing
+# ---------------------------------------------------------------------------
+
+def pack_rows(images):
+    """(N, 28, 28) 0/1 -> (N, 28) uint32, bit c of word r = pixel (r, c)."""
+    packed = np.packbits(np.asarray(images, dtype=np.uint8), axis=2, bitorder='little')  # (N, 28, 4)
+    return np.ascontiguousarray(packed).view('<u4')[..., 0]
+
+
+def unpack_rows(words):
+    """Inverse of pack_rows()."""
+    as_bytes = np.ascontiguousarray(words, dtype='<u4')[..., None].view(np.uint8)  # (N, 28, 4)
+    return np.unpackbits(as_bytes, axis=2, bitorder='little')[..., :SIZE]
+
+# ---------------------------------------------------------------------------
+# Transforms on packed rows
+# ---------------------------------------------------------------------------
+
+@profile.timed('augment.shift')
+def shift(words, dy, dx):
+    """Move image n down by dy[n] and right by dx[n] pixels (negative: up / left)."""
+    dy = np.asarray(dy, dtype=np.int64)[:, None]
+    dx = np.asarray(dx, dtype=np.int64)[:, None]
+    src = np.arange(SIZE) - dy                                  # (N, 28) source row
+    inside = (src >= 0) & (src < SIZE)
+    rows = np.take_along_axis(words, np.clip(src, 0, SIZE - 1), axis=1)
+    rows = np.where(inside, rows, np.uint32(0))
+    left  = np.left_shift(rows, np.maximum(dx, 0).astype(np.uint32))
+    right = np.right_shift(rows, np.maximum(-dx, 0).astype(np.uint32))
+    return np.where(dx >= 0, left, right) & ROW_MASK
+
+
+@functools.lru_cache(maxsize=None)
+def rotation_map(angle):
+    """(source row, source bit, valid) per output pixel for a rotation by angle degrees.
+
+    Each output pixel takes its nearest source pixel under the inverse
+    rotation about the image centre; valid is 0 where that falls outside.
+    """
+    theta = np.deg2rad(angle)
+    centre = (SIZE - 1) / 2
+    r, c = np.mgrid[0:SIZE, 0:SIZE].reshape(2, -1) - centre
+    src_r = np.rint(centre + r * np.cos(theta) - c * np.sin(theta)).astype(np.int64)
+    src_c = np.rint(centre + r * np.sin(theta) + c * np.cos(theta)).astype(np.int64)
+    valid = (src_r >= 0) & (src_r < SIZE) & (src_c >= 0) & (src_c < SIZE)
+    return (np.where(valid, src_r, 0), np.where(valid, src_c, 0).astype(np.uint32),
+            valid.astype(np.uint32))
+
+
+@profile.timed('augment.rotate')
+def rotate(words, angles):
+    """Rotate image n by angles[n] degrees (multiples of ANGLE_STEP)."""
+    angles = np.asarray(angles)
+    out = words.copy()
+    weights = np.uint32(1) << np.arange(SIZE, dtype=np.uint32)
+    for angle in np.unique(angles).tolist():
+        if angle == 0:
+            continue
+        sel = np.flatnonzero(angles == angle)
+        src_row, src_bit, valid = rotation_map(angle)
+        bits = (words[sel][:, src_row] >> src_bit) & valid             # (n, 784) 0/1
+        out[sel] = (bits.reshape(-1, SIZE, SIZE) * weights).sum(axis=2, dtype=np.uint32)
+    return out
+
+
+@profile.timed('augment.flip')
+def flip(words, p, rng):
+    """Flip every pixel independently with probability p."""
+    if p <= 0:
+        return words
+    return words ^ pack_rows(rng.random(words.shape + (SIZE,)) < p)
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+class Augmenter:
+    """Random shift, rotation and pixel-flip noise on pack_rows() words.
+
+    max_shift: pixels per axis, uniform in [-max_shift, max_shift]
+    max_angle: degrees, uniform over multiples of ANGLE_STEP in range
+    flip:      per-pixel flip probability
+    """
+
+    def __init__(self, max_shift=2, max_angle=10, flip=0.0):
+        self.max_shift = int(max_shift)
+        steps = int(max_angle) // ANGLE_STEP
+        self.angles = np.arange(-steps, steps + 1) * ANGLE_STEP
+        self.flip = float(flip)
+
+    def __bool__(self):
+        return bool(self.max_shift or len(self.angles) > 1 or self.flip)
+
+    def __call__(self, words, rng):
+        n = len(words)
+        if len(self.angles) > 1:
+            words = rotate(words, rng.choice(self.angles, n))
+        if self.max_shift:
+            words = shift(words, rng.integers(-self.max_shift, self.max_shift + 1, n),
+                          rng.integers(-self.max_shift, self.max_shift + 1, n))
+        return flip(words, self.flip, rng)
+
+    def images(self, words, rng):
+        """Augment and unpack to (N, 28, 28) uint8 for the network."""
+        return unpack_rows(self(words, rng))
+
+
+def main():
+    import time
+
+    import bnn_hw_model as hw
+    images = hw.load_images()
+    start = time.perf_counter()
+    words = pack_rows(images)
+    pack_secs = time.perf_counter() - start
+    assert np.array_equal(unpack_rows(words), images)
+
+    aug = Augmenter(max_shift=2, max_angle=10, flip=0.01)
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    out = aug.images(words, rng)
+    secs = time.perf_counter() - start
+    changed = np.mean(np.any(out != images, axis=(1, 2)))
+    print(f"Images     : {len(images)} (pack {pack_secs * 1000:.1f} ms)")
+    print(f"Augmented  : {100 * changed:.1f} % changed")
+    print(f"Throughput : {len(images) / secs:,.0f} images/s (shift, rotate, flip, unpack)")
+
+
+if __name__ == '__main__':
+    main()
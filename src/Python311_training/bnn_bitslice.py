@@ -0,0 +1,208 @@
+"""
+Bit-sliced inference: 64 images per uint64 word.
+
+Every feature bit is stored as one word per group of 64 images, bit k of
+the word belonging to image k of the group, so each NumPy operation below
+runs the same XNOR / popcount / threshold step for 64 images at once:
+
+  XNOR       ~(x ^ w), with w a word of all zeros or all ones per weight bit
+  popcount   a carry-save adder tree: full adders (a^b^c, majority) reduce
+             each column of equal-weight bit-planes three to two until one
+             plane per weight is left, giving the count as bit-planes
+  threshold  a bit-serial >= against the per-filter constant, LSB first
+  max-pool   an OR of four words
+
+The result is bit-identical to bnn_hw_model (and hence the RTL); run this
+file to check that on the verifying set and to see the throughput. All
+functions take the same (w1, w2, w3) tuple and thresholds as the scalar
+model; the input is sliced once, so threshold sweeps only repeat the layer
+functions.
+"""
+
+import numpy as np
+
+import bnn_hw_model as hw
+import bnn_layouts as layouts
+import bnn_profile as profile
+
+LANES = 64
+ONES  = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# ---------------------------------------------------------------------------
+# Slicing
+# ---------------------------------------------------------------------------
+
+def slice_bits(bits):
+    """(N, *shape) 0/1 -> (ceil(N/64), *shape) uint64, bit k = image 64g + k."""
+    bits = np.asarray(bits, dtype=np.uint8)
+    n, shape = bits.shape[0], bits.shape[1:]
+    groups = -(-n // LANES)
+    padded = np.zeros((groups * LANES,) + shape, dtype=np.uint8)
+    padded[:n] = bits
+    packed = np.packbits(padded.reshape(groups, LANES, -1), axis=1, bitorder='little')
+    return np.ascontiguousarray(packed.transpose(0, 2, 1)).view('<u8').reshape((groups,) + shape)
+
+
+def unslice_bits(words, n):
+    """Inverse of slice_bits(): (G, *shape) uint64 -> (n, *shape) uint8."""
+    words = np.ascontiguousarray(words, dtype='<u8')
+    groups, shape = words.shape[0], words.shape[1:]
+    lanes = np.unpackbits(words.reshape(groups, -1, 1).view(np.uint8), axis=-1, bitorder='little')
+    return lanes.transpose(0, 2, 1).reshape((groups * LANES,) + shape)[:n]
+
+
+def _weight_words(bits):
+    """0/1 weights -> words of all zeros / all ones."""
+    return np.where(np.asarray(bits, dtype=bool), ONES, np.uint64(0))
+
+# ---------------------------------------------------------------------------
+# Bit-sliced arithmetic
+# ---------------------------------------------------------------------------
+
+def popcount_planes(x):
+    """Carry-save popcount of (n, ...) words along the first axis.
+
+    Returns the count as a list of bit-planes of shape (...), LSB first.
+    """
+    columns = [[x]]
+    planes = []
+    w = 0
+    while w < len(columns):
+        col = np.concatenate(columns[w]) if len(columns[w]) > 1 else columns[w][0]
+        carries = []
+        while len(col) > 1:
+            k = len(col) // 3 * 3
+            if k == 0:                                  # two left: half adder
+                a, b = col[0:1], col[1:2]
+                col, carry = a ^ b, a & b
+            else:                                       # full adders, three to two
+                a, b, c = col[0:k:3], col[1:k:3], col[2:k:3]
+                t = a ^ b
+                carry = (a & b) | (t & c)
+                col = np.concatenate([t ^ c, col[k:]])
+            carries.append(carry)
+        planes.append(col[0])
+        if carries:
+            if w + 1 == len(columns):
+                columns.append([])
+            columns[w + 1].extend(carries)
+        w += 1
+    return planes
+
+
+def ge_const(planes, thresholds):
+    """Words of (count >= threshold) for a bit-sliced count.
+
+    planes is popcount_planes() output, each plane of shape (G, F, ...);
+    thresholds has one constant per F.
+    """
+    t = np.asarray(thresholds, dtype=np.int64)
+    shape = (1, len(t)) + (1,) * (planes[0].ndim - 2)
+    ge = np.broadcast_to(ONES, planes[0].shape).copy()
+    for i, plane in enumerate(planes):
+        bit = _weight_words((t >> i) & 1).reshape(shape)
+        ge = ((plane & ge) & bit) | ((plane | ge) & ~bit)
+    too_big = _weight_words(t >= (1 << len(planes))).reshape(shape)
+    return ge & ~too_big
+
+
+def _pool(fired):
+    """2x2 max-pool of (..., H, W) words."""
+    return fired[..., 0::2, 0::2] | fired[..., 0::2, 1::2] | fired[..., 1::2, 0::2] | fired[..., 1::2, 1::2]
+
+
+def _windows(x):
+    """(G, [C,] H, W) words -> (9, G, [C,] H, W) zero-padded 3x3 windows."""
+    h, w = x.shape[-2:]
+    xp = np.zeros(x.shape[:-2] + (h + 2, w + 2), dtype=np.uint64)
+    xp[..., 1:-1, 1:-1] = x
+    return np.stack([xp[..., kr:kr + h, kc:kc + w] for kr in range(3) for kc in range(3)])
+
+# ---------------------------------------------------------------------------
+# Layers (G = groups of 64 images)
+# ---------------------------------------------------------------------------
+
+@profile.timed('bitslice.layer_one')
+def layer_one(pixels, w1, thresholds=hw.LAYER1_THRESHOLDS):
+    """(G, 28, 28) sliced pixels (layer_one's view) -> (G, 8, 14, 14) words."""
+    kernels = _weight_words(hw.layer_one_kernels(w1).reshape(8, 9).T)   # (9, 8)
+    windows = _windows(pixels)[:, :, None]                              # (9, G, 1, 28, 28)
+    matches = ~(windows ^ kernels[:, None, :, None, None])              # (9, G, 8, 28, 28)
+    return _pool(ge_const(popcount_planes(matches), thresholds))
+
+
+@profile.timed('bitslice.layer_two')
+def layer_two(l1, w2, thresholds=hw.LAYER2_THRESHOLDS):
+    """(G, 8, 14, 14) words -> (G, 4, 7, 7) words."""
+    kernels = hw.layer_two_kernels(w2).reshape(4, 9, 8).transpose(1, 2, 0)  # (9, 8, 4)
+    kernels = _weight_words(kernels.reshape(72, 4))
+    windows = _windows(l1).transpose(0, 2, 1, 3, 4)                         # (9, 8, G, 14, 14)
+    windows = windows.reshape((72,) + windows.shape[2:])[:, :, None]         # (72, G, 1, 14, 14)
+    matches = ~(windows ^ kernels[:, None, :, None, None])                   # (72, G, 4, 14, 14)
+    return _pool(ge_const(popcount_planes(matches), thresholds))
+
+
+@profile.timed('bitslice.dense')
+def dense_popcounts(l2, w3, n):
+    """(G, 4, 7, 7) words -> (n, 10) popcounts, as bnn_hw_model.dense_popcounts."""
+    flat = layouts.LAYER2_OUT.pack(l2).T                     # (196, G), dense input order
+    matches = ~(flat[:, :, None] ^ _weight_words(w3).T[:, None, :])   # (196, G, 10)
+    counts = np.zeros((n, hw.NUM_CLASSES), dtype=np.int32)
+    for i, plane in enumerate(popcount_planes(matches)):
+        counts += unslice_bits(plane, n).astype(np.int32) << i
+    return counts
+
+
+def slice_images(images):
+    """Images -> sliced pixels as layer_one sees them, plus the image count."""
+    return slice_bits(hw.layer_one_view(images)), len(images)
+
+
+def predict_sliced(sliced, weights, thresholds1=hw.LAYER1_THRESHOLDS,
+                   thresholds2=hw.LAYER2_THRESHOLDS, thresholds3=hw.DENSE_THRESHOLDS,
+                   batch_groups=4):
+    """predict() on pre-sliced images, for sweeps that reuse the slicing.
+
+    batch_groups groups (64 images each) go through the layers together;
+    small batches keep the intermediate planes in cache.
+    """
+    pixels, n = sliced
+    w1, w2, w3 = weights
+    pops = []
+    for g in range(0, len(pixels), batch_groups):
+        chunk = pixels[g:g + batch_groups]
+        count = min(n - g * LANES, len(chunk) * LANES)
+        l2 = layer_two(layer_one(chunk, w1, thresholds1), w2, thresholds2)
+        pops.append(dense_popcounts(l2, w3, count))
+    pops = np.concatenate(pops)
+    return hw.argmax_first(hw.dense_scores(pops, thresholds3)), pops
+
+
+def predict(images, weights, *, thresholds1=hw.LAYER1_THRESHOLDS,
+            thresholds2=hw.LAYER2_THRESHOLDS, thresholds3=hw.DENSE_THRESHOLDS, batch_groups=4):
+    """Return (predictions, popcounts) exactly as bnn_hw_model.predict().
+
+    The thresholds are keyword-only in both, so a positional batch size
+    cannot be taken for thresholds1.
+    """
+    return predict_sliced(slice_images(images), weights, thresholds1, thresholds2, thresholds3,
+                          batch_groups)
+
+
+def main():
+    import time
+    images, labels, weights = hw.load_images(), hw.load_labels(), hw.load_weights()
+    start = time.perf_counter()
+    preds, pops = predict(images, weights)
+    secs = time.perf_counter() - start
+    ref_preds, ref_pops = hw.predict(images, weights)
+    exact = np.array_equal(pops, ref_pops) and np.array_equal(preds, ref_preds)
+    print(f"Images     : {len(images)}")
+    print(f"Accuracy   : {100.0 * np.mean(preds == labels[:len(preds)]):.2f} %")
+    print(f"Throughput : {len(images) / secs:,.0f} images/s")
+    print("PASS: bit-identical to bnn_hw_model" if exact else "FAIL: differs from bnn_hw_model")
+    return exact
+
+
+if __name__ == '__main__':
+    raise SystemExit(0 if main() else 1)
@@ -0,0 +1,197 @@
+"""
+Parallel dataset-wide evaluation of many model configurations.
+
+The verifying set is bit-sliced (bnn_bitslice) once and placed in a
+multiprocessing.shared_memory block together with the labels. Pool
+workers attach to it at start-up and take zero-copy NumPy views, so no
+worker decodes the .ubin or receives image data through a pipe. The
+configurations are also sent once per worker; a job is just
+(config index, first group, last group) and returns a correct count.
+
+evaluate() yields (config, accuracy) as soon as every shard of a config is
+done, so long sweeps report results as they go:
+
+    configs = [Config(f'l2{d:+d}', thresholds2=[t + d for t in hw.LAYER2_THRESHOLDS])
+               for d in range(-3, 4)]
+    for config, acc in evaluate(configs, jobs=8):
+        print(config.name, acc)
+
+Run as a script it sweeps a uniform offset on the layer-2 thresholds, or
+with --dense compares the dense layer's argmax with and without its
+batch-norm offsets (all-zero DENSE thresholds rank the raw popcounts).
+"""
+
+import collections
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import bnn_bitslice as bitslice
+import bnn_hw_model as hw
+
+SHARD_GROUPS = 16             # 64-image groups per job (1024 images)
+
+Config = collections.namedtuple('Config', 'name weights thresholds1 thresholds2 thresholds3',
+                                defaults=(None, hw.LAYER1_THRESHOLDS, hw.LAYER2_THRESHOLDS,
+                                          hw.DENSE_THRESHOLDS))
+Config.__doc__ = "One model variant; weights=None means weights/*.csv."
+
+
+class SharedDataset:
+    """Bit-sliced images and labels in one shared-memory block.
+
+    Create it in the parent (and close() it, or use it as a context
+    manager); workers rebuild the views from spec() with attach().
+    """
+
+    def __init__(self, images=None, labels=None):
+        images = hw.load_images() if images is None else images
+        labels = hw.load_labels() if labels is None else labels
+        pixels, self.n = bitslice.slice_images(images)
+        self.pixel_shape = pixels.shape
+        self.shm = shared_memory.SharedMemory(create=True, size=pixels.nbytes + self.n)
+        self._views(self.shm)
+        self.pixels[...] = pixels
+        self.labels[...] = labels[:self.n]
+        self._owner = True
+
+    def _views(self, shm):
+        nbytes = int(np.prod(self.pixel_shape)) * 8
+        self.pixels = np.ndarray(self.pixel_shape, dtype=np.uint64, buffer=shm.buf)
+        self.labels = np.ndarray((self.n,), dtype=np.uint8, buffer=shm.buf, offset=nbytes)
+
+    @property
+    def groups(self):
+        return self.pixel_shape[0]
+
+    def spec(self):
+        return self.shm.name, self.pixel_shape, self.n
+
+    @classmethod
+    def attach(cls, spec):
+        name, pixel_shape, n = spec
+        self = cls.__new__(cls)
+        self.pixel_shape, self.n, self._owner = pixel_shape, n, False
+        self.shm = shared_memory.SharedMemory(name=name)
+        self._views(self.shm)
+        return self
+
+    def close(self):
+        self.pixels = self.labels = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+_data    = None
+_configs = None
+
+
+def _resolve(config):
+    return config._replace(weights=config.weights or hw.load_weights())
+
+
+def _init_worker(spec, configs):
+    global _data, _configs
+    _data = SharedDataset.attach(spec)
+    _configs = [_resolve(c) for c in configs]
+
+
+def _run_job(job):
+    """Correct predictions of one config on groups [g0, g1)."""
+    index, g0, g1 = job
+    config = _configs[index]
+    first, last = g0 * bitslice.LANES, min(g1 * bitslice.LANES, _data.n)
+    preds, _ = bitslice.predict_sliced((_data.pixels[g0:g1], last - first), config.weights,
+                                       config.thresholds1, config.thresholds2, config.thresholds3)
+    return index, int(np.sum(preds == _data.labels[first:last])), last - first
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+
+def evaluate(configs, jobs=None, data=None, shard_groups=SHARD_GROUPS):
+    """Yield (config, accuracy) for every config, in completion order.
+
+    jobs defaults to os.cpu_count(); jobs=1 runs in this process. data is a
+    SharedDataset to reuse across calls (default: the verifying set, created
+    and released here).
+    """
+    configs = list(configs)
+    own = data is None
+    data = SharedDataset() if own else data
+    try:
+        tasks = [(i, g, min(g + shard_groups, data.groups))
+                 for i in range(len(configs)) for g in range(0, data.groups, shard_groups)]
+        correct = [0] * len(configs)
+        seen    = [0] * len(configs)
+        jobs = jobs or os.cpu_count()
+        if jobs == 1:
+            _init_worker(data.spec(), configs)
+            results = map(_run_job, tasks)
+            pool = None
+        else:
+            pool = multiprocessing.Pool(jobs, _init_worker, (data.spec(), configs))
+            results = pool.imap_unordered(_run_job, tasks)
+        try:
+            for index, ok, count in results:
+                correct[index] += ok
+                seen[index] += count
+                if seen[index] == data.n:
+                    yield configs[index], correct[index] / data.n
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            else:
+                _data.close()
+    finally:
+        if own:
+            data.close()
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Sweep layer-2 threshold offsets over the verifying set")
+    parser.add_argument('-j', dest='jobs', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--offsets', nargs=2, type=int, default=(-3, 3), metavar=('LO', 'HI'),
+                        help="inclusive range of offsets (default -3 3)")
+    parser.add_argument('--dense', action='store_true',
+                        help="compare raw dense popcounts with the exported dense offsets instead")
+    parser.add_argument('--shard-groups', type=int, default=SHARD_GROUPS,
+                        help=f"64-image groups per job (default {SHARD_GROUPS})")
+    args = parser.parse_args()
+
+    if args.dense:
+        field = 'thresholds3'
+        configs = [Config("dense raw popcounts", thresholds3=(0,) * hw.NUM_CLASSES),
+                   Config("dense offsets")]
+    else:
+        lo, hi = args.offsets
+        field = 'thresholds2'
+        configs = [Config(f"layer-2 thresholds {d:+d}",
+                          thresholds2=tuple(t + d for t in hw.LAYER2_THRESHOLDS))
+                   for d in range(lo, hi + 1)]
+    start = time.perf_counter()
+    with SharedDataset() as data:
+        for config, acc in evaluate(configs, args.jobs, data, args.shard_groups):
+            print(f"  {config.name:<26} {list(getattr(config, field))}  {100 * acc:6.2f} %")
+        secs = time.perf_counter() - start
+        print(f"{len(configs)} configs x {data.n} images in {secs:.2f} s "
+              f"({len(configs) * data.n / secs:,.0f} images/s)")
+
+
+if __name__ == '__main__':
+    main()
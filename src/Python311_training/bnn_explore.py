@@ -0,0 +1,389 @@
+"""
+Design-space explorer: trained accuracy vs. hardware cost per architecture.
+
+Sweeps conv filter counts, kernel size, pooling and hidden dense width.
+For every architecture it
+
+  1. trains it with mnist_bnn.build_model() / train() (or reuses the
+     binarized weights cached in explore_cache/<key>.npz),
+  2. measures bit-exact hardware accuracy on the verifying set with
+     hardware_predict(), the RTL's arithmetic generalized to any shape
+     (XNOR-popcount over zero-padded windows, integer thresholds, OR
+     max-pool, argmax of popcount - threshold in the output layer),
+  3. prices it with hardware_cost(), the cycle and storage model of the
+     current RTL generalized the same way: serial load bits, cycles per
+     image and register bits. Dense-layer cycles come from
+     bnn_hw_model.dense_layer3_cycles() on the verifying set, so
+     --chunk-bits / --early-exit price the chunked and early-exit
+     final_layer_sequential (mean cycles per image).
+
+Results are appended to a JSON-lines store as each architecture finishes,
+so an interrupted sweep resumes where it stopped. An architecture whose
+worker fails is stored as failed (with the error), left out of the
+report and retried by the next run; the rest of the sweep carries on. Architectures run in
+parallel processes (-j). The report marks the Pareto frontier (no other
+point is at least as accurate and at most as costly in load bits, cycles
+and register bits, and strictly better in one).
+
+    python3 bnn_explore.py --filters 8,4 16,4 8,8 --dense 0 32 -j 4
+    python3 bnn_explore.py --report-only
+
+--reference adds the shipped design (weights/*.csv with the RTL's
+thresholds) without training; its cost must match bnn_hw_model exactly.
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import itertools
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import bnn_hw_model as hw
+
+HERE       = os.path.dirname(os.path.abspath(__file__))
+STORE_PATH = os.path.join(HERE, 'explore_results.jsonl')
+CACHE_DIR  = os.path.join(HERE, 'explore_cache')
+
+IMAGE_SIZE  = 28
+PIXEL_BITS  = IMAGE_SIZE * IMAGE_SIZE
+DONE_EDGES  = 2               # one edge to raise done, one for the FSM to leave
+
+Arch = collections.namedtuple('Arch', 'filters kernel pool dense epochs seed chunk_bits early_exit',
+                              defaults=(None, None, False))
+Arch.__doc__ = ("filters: conv filter counts per layer; dense: hidden dense widths; seed: training seed; "
+                "chunk_bits / early_exit: final_layer_sequential CHUNK_BITS / EARLY_EXIT (cost only).")
+
+REFERENCE = Arch(filters=(8, 4), kernel=3, pool=2, dense=(), epochs=0)
+
+
+def arch_key(arch, reference=False):
+    dense_rtl = (f"_c{arch.chunk_bits}" if arch.chunk_bits else '') + ('_ee' if arch.early_exit else '')
+    if reference:
+        return 'rtl-reference' + dense_rtl
+    dense = '-'.join(map(str, arch.dense)) or '0'
+    seed = '' if arch.seed is None else f"_s{arch.seed}"
+    return (f"f{'-'.join(map(str, arch.filters))}_k{arch.kernel}_p{arch.pool}"
+            f"_d{dense}_e{arch.epochs}{seed}{dense_rtl}")
+
+
+def weights_key(arch):
+    """Cache key of the trained weights (the dense RTL options only change the cost)."""
+    return arch_key(arch._replace(chunk_bits=None, early_exit=False))
+
+# ---------------------------------------------------------------------------
+# Generalized hardware model
+# ---------------------------------------------------------------------------
+
+def feature_sizes(arch):
+    """Side length after each conv block (pooling floors, as MaxPooling2D)."""
+    sizes, side = [], IMAGE_SIZE
+    for _ in arch.filters:
+        side //= arch.pool
+        sizes.append(side)
+    return sizes
+
+
+def _conv_counts(x, kernels):
+    """XNOR-popcount of (N, H, W, C) 0/1 maps against (F, k, k, C) kernels.
+
+    matches = k*k*C - sum(x) - sum(w) + 2 x.w over each zero-padded window.
+    """
+    n, h, w, c = x.shape
+    f, k = kernels.shape[:2]
+    p = k // 2
+    xp = np.zeros((n, h + 2 * p, w + 2 * p, c), dtype=np.float32)
+    xp[:, p:p + h, p:p + w] = x
+    kern = kernels.astype(np.float32)
+    dots = np.zeros((n, h, w, f), dtype=np.float32)
+    ones = np.zeros((n, h, w), dtype=np.float32)
+    for kr in range(k):
+        for kc in range(k):
+            patch = xp[:, kr:kr + h, kc:kc + w]
+            dots += patch @ kern[:, kr, kc, :].T
+            ones += patch.sum(axis=-1)
+    return (k * k * c - ones[..., None] - kern.sum(axis=(1, 2, 3)) + 2 * dots).astype(np.int32)
+
+
+def _pool(fired, pool):
+    n, h, w, f = fired.shape
+    h2, w2 = h // pool, w // pool
+    fired = fired[:, :h2 * pool, :w2 * pool]
+    return fired.reshape(n, h2, pool, w2, pool, f).any(axis=(2, 4)).astype(np.uint8)
+
+
+def hardware_predict(images, layers, pool, batch_size=1000, dense_inputs=None):
+    """Predictions of the RTL arithmetic for any conv / dense stack.
+
+    layers is bnn_retrieve_weights.export_arrays()-style: a list of dicts
+    with 'weights' (conv (F, k, k, C), dense (units, inputs)) and
+    'thresholds' (offsets in the output layer, which is an argmax of
+    popcount - threshold as in final_layer_sequential; None ranks raw
+    popcounts). A dense_inputs dict collects the (N, inputs) 0/1 input of
+    every dense layer, keyed by layer index.
+    """
+    preds = []
+    for start in range(0, len(images), batch_size):
+        x = np.asarray(images[start:start + batch_size], dtype=np.uint8)[..., None]
+        for index, layer in enumerate(layers):
+            w = np.asarray(layer['weights'], dtype=np.uint8)
+            if w.ndim == 4:
+                counts = _conv_counts(x, w)
+                x = _pool(counts >= np.asarray(layer['thresholds'])[None, None, None, :], pool)
+                continue
+            flat = x.reshape(len(x), -1)
+            if dense_inputs is not None:
+                dense_inputs.setdefault(index, []).append(flat)
+            counts = (flat[:, None, :] == w[None]).sum(axis=-1, dtype=np.int32)
+            if layer is layers[-1]:
+                if layer['thresholds'] is not None:
+                    counts = counts - np.asarray(layer['thresholds'], dtype=np.int32)[None, :]
+                preds.append(hw.argmax_first(counts))
+            else:
+                x = (counts >= np.asarray(layer['thresholds'])[None, :]).astype(np.uint8)
+    return np.concatenate(preds)
+
+
+def dense_cycles(arch, layers, dense_inputs):
+    """Mean s_LAYER_3-style cycles per image of every dense layer, from
+    bnn_hw_model.dense_layer3_cycles() on the inputs hardware_predict()
+    collected. Early exit only applies to the output layer's argmax."""
+    cycles = []
+    for index in sorted(dense_inputs):
+        layer = layers[index]
+        w = np.asarray(layer['weights'], dtype=np.uint8)
+        last = index == len(layers) - 1
+        offsets = layer['thresholds'] if last and layer['thresholds'] is not None else np.zeros(len(w), dtype=int)
+        chunk_bits = min(arch.chunk_bits, w.shape[1]) if arch.chunk_bits else None
+        c, _ = hw.dense_layer3_cycles(np.concatenate(dense_inputs[index]), w, chunk_bits,
+                                      arch.early_exit and last, offsets)
+        cycles.append(float(np.mean(c)))
+    return cycles
+
+
+def reference_layers():
+    """The shipped design: weights/*.csv in logical shape, RTL thresholds."""
+    w1, w2, w3 = hw.load_weights()
+    return [dict(weights=w1.reshape(8, 3, 3, 1), thresholds=np.array(hw.LAYER1_THRESHOLDS)),
+            dict(weights=w2.reshape(4, 3, 3, 8), thresholds=np.array(hw.LAYER2_THRESHOLDS)),
+            dict(weights=w3, thresholds=np.array(hw.DENSE_THRESHOLDS))]
+
+# ---------------------------------------------------------------------------
+# Hardware cost model
+# ---------------------------------------------------------------------------
+
+def hardware_cost(arch, dense_cycles):
+    """Serial load bits, cycles per image and register bits of an architecture.
+
+    Generalizes the RTL: weights load one bit per clock with the pixels in
+    parallel, each conv layer produces one pooled output bit per cycle and
+    needs DONE_EDGES more to hand over. dense_cycles are the per-layer
+    dense cycles of dense_cycles() (chunks plus the FSM edge). Registers
+    hold the image, every weight bit and every feature map between layers.
+    """
+    sizes = feature_sizes(arch)
+    channels = (1,) + tuple(arch.filters)
+    conv_bits = [f * arch.kernel * arch.kernel * c for f, c in zip(arch.filters, channels)]
+    flat = sizes[-1] * sizes[-1] * arch.filters[-1]
+    widths = (flat,) + tuple(arch.dense) + (hw.NUM_CLASSES,)
+    dense_bits = [a * b for a, b in zip(widths, widths[1:])]
+    weight_bits = sum(conv_bits) + sum(dense_bits)
+
+    load = max(weight_bits, PIXEL_BITS) + 1
+    conv = [f * s * s + DONE_EDGES for f, s in zip(arch.filters, sizes)]
+    feature_bits = sum(f * s * s for f, s in zip(arch.filters, sizes)) + sum(arch.dense)
+    cycles = load + sum(conv) + sum(dense_cycles)
+    return {
+        'weight_bits':   weight_bits,
+        'load_bits':     weight_bits + PIXEL_BITS,
+        'cycles':        int(cycles) if cycles == int(cycles) else round(cycles, 2),
+        'register_bits': PIXEL_BITS + weight_bits + feature_bits,
+    }
+
+# ---------------------------------------------------------------------------
+# One architecture (runs in a worker process)
+# ---------------------------------------------------------------------------
+
+def _train(arch):
+    """Train with TensorFlow; return (export_arrays() layers, float accuracy).
+
+    Goes through mnist_bnn's run cache, so runs are checkpointed and a
+    longer-epoch sweep warm-starts from the shorter one.
+    """
+    import bnn_retrieve_weights as retrieve
+    import mnist_bnn
+    hparams = dict(filters=arch.filters, kernel_size=arch.kernel, pool_size=arch.pool,
+                   dense_units=arch.dense, epochs=arch.epochs)
+    model, metrics, _run_dir = mnist_bnn.train_cached(hparams, seed=arch.seed, verbose=0)
+    return retrieve.export_arrays(model), metrics['test_accuracy']
+
+
+def _cached_layers(arch, cache_dir):
+    path = os.path.join(cache_dir, weights_key(arch) + '.npz')
+    if os.path.exists(path):
+        data = np.load(path)
+        count = int(data['num_layers'])
+        layers = [dict(weights=data[f'w{i}'],
+                       thresholds=data[f't{i}'] if f't{i}' in data else None) for i in range(count)]
+        return layers, float(data['float_accuracy']), True
+    layers, float_acc = _train(arch)
+    os.makedirs(cache_dir, exist_ok=True)
+    arrays = {f'w{i}': l['weights'] for i, l in enumerate(layers)}
+    arrays.update({f't{i}': l['thresholds'] for i, l in enumerate(layers) if l['thresholds'] is not None})
+    np.savez_compressed(path, num_layers=len(layers), float_accuracy=float_acc, **arrays)
+    return layers, float_acc, False
+
+
+def run_arch(arch, cache_dir=CACHE_DIR, reference=False):
+    """Result dict for one architecture (trains unless cached)."""
+    start = time.perf_counter()
+    if reference:
+        layers, float_acc, cached = reference_layers(), None, True
+        arch = arch._replace(seed=hw.load_provenance().get('seed'))
+    else:
+        layers, float_acc, cached = _cached_layers(arch, cache_dir)
+    dense_inputs = {}
+    preds = hardware_predict(hw.load_images(), layers, arch.pool, dense_inputs=dense_inputs)
+    labels = hw.load_labels()[:len(preds)]
+    cost = hardware_cost(arch, dense_cycles(arch, layers, dense_inputs))
+    return dict(key=arch_key(arch, reference), arch=arch._asdict(),
+                hw_accuracy=float(np.mean(preds == labels)), float_accuracy=float_acc,
+                cached=cached, seconds=time.perf_counter() - start, **cost)
+
+# ---------------------------------------------------------------------------
+# Store, Pareto front and report
+# ---------------------------------------------------------------------------
+
+def load_store(path):
+    results = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    res = json.loads(line)
+                    results[res['key']] = res
+    return results
+
+
+def append_store(path, result):
+    with open(path, 'a') as f:
+        f.write(json.dumps(result) + '\n')
+
+
+COSTS = ('load_bits', 'cycles', 'register_bits')
+
+
+def pareto_front(results):
+    """Keys of results not dominated in (hw_accuracy up, COSTS down)."""
+    def dominates(a, b):
+        ge = a['hw_accuracy'] >= b['hw_accuracy'] and all(a[c] <= b[c] for c in COSTS)
+        gt = a['hw_accuracy'] > b['hw_accuracy'] or any(a[c] < b[c] for c in COSTS)
+        return ge and gt
+    return {r['key'] for r in results if not any(dominates(o, r) for o in results)}
+
+
+def report(results):
+    results = list(results)
+    failed = sorted(r['key'] for r in results if r.get('failed'))
+    results = sorted((r for r in results if not r.get('failed')), key=lambda r: (r['cycles'], -r['hw_accuracy']))
+    front = pareto_front(results)
+    lines = [f"{'':1} {'architecture':<28} {'hw acc':>7} {'tf acc':>7} "
+             f"{'weights':>8} {'load bits':>9} {'cycles':>7} {'reg bits':>8}"]
+    for r in results:
+        tf_acc = '-' if r['float_accuracy'] is None else f"{100 * r['float_accuracy']:.2f}"
+        lines.append(f"{'*' if r['key'] in front else ' ':1} {r['key']:<28} "
+                     f"{100 * r['hw_accuracy']:>7.2f} {tf_acc:>7} {r['weight_bits']:>8} "
+                     f"{r['load_bits']:>9} {r['cycles']:>7} {r['register_bits']:>8}")
+    lines.append(f"* = Pareto frontier ({len(front)} of {len(results)}): "
+                 "no other point is as accurate at equal or lower load bits, cycles and register bits")
+    if failed:
+        lines.append(f"Failed ({len(failed)}, retried by the next run): {', '.join(failed)}")
+    return '\n'.join(lines)
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def grid(args):
+    filters = [tuple(int(f) for f in spec.split(',')) for spec in args.filters]
+    dense = [tuple(int(d) for d in spec.split(',') if int(d)) for spec in args.dense]
+    for f, k, p, d in itertools.product(filters, args.kernel, args.pool, dense):
+        arch = Arch(f, k, p, d, args.epochs, args.seed, args.chunk_bits, args.early_exit)
+        if min(feature_sizes(arch)) < 1 or k % 2 == 0:
+            print(f"Skipping {arch_key(arch)}: {'even kernel' if k % 2 == 0 else 'pools below 1x1'}")
+            continue
+        yield arch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep BNN architectures for accuracy vs. hardware cost")
+    parser.add_argument('--filters', nargs='+', default=['8,4'],
+                        help="conv filter counts per layer, e.g. 8,4 16,4 (default 8,4)")
+    parser.add_argument('--kernel', nargs='+', type=int, default=[3], help="kernel sizes (odd)")
+    parser.add_argument('--pool', nargs='+', type=int, default=[2], help="max-pool sizes")
+    parser.add_argument('--dense', nargs='+', default=['0'],
+                        help="hidden dense widths, comma-separated per config (0 = none)")
+    parser.add_argument('--epochs', type=int, default=6)
+    parser.add_argument('--seed', type=int, default=hw.default_seed(),
+                        help=f"training seed, part of the cache key (default ${hw.SEED_ENV}, else unseeded)")
+    parser.add_argument('--chunk-bits', type=int, default=None,
+                        help="price the output layer with this CHUNK_BITS (default: one chunk)")
+    parser.add_argument('--early-exit', action='store_true',
+                        help="price the output layer with EARLY_EXIT (mean cycles on the verifying set)")
+    parser.add_argument('-j', dest='jobs', type=int, default=1, help="parallel worker processes")
+    parser.add_argument('--store', default=STORE_PATH, help="JSON-lines results store (resumed)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help="cached binarized weights")
+    parser.add_argument('--reference', action='store_true', help="include the shipped RTL design")
+    parser.add_argument('--force', action='store_true', help="re-run architectures already in the store")
+    parser.add_argument('--report-only', action='store_true', help="only print the report of the store")
+    parser.add_argument('--report', help="also write the report to this file")
+    args = parser.parse_args()
+
+    store = load_store(args.store)
+    if not args.report_only:
+        todo = [(arch, False) for arch in grid(args)]
+        if args.reference:
+            todo.insert(0, (REFERENCE._replace(chunk_bits=args.chunk_bits, early_exit=args.early_exit), True))
+        todo = [(a, ref) for a, ref in todo
+                if args.force or arch_key(a, ref) not in store or store[arch_key(a, ref)].get('failed')]
+        print(f"{len(todo)} architectures to run, {len(store)} in {args.store}")
+
+        with concurrent.futures.ProcessPoolExecutor(max(args.jobs, 1)) as pool:
+            futures = {pool.submit(run_arch, a, args.cache_dir, ref): (a, ref) for a, ref in todo}
+            for fut in concurrent.futures.as_completed(futures):
+                arch, ref = futures[fut]
+                key = arch_key(arch, ref)
+                try:
+                    res = fut.result()
+                except ImportError as e:
+                    print(f"  {key}: skipped, training needs TensorFlow and larq ({e})")
+                    continue
+                except Exception as e:      # one architecture must not abort the sweep
+                    res = dict(key=key, arch=arch._asdict(), failed=f"{type(e).__name__}: {e}")
+                    store[key] = res
+                    append_store(args.store, res)
+                    print(f"  {key}: FAILED ({res['failed']})")
+                    continue
+                store[key] = res
+                append_store(args.store, res)
+                print(f"  {key}: hw accuracy {100 * res['hw_accuracy']:.2f} %, "
+                      f"{res['cycles']} cycles, {res['weight_bits']} weight bits "
+                      f"({'cached' if res['cached'] else 'trained'}, {res['seconds']:.1f} s)")
+
+    if not store:
+        print("No results yet")
+        return
+    text = report(store.values())
+    print(text)
+    if args.report:
+        with open(args.report, 'w') as f:
+            f.write(text + '\n')
+        print(f"Written {args.report}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,308 @@
+"""
+Post-training weight-flip search against bit-exact hardware accuracy.
+
+Binarizing with w > 0 leaves weights near zero on an arbitrary side. This
+greedily flips exported weight bits (all 72 + 288 + 1960 of them, as
+stored in weights/*.csv) while that increases the number of correctly
+classified images of a validation split, as computed by the hardware
+arithmetic of bnn_hw_model. Thresholds, including the dense offsets,
+stay fixed.
+
+Every candidate is rescored incrementally from cached intermediate
+values of the current weights (State):
+
+  dense bit (k, i)       changes neuron k's popcount by +-1 per image, so
+                         all 1960 candidates are scored at once from the
+                         popcounts and per-image winning margins
+  layer-2 bit (f, ...)   changes filter f's counts by +-1 at each
+                         position: re-threshold and pool filter f only,
+                         then add the changed bits' dense contributions
+  layer-1 bit (f, ...)   changes filter f's lookup table: recompute that
+                         channel, push its changed bits into the layer-2
+                         counts as deltas, then as above
+
+Each round flips the best single bit. When no single flip helps, pairs
+among the best --pairs single candidates are tried (each with the first
+bit applied, rescoring the second). Accepted flips are checked against a
+full bnn_hw_model.predict(), and the result is reported on a held-out
+part of the verifying set that the search never sees.
+
+    python3 bnn_flip_search.py [--rounds 20] [--out weights_flipped]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+import bnn_hw_model as hw
+import bnn_layouts as layouts
+import bnn_profile as profile
+
+HERE    = os.path.dirname(os.path.abspath(__file__))
+OUT_DIR = os.path.join(HERE, 'weights_flipped')
+
+CSV_NAMES = ('layer_0_weights.csv', 'layer_3_weights.csv', 'layer_7_weights.csv')
+
+# (kernel coordinates) of every exported bit, per layer, in CSV row-major order
+_K1 = np.argsort(layouts.unstream(layouts.WEIGHTS1, np.arange(72)).ravel())
+_K2 = np.argsort(layouts.unstream(layouts.WEIGHTS2, np.arange(288)).ravel())
+W1_COORDS = np.stack(np.unravel_index(_K1, layouts.WEIGHTS1.consumer.shape), axis=1)   # (72, 3)  f, kr, kc
+W2_COORDS = np.stack(np.unravel_index(_K2, layouts.WEIGHTS2.consumer.shape), axis=1)   # (288, 4) f, kr, kc, ch
+
+# dense input index of layer-2 output (chan, row, col)
+_POS = np.empty(layouts.LAYER2_OUT.size, dtype=np.int64)
+_POS[layouts.LAYER2_OUT.pack(np.arange(layouts.LAYER2_OUT.size).reshape((1,) + layouts.LAYER2_OUT.shape))[0]] = \
+    np.arange(layouts.LAYER2_OUT.size)
+L2_DENSE_INDEX = _POS.reshape(layouts.LAYER2_OUT.shape)                                 # (4, 7, 7)
+
+
+def bit_name(bit):
+    layer, row, col = bit
+    return f"w{layer + 1}[{row},{col}]"
+
+
+def flipped(weights, *bits):
+    """Copy of (w1, w2, w3) with the given (layer, row, col) bits inverted."""
+    out = [np.array(w, dtype=np.uint8) for w in weights]
+    for layer, row, col in bits:
+        out[layer][row, col] ^= 1
+    return tuple(out)
+
+
+def _pool(fired):
+    """(N, ..., H, W) -> 2x2 OR-pooled."""
+    return fired[..., 0::2, 0::2] | fired[..., 0::2, 1::2] | fired[..., 1::2, 0::2] | fired[..., 1::2, 1::2]
+
+
+def correct(pops, labels):
+    return int(np.sum(hw.argmax_first(pops) == labels))
+
+# ---------------------------------------------------------------------------
+# Cached state of one weight set on the validation images
+# ---------------------------------------------------------------------------
+
+class State:
+    """Intermediate values of the hardware for one weight set."""
+
+    def __init__(self, codes, labels, weights, thresholds1=hw.LAYER1_THRESHOLDS,
+                 thresholds2=hw.LAYER2_THRESHOLDS, thresholds3=hw.DENSE_THRESHOLDS):
+        self.codes, self.labels, self.weights = codes, labels, weights
+        self.thresholds = (thresholds1, thresholds2, thresholds3)
+        self.t1 = np.asarray(thresholds1, dtype=np.int16)
+        self.t2 = np.asarray(thresholds2, dtype=np.int16)
+        w1, w2, w3 = weights
+        self.kernels2 = hw.layer_two_kernels(w2)                                 # (4, 3, 3, 8)
+        self.sign2 = 2 * self.kernels2.astype(np.int16) - 1
+        self.sign3 = (2 * np.asarray(w3, dtype=np.int32) - 1)                   # (10, 196)
+
+        fired = hw.layer_one_lut(w1, thresholds1)[codes]                         # (N, 28, 28, 8)
+        self.l1 = _pool(fired.transpose(0, 3, 1, 2))                             # (N, 8, 14, 14)
+        self.l1_padded = np.pad(self.l1, ((0, 0), (0, 0), (1, 1), (1, 1)))
+        self.counts2 = hw._match_counts(self.l1.transpose(0, 2, 3, 1), self.kernels2).astype(np.int16)
+        self.l2 = _pool(self.counts2 >= self.t2[None, :, None, None]).astype(np.int8)   # (N, 4, 7, 7)
+        self.flat = layouts.LAYER2_OUT.pack(self.l2.astype(np.uint8))
+        # dense_scores(): the offsets are constant per neuron, so popcount
+        # deltas and winning margins carry over unchanged
+        self.pops = hw.dense_scores(hw.dense_popcounts(self.flat, w3), thresholds3)
+        self.correct = correct(self.pops, labels)
+        self._dense = None
+
+    def _dense_delta(self, l2_new, filters):
+        """Popcount change from layer-2 output bits of `filters` going l2 -> l2_new."""
+        n = len(self.pops)
+        diff = (l2_new - self.l2[:, filters]).reshape(n, -1).astype(np.int32)
+        return diff @ self.sign3[:, L2_DENSE_INDEX[filters].ravel()].T
+
+    # -- per-layer scorers: correct count with one bit flipped ---------------
+
+    @profile.timed('flip.dense')
+    def score_dense(self):
+        """(10, 196) correct counts with dense bit (k, i) flipped."""
+        pops, labels = self.pops, self.labels
+        n = len(labels)
+        s_y = pops[np.arange(n), labels]
+        idx = np.arange(hw.NUM_CLASSES)
+        lower = idx[None, :] < labels[:, None]
+        # label beats j: strictly for j < label (ties go to the lower index)
+        beats = np.where(lower, s_y[:, None] > pops, s_y[:, None] >= pops)
+        beats[np.arange(n), labels] = True
+        losses = np.sum(~beats, axis=1)
+        # the label's own score must reach this to win
+        big = 1 << 20
+        need = np.maximum(np.where(lower, pops + 1, -big).max(axis=1),
+                          np.where(idx[None, :] > labels[:, None], pops, -big).max(axis=1))
+        delta = 1 - 2 * (self.flat[:, None, :] == np.asarray(self.weights[2])[None]).astype(np.int32)
+        out = np.empty((hw.NUM_CLASSES, hw.NUM_DENSE_INPUTS), dtype=np.int64)
+        for k in range(hw.NUM_CLASSES):
+            new_k = pops[:, k, None] + delta[:, k]                               # (N, 196)
+            is_label = (labels == k)[:, None]
+            others_ok = (losses - (~beats[:, k]))[:, None] == 0
+            limit = (s_y - (k < labels))[:, None]
+            ok = np.where(is_label, new_k >= need[:, None], others_ok & (new_k <= limit))
+            out[k] = ok.sum(axis=0)
+        return out
+
+    def _counts2_pops(self, counts2, filters):
+        l2_new = _pool(counts2 >= self.t2[filters][None, :, None, None]).astype(np.int8)
+        return self.pops + self._dense_delta(l2_new, filters)
+
+    @profile.timed('flip.layer_two')
+    def score_layer_two(self, row, col):
+        """Correct count with w2[row, col] flipped."""
+        f, kr, kc, ch = W2_COORDS[row * 72 + col]
+        window = self.l1_padded[:, ch, kr:kr + 14, kc:kc + 14]
+        delta = 1 - 2 * (window == self.kernels2[f, kr, kc, ch]).astype(np.int16)
+        return correct(self._counts2_pops((self.counts2[:, f] + delta)[:, None], [f]), self.labels)
+
+    @profile.timed('flip.layer_one')
+    def score_layer_one(self, row, col):
+        """Correct count with w1[row, col] flipped."""
+        f = W1_COORDS[row * 9 + col][0]
+        w1 = flipped((self.weights[0],), (0, row, col))[0]
+        fired = hw.layer_one_lut(w1, tuple(self.t1.tolist()))[:, f][self.codes]    # (N, 28, 28)
+        diff = _pool(fired).astype(np.int16) - self.l1[:, f]
+        if not diff.any():
+            return self.correct
+        padded = np.pad(diff, ((0, 0), (1, 1), (1, 1)))
+        delta = np.zeros_like(self.counts2)
+        for kr in range(3):
+            for kc in range(3):
+                delta += padded[:, None, kr:kr + 14, kc:kc + 14] * self.sign2[None, :, kr, kc, f, None, None]
+        filters = list(range(len(self.t2)))
+        return correct(self._counts2_pops(self.counts2 + delta, filters), self.labels)
+
+    def score(self, bit):
+        layer, row, col = bit
+        if layer == 0:
+            return self.score_layer_one(row, col)
+        if layer == 1:
+            return self.score_layer_two(row, col)
+        if self._dense is None:
+            self._dense = self.score_dense()
+        return int(self._dense[row, col])
+
+    def score_all(self):
+        """{(layer, row, col): correct count} for every single flip."""
+        scores = {}
+        for row in range(8):
+            for col in range(9):
+                scores[(0, row, col)] = self.score_layer_one(row, col)
+        for row in range(4):
+            for col in range(72):
+                scores[(1, row, col)] = self.score_layer_two(row, col)
+        for row, col in np.ndindex(hw.NUM_CLASSES, hw.NUM_DENSE_INPUTS):
+            scores[(2, row, col)] = self.score((2, row, col))
+        return scores
+
+# ---------------------------------------------------------------------------
+# Search
+# ---------------------------------------------------------------------------
+
+def split(n, val_fraction, seed):
+    """Seeded (validation, held-out) index arrays over n images."""
+    order = np.random.default_rng(seed).permutation(n)
+    cut = int(round(n * val_fraction))
+    return np.sort(order[:cut]), np.sort(order[cut:])
+
+
+def search(images, labels, weights, rounds=20, pairs=24, min_gain=1, log=print,
+           thresholds=(hw.LAYER1_THRESHOLDS, hw.LAYER2_THRESHOLDS, hw.DENSE_THRESHOLDS)):
+    """Greedy flip search; return (weights, [(bits, correct count)]) of the accepted steps.
+
+    thresholds are the (layer-1, layer-2, dense) thresholds the weights are
+    scored with, as hw.load_thresholds() returns them.
+    """
+    state = State(hw.window_codes(hw.layer_one_view(images)), labels, weights, *thresholds)
+    history = []
+    log(f"  start: {state.correct}/{len(labels)} correct on the validation split")
+    for step in range(rounds):
+        t0 = time.perf_counter()
+        scores = state.score_all()
+        bit, best = max(scores.items(), key=lambda kv: kv[1])
+        move = (bit,) if best - state.correct >= min_gain else None
+        kind = 'single'
+        if move is None and pairs > 1:
+            kind = 'pair'
+            top = sorted(scores, key=scores.get, reverse=True)[:pairs]
+            best = state.correct
+            for i, a in enumerate(top):
+                trial = State(state.codes, labels, flipped(state.weights, a), *state.thresholds)
+                for b in top[i + 1:]:
+                    s = trial.score(b)
+                    if s - state.correct >= min_gain and s > best:
+                        best, move = s, (a, b)
+        if move is None:
+            log(f"  round {step + 1}: no single or paired flip gains {min_gain}+ images, stopping")
+            break
+        state = State(state.codes, labels, flipped(state.weights, *move), *state.thresholds)
+        assert state.correct == best, "incremental score disagrees with a full recompute"
+        history.append((move, best))
+        log(f"  round {step + 1}: {kind} flip {' + '.join(map(bit_name, move))} -> "
+            f"{best}/{len(labels)} ({time.perf_counter() - t0:.1f} s)")
+    return state.weights, history
+
+
+def write_weights(weights, out_dir, provenance, source_dir=hw.WEIGHTS_DIR):
+    """Write the flipped weights with the thresholds of source_dir, the directory they came from."""
+    os.makedirs(out_dir, exist_ok=True)
+    for w, name in zip(weights, CSV_NAMES):
+        with open(os.path.join(out_dir, name), 'w') as f:
+            f.writelines(','.join(map(str, row)) + '\n' for row in np.asarray(w).tolist())
+    for name in os.listdir(source_dir):
+        if name.endswith('_thresholds.csv'):
+            shutil.copy(os.path.join(source_dir, name), out_dir)
+    with open(os.path.join(out_dir, hw.PROVENANCE_NAME), 'w') as f:
+        json.dump(provenance, f, indent=2, sort_keys=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flip weight bits to raise bit-exact hardware accuracy")
+    parser.add_argument('--weights', default=hw.WEIGHTS_DIR, help="weights directory to start from")
+    parser.add_argument('--out', default=OUT_DIR, help=f"output directory (default {os.path.basename(OUT_DIR)})")
+    parser.add_argument('--rounds', type=int, default=20, help="maximum accepted flips (default 20)")
+    parser.add_argument('--pairs', type=int, default=24,
+                        help="best single candidates to combine into pairs when no single flip helps (0 = off)")
+    parser.add_argument('--min-gain', type=int, default=1, help="images a flip must gain (default 1)")
+    parser.add_argument('--val-fraction', type=float, default=0.5,
+                        help="share of the verifying set searched on; the rest is held out (default 0.5)")
+    parser.add_argument('--seed', type=int, default=None, help="split seed (default $BNN_SEED, else 0)")
+    args = parser.parse_args()
+
+    seed = hw.default_seed(args.seed) or 0
+    images, labels = hw.load_images(), hw.load_labels()
+    labels = labels[:len(images)].astype(np.int64)
+    weights = hw.load_weights(args.weights)
+    thresholds = hw.load_thresholds(args.weights)
+    val, held = split(len(images), args.val_fraction, seed)
+    print(f"{len(val)} validation / {len(held)} held-out images (seed {seed})")
+
+    start = time.perf_counter()
+    new_weights, history = search(images[val], labels[val], weights, args.rounds, args.pairs, args.min_gain,
+                                  thresholds=thresholds)
+    secs = time.perf_counter() - start
+
+    def accuracy(w, idx):
+        t1, t2, t3 = thresholds
+        preds, _ = hw.predict(images[idx], w, thresholds1=t1, thresholds2=t2, thresholds3=t3)
+        return 100.0 * np.mean(preds == labels[idx])
+
+    bits = [b for move, _ in history for b in move]
+    print(f"Flipped {len(bits)} bits in {secs:.1f} s: {', '.join(map(bit_name, bits)) or 'none'}")
+    for name, idx in (('validation', val), ('held-out', held), ('all', np.arange(len(images)))):
+        before, after = accuracy(weights, idx), accuracy(new_weights, idx)
+        print(f"  {name:<10} {before:6.2f} % -> {after:6.2f} % ({after - before:+.2f})")
+
+    provenance = dict(hw.load_provenance(args.weights),
+                      flip_search=dict(source=os.path.abspath(args.weights), seed=seed,
+                                       val_fraction=args.val_fraction, min_gain=args.min_gain,
+                                       flipped=[bit_name(b) for b in bits]))
+    write_weights(new_weights, args.out, provenance, args.weights)
+    print(f"Written {args.out}")
+
+
+if __name__ == '__main__':
+    main()
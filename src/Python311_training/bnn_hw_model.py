@@ -0,0 +1,402 @@
+"""
+Bit-exact NumPy model of the tt_um_mnist_bnn datapath.
+
+This models the RTL, not the TensorFlow network: every weight and feature
+bit is read through the flat-index mappings declared in bnn_layouts.py,
+which mirror the SystemVerilog, so the popcounts and predictions here are
+exactly what the hardware produces for a given serial stream.
+
+All functions work on batches: images are (N, 28, 28) arrays of 0/1.
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+
+import bnn_layouts as layouts
+import bnn_profile as profile
+
+# ---------------------------------------------------------------------------
+# Paths (relative to this file)
+# ---------------------------------------------------------------------------
+HERE        = os.path.dirname(os.path.abspath(__file__))
+WEIGHTS_DIR = os.path.join(HERE, 'weights')
+DATA_DIR    = os.path.join(HERE, 'training_data')
+
+IMAGES_PATH = os.path.join(DATA_DIR, 'mnist_binary_verifying.ubin')
+LABELS_PATH = os.path.join(DATA_DIR, 'mnist_binary_labels_verifying.ubin')
+
+PROVENANCE_NAME = 'provenance.json'    # written next to exported weights and datasets
+SEED_ENV        = 'BNN_SEED'           # global seed for training, splitting and test selection
+
+# ---------------------------------------------------------------------------
+# Constants of the RTL
+# ---------------------------------------------------------------------------
+# The batch-norm thresholds live in weights/*_thresholds.csv; the RTL gets
+# them through src/bnn_params.sv, generated by bnn_rtl_params.py
+THRESHOLD_FILES = ('layer_1_thresholds.csv', 'layer_4_thresholds.csv', 'layer_8_thresholds.csv')
+THRESHOLD_BITS  = (4, 7, 8)                    # layer_one.sv / layer_two.sv / flatten_layer.sv field widths
+
+
+def load_thresholds(weights_dir=WEIGHTS_DIR):
+    """Return the (layer-1, layer-2, dense) thresholds of a weights directory as int tuples.
+
+    One binary number per line, as bnn_retrieve_weights.py writes them.
+    """
+    layers = []
+    for name, bits in zip(THRESHOLD_FILES, THRESHOLD_BITS):
+        with open(os.path.join(weights_dir, name)) as f:
+            values = tuple(int(line, 2) for line in f if line.strip())
+        if not all(0 <= v < (1 << bits) for v in values):
+            raise ValueError(f"{name}: thresholds {values} do not fit {bits} bits")
+        layers.append(values)
+    return tuple(layers)
+
+
+LAYER1_THRESHOLDS, LAYER2_THRESHOLDS, DENSE_THRESHOLDS = load_thresholds()
+NUM_DENSE_INPUTS  = 196                        # final_layer_sequential NUM_INPUTS
+NUM_CLASSES       = 10
+NUM_WEIGHT_BITS   = 72 + 288 + 1960            # registers.sv serial weight stream
+NUM_THRESHOLD_BITS = 8 * 4 + 4 * 7 + 10 * 8    # optional threshold segment after it
+NUM_LAYER1_STEPS  = 8 * 14 * 14                # layer_one {weight_num, row, col}
+NUM_LAYER2_STEPS  = 4 * 7 * 7                  # layer_two {weight_num, row, col}
+NUM_WINDOW_CODES  = 1 << 9                     # distinct 3x3 binary windows
+
+_POPCOUNT9 = np.array([bin(i).count('1') for i in range(NUM_WINDOW_CODES)], dtype=np.uint8)
+_layer_one_luts = {}
+
+# ---------------------------------------------------------------------------
+# Data loaders
+# ---------------------------------------------------------------------------
+
+@profile.timed('data.load_images')
+def load_images(path=IMAGES_PATH):
+    """Return all images in a binarised .ubin file as (N, 28, 28) uint8."""
+    with open(path, 'rb') as f:
+        magic, size, rows, cols = struct.unpack(">IIII", f.read(16))
+        if magic != 2051:
+            raise ValueError(f"Magic number incorrect, should be 2051, was {magic}")
+        bits = np.unpackbits(np.frombuffer(f.read(), dtype=np.uint8))
+    return bits[:size * rows * cols].reshape(size, rows, cols)
+
+
+@profile.timed('data.load_labels')
+def load_labels(path=LABELS_PATH):
+    """Return all labels in a .ubin label file as a uint8 vector."""
+    with open(path, 'rb') as f:
+        magic, _size = struct.unpack(">II", f.read(8))
+        if magic != 2049:
+            raise ValueError(f"Magic number incorrect, should be 2049, was {magic}")
+        return np.frombuffer(f.read(), dtype=np.uint8)
+
+
+def load_provenance(directory=WEIGHTS_DIR):
+    """Return the provenance.json of a weights or data directory, or {}.
+
+    It records how the artifacts were made (seed, run key, dataset hash) so
+    caches and benchmark reports can key on it.
+    """
+    path = os.path.join(directory, PROVENANCE_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def default_seed(seed=None):
+    """seed if given, else $BNN_SEED as an int, else None (unseeded)."""
+    if seed is not None:
+        return int(seed)
+    value = os.environ.get(SEED_ENV, '').strip()
+    return int(value) if value else None
+
+
+def load_csv_bits(path):
+    """Return a comma-separated 0/1 CSV file as a 2-D uint8 array."""
+    with open(path) as f:
+        rows = [[int(x) for x in line.split(',')] for line in f if line.strip()]
+    return np.array(rows, dtype=np.uint8)
+
+
+@profile.timed('data.load_weights')
+def load_weights(weights_dir=WEIGHTS_DIR):
+    """Return (w1, w2, w3) as exported by bnn_retrieve_weights.py.
+
+    w1: (8, 9)     filter -> kr*3 + kc
+    w2: (4, 72)    filter -> (kr*3 + kc)*8 + ch
+    w3: (10, 196)  neuron -> input bit
+
+    Each row is already in registers.sv serial capture order.
+    """
+    w1 = load_csv_bits(os.path.join(weights_dir, 'layer_0_weights.csv'))
+    w2 = load_csv_bits(os.path.join(weights_dir, 'layer_3_weights.csv'))
+    w3 = load_csv_bits(os.path.join(weights_dir, 'layer_7_weights.csv'))
+    assert w1.shape == (8, 9),    f"weight-1: unexpected shape {w1.shape}"
+    assert w2.shape == (4, 72),   f"weight-2: unexpected shape {w2.shape}"
+    assert w3.shape == (10, 196), f"weight-3: unexpected shape {w3.shape}"
+    return w1, w2, w3
+
+# ---------------------------------------------------------------------------
+# RTL index mappings
+# ---------------------------------------------------------------------------
+
+def layer_one_kernels(w1):
+    """Return the (8, 3, 3) kernels layer_one.sv applies to a w1 stream.
+
+    registers.sv stores stream bit s = level*9 + trit*3 + bitt at
+    weights1[trit*24 + bitt*8 + level], and layer_one reads kernel (w, r, c)
+    at the same r*24 + c*8 + w, so this is the trained kernel.
+    """
+    return layouts.unstream(layouts.WEIGHTS1, np.asarray(w1, dtype=np.uint8).reshape(72))
+
+
+def layer_two_kernels(w2):
+    """Return the (4, 3, 3, 8) kernels layer_two.sv applies to a w2 stream."""
+    return layouts.unstream(layouts.WEIGHTS2, np.asarray(w2, dtype=np.uint8).reshape(288))
+
+
+def layer_one_view(images):
+    """Return images as seen through layer_one's pixel port."""
+    images = np.asarray(images, dtype=np.uint8)
+    return layouts.unstream(layouts.PIXELS, images.reshape(len(images), -1))
+
+# ---------------------------------------------------------------------------
+# Layers
+# ---------------------------------------------------------------------------
+
+def _match_counts(x, kernels):
+    """XNOR-popcount of every 3x3 window against every kernel.
+
+    x:       (N, H, W, C) 0/1 feature map, zero-padded at the borders
+    kernels: (F, 3, 3, C) 0/1 weights
+    returns  (N, F, H, W) uint8 count of matching bits
+    """
+    n, h, w, _c = x.shape
+    xp = np.zeros((n, h + 2, w + 2, x.shape[3]), dtype=np.uint8)
+    xp[:, 1:-1, 1:-1] = x
+    out = np.zeros((n, kernels.shape[0], h, w), dtype=np.uint8)
+    for kr in range(3):
+        for kc in range(3):
+            patch = xp[:, kr:kr + h, kc:kc + w, :]
+            for f in range(kernels.shape[0]):
+                out[:, f] += (patch == kernels[f, kr, kc]).sum(axis=-1, dtype=np.uint8)
+    return out
+
+
+def _threshold_pool(counts, thresholds):
+    """Batch-norm threshold followed by 2x2 max-pool (an OR of four bits)."""
+    t = np.asarray(thresholds, dtype=np.uint8)[None, :, None, None]
+    fired = counts >= t
+    n, f, h, w = fired.shape
+    return fired.reshape(n, f, h // 2, 2, w // 2, 2).any(axis=(3, 5)).astype(np.uint8)
+
+
+def window_codes(images):
+    """9-bit code of the zero-padded 3x3 window around every pixel.
+
+    Bit kr*3 + kc of the code is the pixel at (r + kr - 1, c + kc - 1), so
+    (N, 28, 28) images give (N, 28, 28) uint16 codes in 0..511.
+    """
+    images = np.asarray(images, dtype=np.uint16)
+    n, h, w = images.shape
+    xp = np.zeros((n, h + 2, w + 2), dtype=np.uint16)
+    xp[:, 1:-1, 1:-1] = images
+    codes = np.zeros((n, h, w), dtype=np.uint16)
+    for kr in range(3):
+        for kc in range(3):
+            codes |= xp[:, kr:kr + h, kc:kc + w] << (kr * 3 + kc)
+    return codes
+
+
+def layer_one_lut(w1, thresholds=LAYER1_THRESHOLDS, counts=False):
+    """(512, 8) table of layer_one's result for every window code.
+
+    Entry [code, f] is whether filter f fires (popcount >= threshold) on the
+    window `code` (see window_codes()), or with counts=True the XNOR popcount
+    itself. Tables are memoized per weight set and read-only.
+    """
+    w1 = np.ascontiguousarray(w1, dtype=np.uint8)
+    key = (w1.tobytes(), tuple(thresholds), counts)
+    lut = _layer_one_luts.get(key)
+    if lut is None:
+        kernels = layer_one_kernels(w1).reshape(8, 9).astype(np.uint16)
+        kernel_codes = (kernels << np.arange(9, dtype=np.uint16)).sum(axis=1, dtype=np.uint16)
+        codes = np.arange(NUM_WINDOW_CODES, dtype=np.uint16)
+        lut = _POPCOUNT9[~(codes[:, None] ^ kernel_codes[None, :]) & (NUM_WINDOW_CODES - 1)]
+        if not counts:
+            lut = (lut >= np.asarray(thresholds, dtype=np.uint8)).astype(np.uint8)
+        lut.flags.writeable = False
+        _layer_one_luts[key] = lut
+    return lut
+
+
+def layer_one_rom(w1, thresholds=LAYER1_THRESHOLDS):
+    """layer_one_lut() packed one byte per window code, bit f = filter f."""
+    return np.packbits(layer_one_lut(w1, thresholds), axis=1, bitorder='little')[:, 0]
+
+
+@profile.timed('model.layer_one')
+def layer_one(images, w1, thresholds=LAYER1_THRESHOLDS):
+    """Return layer_one_out as (N, 1568) bits, index w*196 + r*14 + c.
+
+    Each pixel's 3x3 window code is looked up in layer_one_rom(), giving
+    all eight filters' threshold bits in one byte; the 2x2 max-pool is an
+    OR of four bytes.
+    """
+    fired = layer_one_rom(w1, thresholds)[window_codes(layer_one_view(images))]
+    pooled = fired[:, 0::2, 0::2] | fired[:, 0::2, 1::2] | fired[:, 1::2, 0::2] | fired[:, 1::2, 1::2]
+    bits = np.unpackbits(pooled[..., None], axis=-1, bitorder='little')
+    return layouts.LAYER1_OUT.producer.pack(bits.transpose(0, 3, 1, 2))
+
+
+def layer_one_reference(images, w1, thresholds=LAYER1_THRESHOLDS):
+    """layer_one() computed window by window, without the lookup table."""
+    pixels = layer_one_view(images)[..., None]
+    kernels = layer_one_kernels(w1)[..., None]
+    pooled = _threshold_pool(_match_counts(pixels, kernels), thresholds)
+    return layouts.LAYER1_OUT.producer.pack(pooled)
+
+
+@profile.timed('model.layer_two')
+def layer_two(l1_out, w2, thresholds=LAYER2_THRESHOLDS):
+    """Return layer_two_out as (N, 196) bits, index (r*7 + c)*4 + wn.
+
+    layer_two.sv reads channel ch of position (r, c) at ch*196 + r*14 + c,
+    the order layer_one writes, and writes its output in the (7, 7, 4)
+    Flatten() order the dense weights were trained on.
+    """
+    fmap = layouts.LAYER1_OUT.consumer.unpack(np.asarray(l1_out, dtype=np.uint8))
+    kernels = layer_two_kernels(w2)
+    pooled = _threshold_pool(_match_counts(fmap.transpose(0, 2, 3, 1), kernels), thresholds)
+    return layouts.LAYER2_OUT.pack(pooled)
+
+
+def dense_matches(l2_out, w3):
+    """Return the (N, 10, 196) XNOR vectors of final_layer_sequential."""
+    return np.asarray(l2_out, dtype=np.uint8)[:, None, :] == np.asarray(w3, dtype=np.uint8)[None]
+
+
+@profile.timed('model.dense')
+def dense_popcounts(l2_out, w3):
+    """Return the (N, 10) popcounts of final_layer_sequential."""
+    return dense_matches(l2_out, w3).sum(axis=-1, dtype=np.int32)
+
+
+def argmax_first(scores):
+    """Winner of the comparison tree: ties resolve to the lowest index."""
+    return np.argmax(scores, axis=-1)
+
+
+def dense_scores(popcounts, thresholds=DENSE_THRESHOLDS):
+    """Return the (..., 10) scores final_layer_sequential ranks.
+
+    Neuron n scores popcount + (255 - thresholds[n]), the 9-bit unsigned form
+    of popcount - threshold: the batch-norm offset of the output layer.
+    All-zero thresholds rank the raw popcounts.
+    """
+    offset = 255 - np.asarray(thresholds, dtype=np.int32)
+    return np.asarray(popcounts, dtype=np.int32) + offset
+
+
+def predict(images, weights, batch_size=1000, *, thresholds1=LAYER1_THRESHOLDS,
+            thresholds2=LAYER2_THRESHOLDS, thresholds3=DENSE_THRESHOLDS):
+    """Return (predictions, popcounts) for a batch of images.
+
+    weights is the (w1, w2, w3) tuple from load_weights(); thresholds1 /
+    thresholds2 / thresholds3 default to the compiled-in ones (bnn_params.sv)
+    and may be anything the serial threshold segment can load. Predictions
+    rank dense_scores(); the popcounts are the raw ones.
+    """
+    w1, w2, w3 = weights
+    preds, pops = [], []
+    for start in range(0, len(images), batch_size):
+        l1 = layer_one(images[start:start + batch_size], w1, thresholds1)
+        l2 = layer_two(l1, w2, thresholds2)
+        pc = dense_popcounts(l2, w3)
+        preds.append(argmax_first(dense_scores(pc, thresholds3)))
+        pops.append(pc)
+    return np.concatenate(preds), np.concatenate(pops)
+
+# ---------------------------------------------------------------------------
+# Dense-layer cycle model
+# ---------------------------------------------------------------------------
+
+@profile.timed('model.dense_layer3_cycles')
+def dense_layer3_cycles(l2_out, w3, chunk_bits=None, early_exit=False,
+                        thresholds=DENSE_THRESHOLDS):
+    """Cycles spent in s_LAYER_3 per image for final_layer_sequential.
+
+    Mirrors the RTL: each cycle accumulates one CHUNK_BITS slice of the
+    XNOR vector; with EARLY_EXIT the registered partial popcounts are
+    checked first (from the first cycle, before any chunk is accumulated),
+    and the layer finishes as soon as no other neuron could reach the
+    leader even if it matched every remaining bit. Partial sums carry the
+    dense offsets of dense_scores() throughout, so offsets spread by more
+    than the remaining bits can exit before the first chunk. The FSM needs
+    one extra edge to leave the state after layer_3_done rises.
+
+    The shapes come from w3 (neurons, inputs), so bnn_explore.py prices
+    other dense widths with the same model; chunk_bits=None is one chunk.
+
+    Returns (cycles, predictions).
+    """
+    matches = dense_matches(l2_out, w3)
+    n, neurons, inputs = matches.shape
+    chunk_bits = chunk_bits or inputs
+    num_chunks = -(-inputs // chunk_bits)
+    padded = np.zeros((n, neurons, num_chunks * chunk_bits), dtype=np.int32)
+    padded[..., :inputs] = matches
+    # partial[:, :, c]: scores after c chunks (c = 0: the offsets alone)
+    partial = np.zeros((n, neurons, num_chunks + 1), dtype=np.int32)
+    partial[..., 1:] = padded.reshape(n, neurons, num_chunks, chunk_bits).sum(axis=-1).cumsum(axis=-1)
+    partial = dense_scores(partial.transpose(0, 2, 1), thresholds).transpose(0, 2, 1)
+
+    cycles = np.full(n, num_chunks + 1, dtype=np.int32)
+    consumed = np.full(n, num_chunks, dtype=np.int32)
+    if early_exit:
+        undecided = np.ones(n, dtype=bool)
+        for c in range(num_chunks):
+            acc = partial[:, :, c]
+            leader = argmax_first(acc)
+            best = acc[np.arange(n), leader]
+            remaining = inputs - c * chunk_bits
+            others = acc + remaining < best[:, None]
+            others[np.arange(n), leader] = True
+            safe = undecided & others.all(axis=1)
+            cycles[safe] = c + 2
+            consumed[safe] = c
+            undecided &= ~safe
+
+    final = partial[np.arange(n), :, consumed]
+    return cycles, argmax_first(final)
+
+
+@profile.timed('model.state_cycles')
+def state_cycles(l2_out, w3, pipe_stages=0, chunk_bits=NUM_DENSE_INPUTS,
+                 early_exit=False, threshold_segment=False, thresholds3=DENSE_THRESHOLDS):
+    """Cycles spent in each FSM state per image, as counted by perf_counters.
+
+    s_LOAD lasts until the last weight bit is captured plus one edge for the
+    FSM to see load_done (pixels load in parallel with the weights); a load
+    with threshold_segment streams NUM_THRESHOLD_BITS more.
+    layer_one / layer_two step once per output position, take one edge to
+    raise done and one for the FSM to leave, plus PIPE_STAGES - 1 edges to
+    drain the pipeline. s_LAYER_3 comes from dense_layer3_cycles().
+
+    Returns a dict of int arrays keyed 'load', 'layer_1', 'layer_2',
+    'layer_3', 'total'.
+    """
+    n = l2_out.shape[0]
+    drain = max(pipe_stages - 1, 0)
+    layer_3, _ = dense_layer3_cycles(l2_out, w3, chunk_bits, early_exit, thresholds3)
+    cycles = {
+        'load':    np.full(n, NUM_WEIGHT_BITS + threshold_segment * NUM_THRESHOLD_BITS + 1,
+                           dtype=np.int32),
+        'layer_1': np.full(n, NUM_LAYER1_STEPS + 2 + drain, dtype=np.int32),
+        'layer_2': np.full(n, NUM_LAYER2_STEPS + 2 + drain, dtype=np.int32),
+        'layer_3': layer_3,
+    }
+    cycles['total'] = sum(cycles.values())
+    return cycles
@@ -0,0 +1,432 @@
+"""
+Declarative bit layouts for every tensor that crosses a port of the design.
+
+A Layout names the logical axes of a tensor, in the order the trained model
+(and weights/*.csv) uses them, and says how the RTL flattens them into a
+bit vector:
+
+    Layout('weights1 (registers.sv)',
+           dims=(('filter', 8), ('row', 3), ('col', 3)),
+           order=('row', 'col', 'filter'))
+
+puts element [f, r, c] at bit r*24 + c*8 + f (the first axis in `order`
+varies slowest). `reversed=True` describes a module reading the vector
+through a [0:N-1] port, where its index i is the top-level bit N-1-i.
+
+Each serially loaded register is a Port: the order registers.sv's counters
+walk (`stream`), where it writes each bit (`register`) and where the
+consuming module reads each logical element (`consumer`). From these the
+stream packer and unpacker are generated, so the bits a layer actually uses
+are always the trained tensor whatever the three orders are, and check()
+verifies that the descriptors consume every captured bit exactly once.
+Interfaces do the same for the layer-to-layer vectors, which must agree
+exactly.
+
+Those two checks only prove the descriptors consistent with each other.
+check_rtl() ties them to the source: it reads each index expression the
+RTL uses (registers.sv captures, layer_one pix_idx / wt_idx / out_idx,
+layer_two get_pixel / conv / out_idx), evaluates it over the axes and
+compares it with the descriptor's index_map(), and it requires every
+combinational layer-output write to be gated on its valid bit, so the
+FSM's idle tag after the last filter cannot alias a real output. The
+counter walk order (Port.stream) and flatten_layer's flat data_in /
+weights_in pairing are still taken from the descriptors.
+
+`python3 bnn_layouts.py` prints the check for the whole design.
+"""
+
+from collections import namedtuple
+
+import ast
+import operator
+import os
+import re
+
+import numpy as np
+
+RTL_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+class Layout(namedtuple('Layout', 'name dims order reversed')):
+    """Flattening of a tensor with named axes into a bit vector."""
+
+    def __new__(cls, name, dims, order=None, reversed=False):
+        dims  = tuple(dims)
+        order = tuple(order) if order else tuple(axis for axis, _ in dims)
+        assert sorted(order) == sorted(axis for axis, _ in dims), f"{name}: order must list every axis"
+        return super().__new__(cls, name, dims, order, reversed)
+
+    @property
+    def axes(self):
+        return tuple(axis for axis, _ in self.dims)
+
+    @property
+    def shape(self):
+        return tuple(size for _, size in self.dims)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    def index_map(self):
+        """Flat bit index of every element, as an array of the logical shape."""
+        sizes = dict(self.dims)
+        grids = np.indices(self.shape)
+        flat  = np.zeros(self.shape, dtype=np.int64)
+        for axis in self.order:
+            flat = flat * sizes[axis] + grids[self.axes.index(axis)]
+        return self.size - 1 - flat if self.reversed else flat
+
+    def pack(self, tensor):
+        """(..., *shape) tensor -> (..., size) bit vectors."""
+        tensor = np.asarray(tensor)
+        lead = tensor.shape[:tensor.ndim - len(self.shape)]
+        flat = np.zeros(lead + (self.size,), dtype=tensor.dtype)
+        flat[..., self.index_map().ravel()] = tensor.reshape(lead + (-1,))
+        return flat
+
+    def unpack(self, flat):
+        """(..., size) bit vectors -> (..., *shape) tensor."""
+        flat = np.asarray(flat)
+        return flat[..., self.index_map().ravel()].reshape(flat.shape[:-1] + self.shape)
+
+
+Port = namedtuple('Port', 'name stream register consumer')
+Port.__doc__ = """A serially loaded register: stream order, capture and consumer layouts.
+
+stream   axes in the order registers.sv's counters walk them (outermost first)
+register Layout of the register as registers.sv writes it
+consumer Layout of the register as the consuming module reads it
+"""
+
+Interface = namedtuple('Interface', 'name producer consumer')
+Interface.__doc__ = "A layer-to-layer vector: written by one module, read by the next."
+
+
+def _stream_order(port):
+    """Register bit written by each stream bit, in stream order."""
+    reg = port.register.index_map()
+    return reg.transpose([port.register.axes.index(a) for a in port.stream]).ravel()
+
+
+def stream_permutation(port):
+    """perm such that stream = tensor.reshape(..., -1)[..., perm].
+
+    Stream bit s lands in register bit r = capture(s); the consumer reads r
+    as logical element consumer^-1(r), which is the element to send.
+    """
+    logical_of_reg = np.empty(port.consumer.size, dtype=np.int64)
+    logical_of_reg[port.consumer.index_map().ravel()] = np.arange(port.consumer.size)
+    return logical_of_reg[_stream_order(port)]
+
+
+def stream(port, tensor):
+    """Serial stream that makes the consumer see `tensor` (batched on leading axes)."""
+    tensor = np.asarray(tensor)
+    n = len(port.consumer.shape)
+    flat = tensor.reshape(tensor.shape[:tensor.ndim - n] + (-1,))
+    return flat[..., stream_permutation(port)]
+
+
+def unstream(port, bits):
+    """Inverse of stream(): the tensor a serial stream presents to the consumer."""
+    bits = np.asarray(bits)
+    out = np.empty_like(bits)
+    out[..., stream_permutation(port)] = bits
+    return out.reshape(bits.shape[:-1] + port.consumer.shape)
+
+
+def check(port):
+    """List of problems with a Port (empty if every captured bit is consumed once)."""
+    problems = []
+    size = port.register.size
+    written = np.bincount(_stream_order(port), minlength=size)
+    read    = np.bincount(port.consumer.index_map().ravel(), minlength=size)
+    if port.consumer.size != size:
+        problems.append(f"{port.name}: consumer reads {port.consumer.size} bits of a {size}-bit register")
+    if np.any(written != 1):
+        problems.append(f"{port.name}: {int(np.sum(written == 0))} register bits never written, "
+                        f"{int(np.sum(written > 1))} written more than once")
+    unread = np.flatnonzero(written & (read[:size] == 0))
+    if len(unread):
+        problems.append(f"{port.name}: {len(unread)} captured bits never consumed, first {unread[:8].tolist()}")
+    if np.any(read > 1):
+        problems.append(f"{port.name}: {int(np.sum(read > 1))} register bits read as more than one element")
+    return problems
+
+
+def check_interface(iface):
+    """List of problems with an Interface (empty if both ends use the same layout)."""
+    p, c = iface.producer, iface.consumer
+    if p.shape != c.shape or p.axes != c.axes:
+        return [f"{iface.name}: {p.name} is {p.dims}, {c.name} expects {c.dims}"]
+    moved = int(np.sum(p.index_map() != c.index_map()))
+    if moved:
+        return [f"{iface.name}: {c.name} reads {moved} of {p.size} bits from a different "
+                f"position than {p.name} writes them ({p.order} vs {c.order})"]
+    return []
+
+# ---------------------------------------------------------------------------
+# The design (keep in sync with registers.sv, layer_one.sv, layer_two.sv and
+# flatten_layer.sv; the layer testbench generators refuse to run if
+# check_all() reports a problem)
+# ---------------------------------------------------------------------------
+
+PIXEL_DIMS    = (('row', 28), ('col', 28))
+W1_DIMS       = (('filter', 8), ('row', 3), ('col', 3))
+W2_DIMS       = (('filter', 4), ('row', 3), ('col', 3), ('chan', 8))
+L1_OUT_DIMS   = (('chan', 8), ('row', 14), ('col', 14))
+L2_OUT_DIMS   = (('chan', 4), ('row', 7), ('col', 7))
+
+# layer_two_out, as written by layer_two.sv out_idx(): (r*7 + c)*4 + wn
+LAYER2_OUT = Layout('layer_two_out (layer_two.sv)', L2_OUT_DIMS, order=('row', 'col', 'chan'))
+
+# Dense weights: one row per neuron over the trained Flatten() order of the
+# (7, 7, 4) layer-2 map; flatten_layer.sv pairs weights_in[n*196 + i] with
+# data_in[i] = layer_two_out[i]
+W3_DIMS = (('neuron', 10),) + tuple((a, s) for a, s in zip(('row', 'col', 'chan'), (7, 7, 4)))
+
+PIXELS = Port(
+    'pixels',
+    stream=('row', 'col'),
+    register=Layout('pixels (registers.sv)', PIXEL_DIMS),
+    consumer=Layout('pixels (layer_one.sv pix_idx)', PIXEL_DIMS),
+)
+
+WEIGHTS1 = Port(
+    'weights1',
+    stream=('filter', 'row', 'col'),                    # level, trit, bitt
+    register=Layout('weights1 (registers.sv)', W1_DIMS, order=('row', 'col', 'filter')),
+    consumer=Layout('weights (layer_one.sv wt_idx)', W1_DIMS, order=('row', 'col', 'filter')),
+)
+
+WEIGHTS2 = Port(
+    'weights2',
+    stream=('filter', 'row', 'col', 'chan'),            # level1, trit1, bitt1, chan1
+    register=Layout('weights2 (registers.sv)', W2_DIMS),
+    consumer=Layout('weights (layer_two.sv conv)', W2_DIMS),
+)
+
+WEIGHTS3 = Port(
+    'weights3',
+    stream=('neuron', 'row', 'col', 'chan'),            # neuron_w3, bit_w3
+    register=Layout('weights3 (registers.sv)', W3_DIMS),
+    consumer=Layout('weights_in (flatten_layer.sv)', W3_DIMS, order=('neuron',) + LAYER2_OUT.order),
+)
+
+LAYER1_OUT = Interface(
+    'layer_one_out -> layer_two',
+    producer=Layout('layer_one_out (layer_one.sv out_idx)', L1_OUT_DIMS),
+    consumer=Layout('pixels (layer_two.sv get_pixel)', L1_OUT_DIMS),
+)
+
+LAYER2_TO_DENSE = Interface(
+    'layer_two_out -> flatten_layer',
+    producer=LAYER2_OUT,
+    consumer=Layout('data_in (flatten_layer.sv)', L2_OUT_DIMS, order=('row', 'col', 'chan')),
+)
+
+PORTS      = (PIXELS, WEIGHTS1, WEIGHTS2, WEIGHTS3)
+INTERFACES = (LAYER1_OUT, LAYER2_TO_DENSE)
+
+# ---------------------------------------------------------------------------
+# The descriptors against the RTL source
+# ---------------------------------------------------------------------------
+
+RtlIndex = namedtuple('RtlIndex', 'layout file pattern names defs')
+RtlIndex.__doc__ = """Where the RTL computes a layout's bit index.
+
+pattern  regex whose one group is the index expression (must match once)
+names    SV identifier -> axis, or a tuple of axes for a flat mixed-radix index
+defs     SV identifier -> regex of its definition, substituted in first
+"""
+
+RTL_INDEXES = (
+    RtlIndex(PIXELS.register, 'registers.sv', r'\bpixels\[([^\]]+)\]\s*<=\s*sync_out_pixel',
+             {'row': 'row', 'col': 'col'}, {}),
+    RtlIndex(WEIGHTS1.register, 'registers.sv', r'\bweights1\[([^\]]+)\]\s*<=',
+             {'level': 'filter', 'trit': 'row', 'bitt': 'col'}, {}),
+    RtlIndex(WEIGHTS2.register, 'registers.sv', r'\bweights2\[([^\]]+)\]\s*<=',
+             {'level1': 'filter', 'trit1': 'row', 'bitt1': 'col', 'chan1': 'chan'}, {}),
+    RtlIndex(WEIGHTS3.register, 'registers.sv', r'\bweights3\[([^\]]+)\]\s*<=',
+             {'neuron_w3': 'neuron', 'bit_w3': ('row', 'col', 'chan')}, {}),
+    RtlIndex(PIXELS.consumer, 'layer_one.sv', r'\bpix_idx\s*=\s*([^;]+);',
+             {'r': 'row', 'c': 'col'}, {}),
+    RtlIndex(WEIGHTS1.consumer, 'layer_one.sv', r'\bwt_idx\s*=\s*([^;]+);',
+             {'w': 'filter', 'r': 'row', 'c': 'col'}, {}),
+    RtlIndex(LAYER1_OUT.producer, 'layer_one.sv', r'\bout_idx\s*=\s*([^;]+);',
+             {'w': 'chan', 'r': 'row', 'c': 'col'}, {}),
+    RtlIndex(LAYER1_OUT.consumer, 'layer_two.sv', r'=\s*pixels\[([^\]]+)\]',
+             {'i': 'chan', 'r': 'row', 'c': 'col'}, {'base': r'\bbase\s*=\s*([^;]+);'}),
+    RtlIndex(LAYER2_OUT, 'layer_two.sv', r'\btmp\s*=\s*([^;]+);',
+             {'wn': 'chan', 'r': 'row', 'c': 'col'}, {}),
+)
+
+# Combinational (PIPE_STAGES = 0) writes of the layer outputs
+GATED_WRITES = (('layer_one.sv', 'layer_one_out'), ('layer_two.sv', 'layer_two_out'))
+
+_BINOPS = {ast.Add: operator.add, ast.Mult: operator.mul}
+
+
+def rtl_source(name):
+    """Text of src/<name> with // comments removed."""
+    with open(os.path.join(RTL_DIR, name)) as f:
+        return re.sub(r'//[^\n]*', '', f.read())
+
+
+def _match_once(text, pattern, what):
+    found = re.findall(pattern, text)
+    if len(found) != 1:
+        raise ValueError(f"{what}: expected one match of {pattern!r}, found {len(found)}")
+    return found[0].strip()
+
+
+def _evaluate(layout, expr, names):
+    """Evaluate an SV index expression (identifiers, integers, + * and
+    parentheses) over every element of layout; (shape) int array."""
+    sizes = dict(layout.dims)
+    grids = dict(zip(layout.axes, np.indices(layout.shape)))
+    env = {}
+    for ident, axes in names.items():
+        if isinstance(axes, str):
+            env[ident] = grids[axes]
+        else:
+            flat = 0
+            for axis in axes:
+                flat = flat * sizes[axis] + grids[axis]
+            env[ident] = flat
+
+    def value(node):
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+            return _BINOPS[type(node.op)](value(node.left), value(node.right))
+        if isinstance(node, ast.Name) and node.id in env:
+            return env[node.id]
+        if isinstance(node, ast.Constant) and type(node.value) is int:
+            return node.value
+        raise ValueError(f"{layout.name}: cannot evaluate {expr!r}")
+
+    return np.asarray(value(ast.parse(expr.strip(), mode='eval').body), dtype=np.int64)
+
+
+def rtl_index_map(entry):
+    """index_map() of entry.layout as the RTL source computes it."""
+    text = rtl_source(entry.file)
+    expr = _match_once(text, entry.pattern, entry.file)
+    for ident, pattern in entry.defs.items():
+        expr = re.sub(rf'\b{ident}\b', f"({_match_once(text, pattern, entry.file)})", expr)
+    return _evaluate(entry.layout, expr, entry.names)
+
+
+def _conv_weight_map():
+    """WEIGHTS2.consumer as layer_two.sv conv() slices it: the nine
+    weights[wn*72 + K +: 8] XNORs in kernel order, channel ch at bit K + ch."""
+    layout = WEIGHTS2.consumer
+    text = rtl_source('layer_two.sv')
+    offsets = [int(k) for k in re.findall(r'\bweights\[\s*wn\s*\*\s*72\s*\+\s*(\d+)\s*\+:\s*8\s*\]', text)]
+    if len(offsets) != 9:
+        raise ValueError(f"layer_two.sv: expected 9 conv weight slices, found {len(offsets)}")
+    f, r, c, ch = np.indices(layout.shape)
+    return f * 72 + np.asarray(offsets)[r * 3 + c] + ch
+
+
+_GATE_TOKEN = re.compile(r'\b(begin|end|if|else)\b|;')
+
+
+def _guards_valid(cond):
+    """True for an if condition that holds only while valid_t is high."""
+    high = r"(?<![!~])\bvalid_t\b(?:(?!\s*[=!]=)|\s*==\s*(?:1'b1|1)(?![\w'])|\s*!=\s*(?:1'b0|0)(?![\w']))"
+    return bool(re.search(high, cond)) and '||' not in cond
+
+
+def _ungated_writes(name, vector, text=None):
+    """Blocking out_idx() writes of vector in src/<name> not inside an if on valid_t.
+
+    A structural heuristic, not a proof: it follows begin/end nesting and
+    single-statement if/else bodies in any formatting, and accepts any
+    enclosing condition that conjoins a plain valid_t. That the gate
+    works is exercised by the random-stimulus tb_layer_*_pipelined.sv
+    benches against bnn_hw_model.
+    """
+    text = rtl_source(name) if text is None else text
+    write = re.compile(rf'\b{vector}\s*\[\s*out_idx\s*\([^;]*?\)\s*\]\s*(<?=)')
+    blocks, pending, bad = [], False, []
+    pos = 0
+    while True:
+        tok, hit = _GATE_TOKEN.search(text, pos), write.search(text, pos)
+        if hit and (not tok or hit.start() < tok.start()):
+            if hit.group(1) == '=' and not (pending or any(blocks)):
+                bad.append(text.count('\n', 0, hit.start()) + 1)
+            pos = hit.end()
+            continue
+        if not tok:
+            return bad
+        pos = tok.end()
+        if tok.group(0) == 'if':
+            start = text.index('(', pos)
+            depth, i = 0, start
+            while True:
+                depth += {'(': 1, ')': -1}.get(text[i], 0)
+                if depth == 0:
+                    break
+                i += 1
+            pending = pending or _guards_valid(text[start + 1:i])
+            pos = i + 1
+        elif tok.group(0) == 'else':
+            pending = False
+        elif tok.group(0) == 'begin':
+            blocks.append(pending)
+            pending = False
+        elif tok.group(0) == 'end' and blocks:
+            blocks.pop()
+        else:
+            pending = False
+
+
+def check_rtl():
+    """Problems between the descriptors and the RTL index expressions."""
+    problems = []
+    maps = [(e.layout, e.file, lambda e=e: rtl_index_map(e)) for e in RTL_INDEXES]
+    maps.append((WEIGHTS2.consumer, 'layer_two.sv', _conv_weight_map))
+    for layout, name, compute in maps:
+        try:
+            rtl = compute()
+        except (OSError, ValueError, SyntaxError) as exc:
+            problems.append(f"{layout.name}: cannot read the RTL index ({exc})")
+            continue
+        moved = int(np.sum(rtl != layout.index_map()))
+        if moved:
+            problems.append(f"{layout.name}: {name} indexes {moved} of {layout.size} bits "
+                            f"differently from the descriptor")
+    for name, vector in GATED_WRITES:
+        for line in _ungated_writes(name, vector):
+            problems.append(f"{name}:{line}: combinational {vector} write is not gated on valid_t")
+    return problems
+
+
+def check_all():
+    """Problems across every port and interface of the design, and between
+    the descriptors and the RTL source."""
+    problems = []
+    for port in PORTS:
+        problems += check(port)
+    for iface in INTERFACES:
+        problems += check_interface(iface)
+    return problems + check_rtl()
+
+
+def main():
+    for port in PORTS:
+        identity = np.array_equal(stream_permutation(port), np.arange(port.register.size))
+        print(f"{port.name:<10} {port.register.size:>5} bits  stream "
+              f"{'= trained order' if identity else 'permuted from trained order'}")
+    problems = check_all()
+    for msg in problems:
+        print(f"FAIL: {msg}")
+    print("PASS: every captured bit is consumed once, all interfaces agree and the RTL "
+          "indexes match the descriptors" if not problems
+          else f"FAILED: {len(problems)} problems")
+    return not problems
+
+
+if __name__ == '__main__':
+    raise SystemExit(0 if main() else 1)
@@ -0,0 +1,206 @@
+"""
+Opt-in timing and memory instrumentation for the model, stream builders and
+test harnesses.
+
+Everything here is a no-op unless profiling is switched on, either through
+the environment:
+
+  BNN_PROFILE=1                      per-phase wall-clock timers
+  BNN_PROFILE=tracemalloc            timers + peak Python memory per phase
+  BNN_PROFILE=cprofile               timers + cProfile (top functions in the
+                                     report, stats written to BNN_PROFILE_OUT,
+                                     default bnn_profile.prof)
+  BNN_PROFILE=cprofile,tracemalloc   both
+
+or from the command line, which runs any script with profiling on:
+
+  python3 bnn_profile.py [--cprofile] [--tracemalloc] script.py [args...]
+
+Code marks phases with `with phase('name'):` or the `@timed('name')`
+decorator (plain functions only). `with phase()` also works across awaits
+in cocotb coroutines, so a phase that waits on the simulator includes the
+simulator's time. Nested phases are
+counted in full in both the inner and the outer phase.
+
+report() prints calls, total and mean time, share of the run and peak
+memory per phase. It runs automatically at exit when profiling is on;
+cocotb tests call it with their logger at the end of each test.
+"""
+
+import atexit
+import contextlib
+import functools
+import io
+import os
+import resource
+import sys
+import time
+
+ENV_VAR     = 'BNN_PROFILE'
+OUT_ENV_VAR = 'BNN_PROFILE_OUT'
+TOP_FUNCTIONS = 15
+
+
+class _Phase:
+    __slots__ = ('calls', 'seconds', 'peak')
+
+    def __init__(self):
+        self.calls   = 0
+        self.seconds = 0.0
+        self.peak    = 0          # bytes above the traced memory at entry
+
+
+_enabled     = False
+_tracemalloc = None
+_profiler    = None
+_profile_out = None
+_start       = 0.0
+_phases      = {}
+_stack       = []             # [traced memory at entry, highest peak seen inside]
+
+
+def enabled():
+    return _enabled
+
+
+def enable(cprofile=False, tracemalloc=False, out=None):
+    """Switch profiling on for the rest of the process."""
+    global _enabled, _tracemalloc, _profiler, _profile_out, _start
+    if _enabled:
+        return
+    _enabled, _start = True, time.perf_counter()
+    if tracemalloc:
+        import tracemalloc as tm
+        tm.start()
+        _tracemalloc = tm
+    if cprofile:
+        import cProfile
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+        _profile_out = out or os.environ.get(OUT_ENV_VAR, 'bnn_profile.prof')
+    atexit.register(report)
+
+
+def _enter():
+    if _tracemalloc:
+        _stack.append([_tracemalloc.get_traced_memory()[0], 0])
+        _tracemalloc.reset_peak()
+    return time.perf_counter()
+
+
+def _exit(name, start):
+    entry = _phases.get(name)
+    if entry is None:
+        entry = _phases[name] = _Phase()
+    entry.calls   += 1
+    entry.seconds += time.perf_counter() - start
+    if _tracemalloc:
+        base, inner_peak = _stack.pop()
+        peak = max(inner_peak, _tracemalloc.get_traced_memory()[1])
+        entry.peak = max(entry.peak, peak - base)
+        if _stack:
+            _stack[-1][1] = max(_stack[-1][1], peak)
+
+
+@contextlib.contextmanager
+def _timed_phase(name):
+    start = _enter()
+    try:
+        yield
+    finally:
+        _exit(name, start)
+
+
+def phase(name):
+    """Context manager timing one phase (a null context when profiling is off)."""
+    if not _enabled:
+        return contextlib.nullcontext()
+    return _timed_phase(name)
+
+
+def timed(name):
+    """Decorator form of phase(); the check is one global lookup per call."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = _enter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _exit(name, start)
+        return wrapper
+    return decorate
+
+
+def _peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def report(log=print, reset=False):
+    """Log the per-phase breakdown (and cProfile top functions) collected so far."""
+    global _start
+    if not _enabled or not _phases:
+        return
+    wall = time.perf_counter() - _start
+    memory = f", peak RSS {_peak_rss_mb():.1f} MB"
+    if _tracemalloc:
+        memory += f", peak traced {_tracemalloc.get_traced_memory()[1] / 2**20:.1f} MB"
+    lines = [f"BNN profile: {wall:.3f} s wall{memory}",
+             f"  {'phase':<28} {'calls':>7} {'total s':>9} {'mean ms':>9} {'% wall':>7}"
+             + (f" {'peak MB':>8}" if _tracemalloc else "")]
+    for name, p in sorted(_phases.items(), key=lambda kv: -kv[1].seconds):
+        line = (f"  {name:<28} {p.calls:>7} {p.seconds:>9.3f} {1e3 * p.seconds / p.calls:>9.2f}"
+                f" {100.0 * p.seconds / wall if wall else 0.0:>6.1f}%")
+        if _tracemalloc:
+            line += f" {p.peak / 2**20:>8.1f}"
+        lines.append(line)
+    if _profiler:
+        import pstats
+        _profiler.disable()
+        _profiler.dump_stats(_profile_out)
+        text = io.StringIO()
+        pstats.Stats(_profiler, stream=text).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        lines.append(f"cProfile stats written to {_profile_out}; top {TOP_FUNCTIONS} by cumulative time:")
+        lines.extend("  " + l for l in text.getvalue().splitlines() if l.strip())
+        _profiler.enable()
+    log('\n'.join(lines))
+    if reset:
+        _phases.clear()
+        _start = time.perf_counter()
+
+
+def _from_env():
+    value = os.environ.get(ENV_VAR, '').strip().lower()
+    if value in ('', '0', 'off', 'false'):
+        return
+    options = set(value.split(','))
+    enable(cprofile='cprofile' in options, tracemalloc='tracemalloc' in options)
+
+
+_from_env()
+
+
+def main():
+    import argparse
+    import runpy
+    parser = argparse.ArgumentParser(description="Run a script with BNN profiling on")
+    parser.add_argument('--cprofile', action='store_true', help="also collect cProfile stats")
+    parser.add_argument('--tracemalloc', action='store_true', help="also track peak memory per phase")
+    parser.add_argument('--out', help=f"cProfile stats file (default ${OUT_ENV_VAR} or bnn_profile.prof)")
+    parser.add_argument('script')
+    parser.add_argument('args', nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    enable(cprofile=args.cprofile, tracemalloc=args.tracemalloc, out=args.out)
+    sys.argv = [args.script] + args.args
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.script)))
+    with phase('script'):
+        runpy.run_path(args.script, run_name='__main__')
+
+
+if __name__ == '__main__':
+    sys.modules['bnn_profile'] = sys.modules[__name__]   # one instance for the script's imports
+    main()
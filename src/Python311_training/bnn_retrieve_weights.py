@@ -1,12 +1,75 @@
+import json
 import os
 os.environ["TF_USE_LEGACY_KERAS"] = "1"
 import tensorflow as tf
 import numpy as np
 import larq as lq
 
+import bnn_hw_model as hw
+
 output = True
 
-def extract_weights(model):
+# Threshold field widths, by position of the thresholded layer in the model:
+# layer_one.sv, layer_two.sv and the dense offsets of flatten_layer.sv
+# (hw.THRESHOLD_BITS)
+THRESHOLD_BITS = hw.THRESHOLD_BITS
+DEFAULT_THRESHOLD_BITS = 8
+VERIFY_IMAGES = 1000		# verifying-set images checked before writing
+REPORT_NAME = "export_report.json"
+
+def hardware_thresholds(gamma, beta, mean, var, eps, n, bits, offsets=False):
+	"""Popcount thresholds for sign(BatchNorm(x)) after an n-input XNOR layer.
+
+	BatchNorm(x) >= 0 means x >= t_math for gamma > 0 but x <= t_math for
+	gamma < 0; the latter is returned in `invert` so the caller flips that
+	channel's weights (x -> -x, popcount -> n - popcount) and every channel
+	fires on popcount >= threshold. gamma == 0 makes the channel constant.
+
+	Thresholds below 0 always fire and above n never fire, so clamping to
+	[0, n + 1] changes nothing; only when n + 1 does not fit the bits-wide
+	field are high thresholds lossy (listed in notes['lossy']).
+
+	With offsets=True the values are the output layer's ranking offsets
+	(flatten_layer.sv argmax of popcount - threshold) instead. Only the
+	offset t_math of each neuron's BatchNorm is kept; its per-neuron scale
+	gamma / sigma is dropped, so the hardware ranks popcount - t where the
+	model ranks gamma / sigma * (popcount - t). Offsets use the whole
+	bits-wide field, and any offset clamped into it can change the argmax,
+	so every clamped neuron is also listed in notes['lossy'].
+
+	Returns (thresholds, invert, notes).
+	"""
+	gamma, beta, mean, var = (np.asarray(a, dtype=np.float64) for a in (gamma, beta, mean, var))
+	invert = gamma < 0
+	with np.errstate(divide='ignore', invalid='ignore'):
+		t_math = mean - (beta * np.sqrt(var + eps) / gamma)
+		t_math = np.where(invert, -t_math, t_math)
+		t = np.ceil((t_math + n) / 2)
+	t = np.where(gamma == 0, np.where(beta >= 0, 0, n + 1), t)
+	limit = (1 << bits) - 1 if offsets else min(n + 1, (1 << bits) - 1)
+	thresholds = np.clip(t, 0, limit).astype(int)
+	clamped = np.flatnonzero(thresholds != t)
+	lossy = clamped if offsets else np.flatnonzero((t > limit) & (limit < n + 1))
+	notes = dict(inputs=int(n), bits=bits, offsets=offsets,
+	             inverted=np.flatnonzero(invert).tolist(),
+	             constant=np.flatnonzero(gamma == 0).tolist(),
+	             clamped={int(c): [float(t[c]), int(thresholds[c])] for c in clamped},
+	             lossy=lossy.tolist())
+	return thresholds, invert, notes
+
+def export_arrays(model):
+	"""Binarized weights and hardware thresholds of every quantized layer.
+
+	Returns one dict per QuantConv2D / QuantDense layer, in model order:
+	index (layer index), weights (output-major 0/1 array: conv (F, kh, kw, C),
+	dense (units, inputs)) and thresholds (integer popcount thresholds from
+	the following BatchNormalization, or None). Channels with a negative
+	BatchNorm scale have their weights inverted (see hardware_thresholds());
+	in the output layer that keeps popcount - threshold ranking like the
+	BatchNorm output. threshold_notes records that and any clamping.
+	"""
+	layers = []
+	quantized = [i for i, l in enumerate(model.layers) if isinstance(l, (lq.layers.QuantConv2D, lq.layers.QuantDense))]
 	for i, layer in enumerate(model.layers):
 
 		if isinstance(layer, (lq.layers.QuantConv2D, lq.layers.QuantDense)):
@@ -17,16 +80,7 @@ def extract_weights(model):
 				binary_w = np.transpose(binary_w, (3,0,1,2))
 			else:
 				binary_w = np.transpose(binary_w)
-		
-			filename = f"./src/Python311_training/weights/layer_{i}_weights.csv"
-			if output:
-				with open(filename, "w") as file:
-					for neuron_weights in binary_w:
-						bit_string = ",".join(map(str, neuron_weights.flatten()))
-						file.write(f"{bit_string}\n")
-			print(f"Created {filename} with shape {binary_w.shape}")
-			print(f"strides: {layer}")
-
+			layers.append(dict(index=i, weights=binary_w, thresholds=None))
 
 		if isinstance(layer, tf.keras.layers.BatchNormalization):
 			prev = model.layers[i-1]
@@ -41,32 +95,132 @@ def extract_weights(model):
 					gamma, beta, mean, var = weights
 				eps = layer.epsilon
 
-				N = np.prod(prev.get_weights()[0].shape[:-1])
-				t_math = mean - (beta * np.sqrt(var + eps) / gamma)
-				t_hardware = np.ceil((t_math + N) / 2).astype(int)
-				#print(f"Layer: {i}, n: {N} t_math: {t_math} t_hardware: {t_hardware}")
-
-				if (output):
-					filename = f"./src/Python311_training/weights/layer_{i}_thresholds.csv"
-					with open(filename, 'w') as file:
-						for t in t_hardware:
-							file.write(f"{t:08b}\n")
-				print(f"Created {filename} (Thresholds for {prev.name})")
-
-model_path = "./src/Python311_training/mnist_bnn_unconverted.h5"
-larq_custom_objects = {
-	"QuantConv2D": lq.layers.QuantConv2D,
-	"QuantDense": lq.layers.QuantDense,
-	"ste_sign": lq.quantizers.ste_sign,
-	"weight_clip": lq.constraints.weight_clip
-}
-
-if os.path.exists(model_path):
-	model = tf.keras.models.load_model(model_path, custom_objects=larq_custom_objects)
-	model.summary()
-	print(f"Model loaded for extraction: {model_path}")
-else:
-	print(f"Model not loaded for extraction :(\n")
-	exit()
-
-extract_weights(model)
\ No newline at end of file
+				N = int(np.prod(prev.get_weights()[0].shape[:-1]))
+				position = sum(l['thresholds'] is not None for l in layers)
+				bits = THRESHOLD_BITS[position] if position < len(THRESHOLD_BITS) else DEFAULT_THRESHOLD_BITS
+				# The output layer's thresholds are ranking offsets, not sign thresholds
+				offsets = i - 1 == quantized[-1]
+				t_hardware, invert, notes = hardware_thresholds(gamma, beta, mean, var, eps, N, bits, offsets)
+				layers[-1]['weights'][invert] ^= 1
+				layers[-1]['thresholds'] = t_hardware
+				layers[-1]['threshold_index'] = i
+				layers[-1]['threshold_notes'] = notes
+	return layers
+
+def verify_export(model, layers, images, labels):
+	"""Accuracy of the model vs. bit-exact inference of the exported arrays.
+
+	The hardware side is bnn_explore.hardware_predict(), the RTL arithmetic
+	(identical to bnn_hw_model.predict() for the shipped 8-4-10 network)
+	with the exported thresholds.
+	"""
+	import bnn_explore as explore
+	pools = [l.pool_size[0] for l in model.layers if isinstance(l, tf.keras.layers.MaxPooling2D)]
+	tf_preds = np.argmax(model.predict(images, verbose=0), axis=1)
+	hw_preds = explore.hardware_predict(images, layers, pools[0] if pools else 2)
+	labels = np.asarray(labels)[:len(images)]
+	model_acc, hw_acc = float(np.mean(tf_preds == labels)), float(np.mean(hw_preds == labels))
+	return dict(images=len(images), model_accuracy=model_acc, hardware_accuracy=hw_acc,
+	            accuracy_delta=hw_acc - model_acc, agreement=float(np.mean(tf_preds == hw_preds)))
+
+def export_report(model, layers, verify=VERIFY_IMAGES):
+	"""Per-layer threshold notes plus verify_export() on the first `verify` verifying images."""
+	report = dict(layers=[dict(index=l['index'], name=model.layers[l['index']].name,
+	                           **({'thresholds': l['threshold_notes']} if 'threshold_notes' in l else {}))
+	                      for l in layers])
+	if verify:
+		images, labels = hw.load_images()[:verify], hw.load_labels()[:verify]
+		report['verification'] = verify_export(model, layers, images, labels)
+	return report
+
+def print_report(report):
+	for layer in report['layers']:
+		notes = layer.get('thresholds')
+		if not notes:
+			continue
+		print(f"{layer['name']}: {notes['inputs']} inputs, {notes['bits']}-bit thresholds"
+		      f", inverted channels {notes['inverted'] or 'none'}"
+		      f", clamped {notes['clamped'] or 'none'}")
+		if notes['lossy'] and notes.get('offsets'):
+			print(f"  WARNING: neurons {notes['lossy']} have dense offsets clamped to the "
+			      f"{notes['bits']}-bit field, which can change the argmax")
+		elif notes['lossy']:
+			print(f"  WARNING: channels {notes['lossy']} need a threshold above the {notes['bits']}-bit field")
+	v = report.get('verification')
+	if v:
+		print(f"Verified on {v['images']} images: model {100 * v['model_accuracy']:.2f} %, "
+		      f"bit-exact hardware {100 * v['hardware_accuracy']:.2f} % "
+		      f"(delta {100 * v['accuracy_delta']:+.2f}, agreement {100 * v['agreement']:.2f} %)")
+
+def extract_weights(model, out_dir="./src/Python311_training/weights", provenance=None, verify=VERIFY_IMAGES):
+	"""Write the weight and threshold CSVs of model to out_dir.
+
+	Before anything is written the export is checked (export_report():
+	sign folding, clamping, and model vs. bit-exact accuracy on `verify`
+	images, 0 to skip); the report is printed and saved as
+	export_report.json.
+
+	provenance (e.g. mnist_bnn's run config: hyperparameters, dataset hash,
+	seed) is written alongside as provenance.json; without it any stale
+	provenance.json in out_dir is removed, so it never describes other weights.
+	"""
+	layers = export_arrays(model)
+	report = export_report(model, layers, verify)
+	print_report(report)
+
+	os.makedirs(out_dir, exist_ok=True)
+	with open(os.path.join(out_dir, REPORT_NAME), 'w') as file:
+		json.dump(report, file, indent=2)
+	provenance_path = os.path.join(out_dir, hw.PROVENANCE_NAME)
+	if provenance is not None:
+		with open(provenance_path, 'w') as file:
+			json.dump(provenance, file, indent=2, sort_keys=True)
+		print(f"Created {provenance_path} (seed {provenance.get('seed')})")
+	elif os.path.exists(provenance_path):
+		os.remove(provenance_path)
+	for layer in layers:
+		binary_w = layer['weights']
+		filename = f"{out_dir}/layer_{layer['index']}_weights.csv"
+		if output:
+			with open(filename, "w") as file:
+				for neuron_weights in binary_w:
+					bit_string = ",".join(map(str, neuron_weights.flatten()))
+					file.write(f"{bit_string}\n")
+		print(f"Created {filename} with shape {binary_w.shape}")
+		print(f"strides: {model.layers[layer['index']]}")
+
+		if layer['thresholds'] is not None:
+			if (output):
+				filename = f"{out_dir}/layer_{layer['threshold_index']}_thresholds.csv"
+				with open(filename, 'w') as file:
+					for t in layer['thresholds']:
+						file.write(f"{t:08b}\n")
+			print(f"Created {filename} (Thresholds for {model.layers[layer['index']].name})")
+
+if __name__ == "__main__":
+	model_path = "./src/Python311_training/mnist_bnn_unconverted.h5"
+	larq_custom_objects = {
+		"QuantConv2D": lq.layers.QuantConv2D,
+		"QuantDense": lq.layers.QuantDense,
+		"ste_sign": lq.quantizers.ste_sign,
+		"weight_clip": lq.constraints.weight_clip
+	}
+
+	if os.path.exists(model_path):
+		model = tf.keras.models.load_model(model_path, custom_objects=larq_custom_objects)
+		model.summary()
+		print(f"Model loaded for extraction: {model_path}")
+	else:
+		print("Model not loaded for extraction :(\n")
+		exit()
+
+	provenance = None
+	provenance_path = os.path.splitext(model_path)[0] + ".json"   # written by mnist_bnn.py --export
+	if os.path.exists(provenance_path):
+		with open(provenance_path) as file:
+			provenance = json.load(file)
+	extract_weights(model, provenance=provenance)
+
+	# Carry the new thresholds into the RTL (src/bnn_params.sv)
+	import bnn_rtl_params as rtl_params
+	rtl_params.write("./src/Python311_training/weights")
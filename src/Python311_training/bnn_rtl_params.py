@@ -0,0 +1,120 @@
+"""
+Generate src/bnn_params.sv, the SystemVerilog package of batch-norm
+thresholds, from the exported weights.
+
+weights/*_thresholds.csv are the single source of truth for the thresholds:
+bnn_hw_model.py reads them (LAYER1_THRESHOLDS / LAYER2_THRESHOLDS /
+DENSE_THRESHOLDS), registers.sv resets its threshold segment to this
+package, and the testbenches use one or the other. bnn_retrieve_weights.py
+regenerates the package after every export, so retrain-to-RTL is a single
+command; by hand:
+
+    python3 bnn_rtl_params.py                       # weights/ -> src/bnn_params.sv
+    python3 bnn_rtl_params.py --weights weights_flipped
+    python3 bnn_rtl_params.py --check               # exit 1 if the package is stale
+
+Thresholds are flat vectors, filter f at [f*BITS +: BITS], so the package
+also compiles with Icarus Verilog's SystemVerilog subset.
+
+The layer shapes are not in the package: layer_one.sv, layer_two.sv,
+flatten_layer.sv and registers.sv are built around them (loop bounds,
+popcount widths, vector widths). check_shapes() refuses an export whose
+shapes differ from RTL_SHAPES instead, so a retrained network that does
+not fit the silicon fails here rather than mismatching silently.
+"""
+
+import argparse
+import os
+import sys
+
+import bnn_hw_model as hw
+
+PACKAGE_PATH = os.path.normpath(os.path.join(hw.HERE, '..', 'bnn_params.sv'))
+
+
+# (filters, inputs per filter) the RTL is built for, per thresholded layer
+RTL_SHAPES = (('layer 1', (8, 3 * 3)),
+              ('layer 2', (4, 3 * 3 * 8)),
+              ('dense',   (hw.NUM_CLASSES, hw.NUM_DENSE_INPUTS)))
+
+
+def check_shapes(weights_dir=hw.WEIGHTS_DIR):
+    """Raise ValueError unless the weights and thresholds fit RTL_SHAPES."""
+    weights = hw.load_weights(weights_dir)
+    thresholds = hw.load_thresholds(weights_dir)
+    for (name, shape), w, t in zip(RTL_SHAPES, weights, thresholds):
+        if w.shape != shape:
+            raise ValueError(f"{name}: weights are {w.shape}, the RTL is built for {shape}")
+        if len(t) != shape[0]:
+            raise ValueError(f"{name}: {len(t)} thresholds for {shape[0]} filters")
+
+
+def _vector(name, values, bits):
+    """A flat localparam, element f at [f*bits +: bits] (listed last to first)."""
+    fields = ', '.join(f"{bits}'d{v}" for v in reversed(values))
+    return (f"    localparam [{len(values) * bits - 1}:0] {name} =\n"
+            f"        {{{fields}}};  // filter {len(values) - 1} .. filter 0")
+
+
+def render(weights_dir=hw.WEIGHTS_DIR):
+    """Text of bnn_params.sv for the weights in weights_dir."""
+    check_shapes(weights_dir)
+    t1, t2, t3 = hw.load_thresholds(weights_dir)
+    bits1, bits2, bits3 = hw.THRESHOLD_BITS
+    source = os.path.relpath(os.path.abspath(weights_dir), os.path.dirname(PACKAGE_PATH))
+    lines = [
+        f"// Generated by Python311_training/bnn_rtl_params.py from {source}/",
+        "// Do not edit: rerun the script (or bnn_retrieve_weights.py) instead.",
+        "//",
+        "// Batch-norm thresholds are flat vectors, filter f at [f*BITS +: BITS];",
+        "// a filter fires when its XNOR popcount is >= its threshold, and the",
+        "// dense layer ranks popcount - threshold per output neuron.",
+        "package bnn_params;",
+        "",
+        _vector('LAYER1_THRESHOLDS', t1, bits1),
+        _vector('LAYER2_THRESHOLDS', t2, bits2),
+        _vector('DENSE_THRESHOLDS', t3, bits3),
+        "",
+        "endpackage",
+        "",
+    ]
+    return '\n'.join(lines)
+
+
+def is_current(weights_dir=hw.WEIGHTS_DIR, path=PACKAGE_PATH):
+    """True if path holds exactly what render(weights_dir) produces."""
+    if not os.path.exists(path):
+        return False
+    with open(path) as f:
+        return f.read() == render(weights_dir)
+
+
+def write(weights_dir=hw.WEIGHTS_DIR, path=PACKAGE_PATH):
+    text = render(weights_dir)
+    with open(path, 'w') as f:
+        f.write(text)
+    t1, t2, t3 = hw.load_thresholds(weights_dir)
+    print(f"Wrote {path}: layer 1 thresholds {list(t1)}, layer 2 thresholds {list(t2)}, "
+          f"dense thresholds {list(t3)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate src/bnn_params.sv from exported weights")
+    parser.add_argument('--weights', default=hw.WEIGHTS_DIR, help="weights directory (default weights/)")
+    parser.add_argument('--output', default=PACKAGE_PATH, help="package file (default src/bnn_params.sv)")
+    parser.add_argument('--check', action='store_true',
+                        help="do not write; exit 1 if the package does not match the weights")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        if not is_current(args.weights, args.output):
+            print(f"{args.output} is stale for {args.weights}: run bnn_rtl_params.py")
+            return 1
+        print(f"{args.output} matches {args.weights}")
+        return 0
+    write(args.weights, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
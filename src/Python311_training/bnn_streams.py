@@ -0,0 +1,151 @@
+"""
+Serial bit streams in the order registers.sv captures them.
+
+The chip loads one pixel bit (ui_in[1]) and one weight bit (ui_in[2]) per
+clock during s_LOAD:
+
+  pixels   784 bits   pixels[row*28 + col], col fastest
+  weights1  72 bits   filter -> kernel row -> kernel col
+  weights2 288 bits   filter -> kernel row -> kernel col -> channel
+  weights3 1960 bits  neuron -> input bit
+
+optionally followed (uio_in[0] high before the load) by the 140-bit
+threshold segment of threshold_stream(), which registers.sv captures in
+place of the compiled-in thresholds until the next reset:
+
+  thresholds1  8 x 4 bits  layer_one filters
+  thresholds2  4 x 7 bits  layer_two filters
+  thresholds3 10 x 8 bits  dense neurons
+
+Each builder packs through the Port in bnn_layouts.py, so the bits a layer
+reads are the trained tensor whatever order registers.sv captures them in.
+With the current RTL that is exactly the row-major order of the image and
+of the weight CSVs written by bnn_retrieve_weights.py. All builders take
+whole batches and return uint8 0/1 arrays.
+
+The weight stream is memoized by a hash of the weights, so a process builds
+it once no matter how many tests or images ask for it.
+"""
+
+import functools
+import hashlib
+
+import numpy as np
+
+import bnn_hw_model as hw
+import bnn_layouts as layouts
+import bnn_profile as profile
+
+PIXEL_BITS  = 28 * 28
+W1_BITS     = 8 * 3 * 3
+W2_BITS     = 4 * 3 * 3 * 8
+W3_BITS     = 10 * hw.NUM_DENSE_INPUTS
+WEIGHT_BITS = W1_BITS + W2_BITS + W3_BITS      # 2320
+THRESHOLD_FIELDS = hw.THRESHOLD_BITS           # bits per value
+THRESHOLD_BITS   = hw.NUM_THRESHOLD_BITS        # 140
+
+_weight_streams = {}
+
+
+@profile.timed('streams.pixel')
+def pixel_streams(images):
+    """(N, 28, 28) or (28, 28) 0/1 images -> (N, 784) streams."""
+    images = np.asarray(images, dtype=np.uint8)
+    return layouts.stream(layouts.PIXELS, images.reshape(-1, 28, 28))
+
+
+def w1_stream(w1):
+    """layer_0 weights (8 filters x 3x3) -> 72 bits, [filter][row][col]."""
+    return layouts.stream(layouts.WEIGHTS1, np.asarray(w1, dtype=np.uint8).reshape(8, 3, 3))
+
+
+def w2_stream(w2):
+    """layer_3 weights (4 filters x 3x3x8) -> 288 bits, [filter][row][col][channel]."""
+    return layouts.stream(layouts.WEIGHTS2, np.asarray(w2, dtype=np.uint8).reshape(4, 3, 3, 8))
+
+
+def w3_stream(w3):
+    """layer_7 weights (10 neurons x 196, Flatten() order) -> 1960 bits, [neuron][bit]."""
+    return layouts.stream(layouts.WEIGHTS3, np.asarray(w3, dtype=np.uint8).reshape(10, 7, 7, 4))
+
+
+def threshold_stream(thresholds1=hw.LAYER1_THRESHOLDS, thresholds2=hw.LAYER2_THRESHOLDS,
+                     thresholds3=hw.DENSE_THRESHOLDS):
+    """Threshold segment -> 140 bits: filter / neuron 0 first, each value LSB first.
+
+    Raises ValueError if a layer has the wrong number of values or one does
+    not fit its field (4, 7 and 8 bits).
+    """
+    fields = []
+    for layer, (values, bits, count) in enumerate(zip((thresholds1, thresholds2, thresholds3),
+                                                      THRESHOLD_FIELDS, (8, 4, 10)), 1):
+        values = np.asarray(values, dtype=np.int64)
+        if values.shape != (count,) or values.min() < 0 or values.max() >= 1 << bits:
+            raise ValueError(f"thresholds{layer}: need {count} values in [0, {(1 << bits) - 1}], "
+                             f"got {values.tolist()}")
+        fields.append(((values[:, None] >> np.arange(bits)) & 1).ravel())
+    stream = np.concatenate(fields).astype(np.uint8)
+    assert len(stream) == THRESHOLD_BITS, f"threshold stream is {len(stream)} bits, expected {THRESHOLD_BITS}"
+    return stream
+
+
+def weights_hash(weights):
+    """Content hash of a (w1, w2, w3) tuple, used as the memo key."""
+    h = hashlib.sha1()
+    for w in weights:
+        w = np.ascontiguousarray(w, dtype=np.uint8)
+        h.update(str(w.shape).encode())
+        h.update(w.tobytes())
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _csv_weights():
+    return hw.load_weights()
+
+
+@profile.timed('streams.weight')
+def weight_stream(weights=None):
+    """2320-bit weight stream; defaults to the weights/*.csv files.
+
+    The returned array is shared between callers and read-only.
+    """
+    if weights is None:
+        weights = _csv_weights()
+    key = weights_hash(weights)
+    stream = _weight_streams.get(key)
+    if stream is None:
+        w1, w2, w3 = weights
+        stream = np.concatenate([w1_stream(w1), w2_stream(w2), w3_stream(w3)])
+        assert len(stream) == WEIGHT_BITS, f"weight stream is {len(stream)} bits, expected {WEIGHT_BITS}"
+        stream.flags.writeable = False
+        _weight_streams[key] = stream
+    return stream
+
+
+def pack(streams):
+    """Pack 0/1 streams MSB-first along the last axis (np.packbits)."""
+    return np.packbits(np.asarray(streams, dtype=np.uint8), axis=-1)
+
+
+def unpack(packed, num_bits):
+    """Inverse of pack()."""
+    return np.unpackbits(np.asarray(packed, dtype=np.uint8), axis=-1)[..., :num_bits]
+
+
+def mem_text(bits):
+    """One bit per line, for $readmemb."""
+    return '\n'.join(map(str, np.asarray(bits, dtype=np.uint8).tolist())) + '\n'
+
+
+@profile.timed('streams.hex_text')
+def hex_text(streams):
+    """One packed hex word per stream, for $readmemh into reg [0:num_bits-1].
+
+    Bit 0 of each stream is the leftmost (most significant) hex digit, so a
+    784-bit pixel stream becomes one 196-digit (98-byte) line.
+    """
+    streams = np.asarray(streams, dtype=np.uint8)
+    streams = streams.reshape(-1, streams.shape[-1])
+    assert streams.shape[-1] % 8 == 0, "hex_text needs a whole number of bytes per stream"
+    return ''.join(row.tobytes().hex() + '\n' for row in pack(streams))
@@ -1,14 +1,32 @@
+import argparse
+import json
 import numpy as np
+import os
 import struct
 from array import array
 from os.path import join
 
+import bnn_hw_model as hw
+
 THRESHOLD = 127
+TRAINING_FRACTION = 0.9
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+input_path = join(HERE, "training_data/")
 
 class MnistDataSaver(object):
-    def __init__(self, training_images_filepath):
+    def __init__(self, training_images_filepath, training_labels_filepath, seed=None):
         self.training_images_filepath = training_images_filepath
-    
+        self.training_labels_filepath = training_labels_filepath
+        # None keeps the original split (first 90 % training, last 10 % verifying);
+        # a seed shuffles the images before splitting, reproducibly
+        self.seed = seed
+
+    def split_order(self, size):
+        if self.seed is None:
+            return np.arange(size)
+        return np.random.default_rng(self.seed).permutation(size)
+
     def save_binary_images(self):
 
         # Read data and make binary
@@ -17,16 +35,16 @@ class MnistDataSaver(object):
             if magic != 2051:
                 raise ValueError(f"Magic number mismatch, expected 2051, got {magic}")
             image_data = np.frombuffer(file.read(), dtype=np.uint8)
-            image_data = (image_data > THRESHOLD).astype(np.uint8)
-            newsize = int(size * 0.9)
-            print(f"size: {size} newsize: {newsize}")
-            image_data1 = image_data[:newsize * rows * cols]
-            image_data2 = image_data[(newsize * rows * cols):]
-            image_data1 = np.packbits(image_data1)
-            image_data2 = np.packbits(image_data2)
+            image_data = (image_data > THRESHOLD).astype(np.uint8).reshape(size, rows * cols)
+            order = self.split_order(size)
+            image_data = image_data[order]
+            newsize = int(size * TRAINING_FRACTION)
+            print(f"size: {size} newsize: {newsize} seed: {self.seed}")
+            image_data1 = np.packbits(image_data[:newsize])
+            image_data2 = np.packbits(image_data[newsize:])
 
         # Write binary training image data
-        with open("training_data/mnist_binary_training.ubin", 'wb') as file:
+        with open(join(input_path, "mnist_binary_training.ubin"), 'wb') as file:
             header = struct.pack(">IIII", magic, newsize, rows, cols)
             file.write(header)
 
@@ -34,7 +52,7 @@ class MnistDataSaver(object):
             print("Successfully saved training data as binary!");
 
         # Write binary verifying image data
-        with open("training_data/mnist_binary_verifying.ubin", 'wb') as file:
+        with open(join(input_path, "mnist_binary_verifying.ubin"), 'wb') as file:
             header = struct.pack(">IIII", magic, size-newsize, rows, cols)
             file.write(header)
 
@@ -43,13 +61,13 @@ class MnistDataSaver(object):
 
         # Write labels for training data
 
-        with open("training_data/train-labels-idx1-ubyte/train-labels.idx1-ubyte", 'rb') as file:
+        with open(self.training_labels_filepath, 'rb') as file:
             magic, size = struct.unpack(">II", file.read(8))
-            labels = np.frombuffer(file.read(), np.uint8)
+            labels = np.frombuffer(file.read(), np.uint8)[order]
             labels_data1 = labels[:newsize]
             labels_data2 = labels[newsize:]
-        
-        with open("training_data/mnist_labels_binary_training.ubin", 'wb') as file:
+
+        with open(join(input_path, "mnist_binary_labels_training.ubin"), 'wb') as file:
             header = struct.pack(">II", magic, newsize)
 
             file.write(header)
@@ -58,16 +76,28 @@ class MnistDataSaver(object):
 
         # Write labels for verifying data
 
-        with open("training_data/mnist_labels_binary_verifying.ubin", 'wb') as file:
+        with open(join(input_path, "mnist_binary_labels_verifying.ubin"), 'wb') as file:
             header = struct.pack(">II", magic, size-newsize)
 
             file.write(header)
             file.write(labels_data2.tobytes())
             print("Successfully saved verifying labels!")
 
-input_path = "training_data/"
-training_images_filepath = join(input_path, 'train-images-idx3-ubyte/train-images.idx3-ubyte')
+        # Record how the split was made, next to the data
+        with open(join(input_path, hw.PROVENANCE_NAME), 'w') as file:
+            json.dump(dict(seed=self.seed, threshold=THRESHOLD, training=newsize, verifying=size-newsize),
+                      file, indent=2, sort_keys=True)
+            print(f"Successfully saved {hw.PROVENANCE_NAME}!")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Binarise MNIST and split it into training and verifying sets")
+    parser.add_argument('--seed', type=int, default=hw.default_seed(),
+                        help="shuffle before splitting with this seed (default $BNN_SEED, else the original contiguous split)")
+    args = parser.parse_args()
+
+    training_images_filepath = join(input_path, 'train-images-idx3-ubyte/train-images.idx3-ubyte')
+    training_labels_filepath = join(input_path, 'train-labels-idx1-ubyte/train-labels.idx1-ubyte')
 
-mnistdatasaver = MnistDataSaver(training_images_filepath, )
+    mnistdatasaver = MnistDataSaver(training_images_filepath, training_labels_filepath, args.seed)
 
-mnistdatasaver.save_binary_images()
+    mnistdatasaver.save_binary_images()
@@ -4,75 +4,559 @@ os.environ["TF_USE_LEGACY_KERAS"] = "1"
 import larq as lq
 import tensorflow as tf
 import numpy as np
+import functools
+import glob
+import hashlib
+import json
+import math
+import re
 import struct
+import time
+
+import bnn_augment as augment
+import bnn_hw_model as hw
 
 # Need larq, tensorflow, tf_keras (for legacy support)
 
-images_training_filepath = "./src/Python311_training/training_data/mnist_binary_training.ubin"
-labels_training_filepath = "./src/Python311_training/training_data/mnist_binary_labels_training.ubin"
-images_verifying_filepath = "./src/Python311_training/training_data/mnist_binary_verifying.ubin"
-labels_verifying_filepath = "./src/Python311_training/training_data/mnist_binary_labels_verifying.ubin"
-
-
-with open(images_training_filepath, 'rb') as file:
-    magic, size, rows, cols = struct.unpack(">IIII", file.read(16))
-    if magic != 2051:
-        raise ValueError(f"Magic number incorrect, should be 2051, was {magic}")
-    training_image_data = np.frombuffer(file.read(), dtype=np.uint8)
-    training_image_data = np.unpackbits(training_image_data)
-    training_images = training_image_data[:size * rows * cols].reshape(size, rows, cols)
-
-with open(labels_training_filepath, 'rb') as file:
-    magic, size = struct.unpack(">II", file.read(8))
-    if magic != 2049:
-        raise ValueError(f"Magic number incorrect, should be 2049, was {magic}")
-    training_labels = np.frombuffer(file.read(), dtype=np.uint8)
-
-with open(images_verifying_filepath, 'rb') as file:
-    magic, size, rows, cols = struct.unpack(">IIII", file.read(16))
-    if magic != 2051:
-        raise ValueError(f"Magic number incorrect, should be 2051, was {magic}")
-    verifying_image_data = np.frombuffer(file.read(), dtype=np.uint8)
-    verifying_image_data = np.unpackbits(verifying_image_data)
-    verifying_images = verifying_image_data[:size * rows * cols].reshape(size, rows, cols)
-
-with open(labels_verifying_filepath, 'rb') as file:
-    magic, size = struct.unpack(">II", file.read(8))
-    if magic != 2049:
-        raise ValueError(f"Magic number incorrect, should be 2049, was {magic}")
-    verifying_labels = np.frombuffer(file.read(), dtype=np.uint8)
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+images_training_filepath = os.path.join(HERE, "training_data/mnist_binary_training.ubin")
+labels_training_filepath = os.path.join(HERE, "training_data/mnist_binary_labels_training.ubin")
+images_verifying_filepath = os.path.join(HERE, "training_data/mnist_binary_verifying.ubin")
+labels_verifying_filepath = os.path.join(HERE, "training_data/mnist_binary_labels_verifying.ubin")
+model_filepath = os.path.join(HERE, "mnist_bnn_unconverted.h5")
+runs_dirpath = os.path.join(HERE, "runs")
+
+larq_custom_objects = {
+    "QuantConv2D": lq.layers.QuantConv2D,
+    "QuantDense": lq.layers.QuantDense,
+    "ste_sign": lq.quantizers.ste_sign,
+    "weight_clip": lq.constraints.weight_clip
+}
+
+# Everything that changes the trained weights; the run cache keys on these
+DEFAULT_HPARAMS = dict(filters=(8, 4), kernel_size=3, pool_size=2, dense_units=(),
+                       epochs=6, batch_size=64, optimizer='adam', learning_rate=1e-3,
+                       schedule='constant', warmup_epochs=0, bop_gamma=1e-4, bop_threshold=1e-8,
+                       distill=0.0, temperature=4.0, augment_shift=0, augment_angle=0, augment_flip=0.0)
+ARCH_HPARAMS = ('filters', 'kernel_size', 'pool_size', 'dense_units')
+# A checkpoint only warm-starts a run that optimizes the same loss the same way
+WARM_START_HPARAMS = ARCH_HPARAMS + ('optimizer', 'learning_rate', 'schedule', 'warmup_epochs',
+                                     'bop_gamma', 'bop_threshold', 'distill', 'temperature')
+
+# --fast: large batches, Bop on the binary kernels (Adam on the BatchNorm
+# parameters), one warmup epoch then cosine decay
+FAST_HPARAMS = dict(batch_size=256, optimizer='bop', learning_rate=1e-2, schedule='cosine',
+                    warmup_epochs=1, bop_gamma=1e-3)
+
+# Float teacher for distillation, cached in runs/teacher-<key>/
+TEACHER_HPARAMS = dict(filters=(32, 64), dense_units=128, epochs=4, batch_size=128)
+
+
+def load_images(filepath):
+    with open(filepath, 'rb') as file:
+        magic, size, rows, cols = struct.unpack(">IIII", file.read(16))
+        if magic != 2051:
+            raise ValueError(f"Magic number incorrect, should be 2051, was {magic}")
+        image_data = np.frombuffer(file.read(), dtype=np.uint8)
+        image_data = np.unpackbits(image_data)
+        return image_data[:size * rows * cols].reshape(size, rows, cols)
+
+
+def load_labels(filepath):
+    with open(filepath, 'rb') as file:
+        magic, size = struct.unpack(">II", file.read(8))
+        if magic != 2049:
+            raise ValueError(f"Magic number incorrect, should be 2049, was {magic}")
+        return np.frombuffer(file.read(), dtype=np.uint8)
+
+
+def load_dataset():
+    """Return (training_images, training_labels, verifying_images, verifying_labels)."""
+    return (load_images(images_training_filepath), load_labels(labels_training_filepath),
+            load_images(images_verifying_filepath), load_labels(labels_verifying_filepath))
+
 
 kwargs = dict(input_quantizer="ste_sign",
               kernel_quantizer="ste_sign",
               kernel_constraint="weight_clip",
               use_bias=False)
 
-#16,4
-model = tf.keras.models.Sequential()
-model.add(lq.layers.QuantConv2D(8, (3,3), kernel_quantizer="ste_sign", kernel_constraint="weight_clip", use_bias=False, padding="same", input_shape=(28,28,1)))
-model.add(tf.keras.layers.BatchNormalization(scale=False))
-model.add(tf.keras.layers.MaxPooling2D((2,2)))
 
+def build_model(filters=(8, 4), kernel_size=3, pool_size=2, dense_units=(), optimizer='adam'):
+    """Conv-BN-pool blocks, optional hidden dense layers, then the 10-way dense output.
+
+    The defaults are the network the hardware implements (8 and 4 filters,
+    3x3 kernels, 2x2 pooling, no hidden dense layer).
+    """
+    model = tf.keras.models.Sequential()
+    model.add(lq.layers.QuantConv2D(filters[0], (kernel_size, kernel_size), kernel_quantizer="ste_sign", kernel_constraint="weight_clip", use_bias=False, padding="same", input_shape=(28,28,1)))
+    model.add(tf.keras.layers.BatchNormalization(scale=False))
+    model.add(tf.keras.layers.MaxPooling2D((pool_size, pool_size)))
+
+    for n in filters[1:]:
+        model.add(lq.layers.QuantConv2D(n, (kernel_size, kernel_size), padding="same", **kwargs))
+        model.add(tf.keras.layers.BatchNormalization(scale=False))
+        model.add(tf.keras.layers.MaxPooling2D((pool_size, pool_size)))
+
+    model.add(tf.keras.layers.Flatten())
+
+    for units in dense_units:
+        model.add(lq.layers.QuantDense(units, **kwargs))
+        model.add(tf.keras.layers.BatchNormalization(scale=False))
+
+    model.add(lq.layers.QuantDense(10, **kwargs))
+    model.add(tf.keras.layers.BatchNormalization(scale=False))
+    model.add(tf.keras.layers.Activation("softmax"))
+
+    model.compile(optimizer=optimizer, loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    return model
+
+
+def build_teacher(filters=(32, 64), dense_units=128):
+    """Float (unbinarized) CNN used as the distillation teacher; outputs logits."""
+    model = tf.keras.models.Sequential()
+    model.add(tf.keras.layers.Reshape((28, 28, 1), input_shape=(28, 28)))
+    for n in filters:
+        model.add(tf.keras.layers.Conv2D(n, (3, 3), padding="same", activation="relu"))
+        model.add(tf.keras.layers.MaxPooling2D((2, 2)))
+    model.add(tf.keras.layers.Flatten())
+    model.add(tf.keras.layers.Dense(dense_units, activation="relu"))
+    model.add(tf.keras.layers.Dense(10))
+    model.compile(optimizer='adam', loss=tf.keras.losses.SparseCategoricalCrossentropy(from_logits=True),
+                  metrics=['accuracy'])
+    return model
+
+# ---------------------------------------------------------------------------
+# Optimizers, learning-rate schedules and distillation
+# ---------------------------------------------------------------------------
+
+@tf.keras.utils.register_keras_serializable(package='bnn')
+class WarmupCosine(tf.keras.optimizers.schedules.LearningRateSchedule):
+    """Linear warmup to peak over warmup_steps, then cosine decay to 0 at total_steps."""
+
+    def __init__(self, peak, total_steps, warmup_steps=0):
+        self.peak = peak
+        self.total_steps = total_steps
+        self.warmup_steps = warmup_steps
+
+    def __call__(self, step):
+        step = tf.cast(step, tf.float32)
+        warmup = self.peak * (step + 1.0) / float(max(self.warmup_steps, 1))
+        progress = (step - self.warmup_steps) / float(max(self.total_steps - self.warmup_steps, 1))
+        cosine = 0.5 * self.peak * (1.0 + tf.cos(math.pi * tf.clip_by_value(progress, 0.0, 1.0)))
+        return tf.where(step < self.warmup_steps, warmup, cosine)
+
+    def get_config(self):
+        return dict(peak=self.peak, total_steps=self.total_steps, warmup_steps=self.warmup_steps)
+
+
+def _schedule(peak, params, steps_per_epoch):
+    if params['schedule'] == 'constant':
+        return peak
+    if params['schedule'] == 'cosine':
+        return WarmupCosine(peak, params['epochs'] * steps_per_epoch,
+                            params['warmup_epochs'] * steps_per_epoch)
+    raise ValueError(f"Unknown schedule {params['schedule']!r}, expected constant or cosine")
+
+
+def make_optimizer(params, steps_per_epoch):
+    """Adam, or larq's Bop on the binary kernels with Adam on everything else.
+
+    Bop flips a binary weight when its gradient moving average (rate
+    bop_gamma) exceeds bop_threshold; the BatchNorm parameters still need a
+    float optimizer. Both rates follow the same schedule.
+    """
+    lr = _schedule(params['learning_rate'], params, steps_per_epoch)
+    if params['optimizer'] == 'adam':
+        return tf.keras.optimizers.Adam(lr)
+    if params['optimizer'] == 'bop':
+        # CaseOptimizer is built on the legacy optimizer API
+        adam = getattr(tf.keras.optimizers, 'legacy', tf.keras.optimizers).Adam(lr)
+        bop = lq.optimizers.Bop(threshold=params['bop_threshold'],
+                                gamma=_schedule(params['bop_gamma'], params, steps_per_epoch))
+        return lq.optimizers.CaseOptimizer((lq.optimizers.Bop.is_binary_variable, bop),
+                                           default_optimizer=adam)
+    raise ValueError(f"Unknown optimizer {params['optimizer']!r}, expected adam or bop")
+
+
+@tf.keras.utils.register_keras_serializable(package='bnn')
+class DistillationLoss(tf.keras.losses.Loss):
+    """(1 - alpha) * CE(label) + alpha * T^2 * KL(teacher_T || student_T).
+
+    y_true rows are [label, 10 teacher logits]. The student ends in a
+    softmax; log(p) equals its logits up to a per-row constant, so
+    softmax(log(p) / T) is the student's softened distribution.
+    """
+
+    def __init__(self, alpha=0.5, temperature=4.0, **kwargs):
+        super().__init__(**kwargs)
+        self.alpha = alpha
+        self.temperature = temperature
+
+    def call(self, y_true, y_pred):
+        t = self.temperature
+        hard = tf.keras.losses.sparse_categorical_crossentropy(y_true[:, 0], y_pred)
+        teacher = tf.nn.softmax(y_true[:, 1:] / t)
+        student = tf.nn.log_softmax(tf.math.log(y_pred + 1e-7) / t)
+        soft = tf.reduce_sum(teacher * (tf.math.log(teacher + 1e-7) - student), axis=-1)
+        return (1.0 - self.alpha) * hard + self.alpha * t * t * soft
+
+    def get_config(self):
+        return dict(super().get_config(), alpha=self.alpha, temperature=self.temperature)
+
+
+@tf.keras.utils.register_keras_serializable(package='bnn')
+def label_accuracy(y_true, y_pred):
+    """Accuracy against the label column of distillation targets."""
+    return tf.keras.metrics.sparse_categorical_accuracy(y_true[:, :1], y_pred)
+
+
+def compile_model(model, params, steps_per_epoch):
+    """Compile with the optimizer, schedule and (distillation) loss of params."""
+    if params['distill']:
+        loss, metrics = DistillationLoss(params['distill'], params['temperature']), [label_accuracy]
+    else:
+        loss, metrics = 'sparse_categorical_crossentropy', ['accuracy']
+    model.compile(optimizer=make_optimizer(params, steps_per_epoch), loss=loss, metrics=metrics)
+    return model
+
+# ---------------------------------------------------------------------------
+# Training loop
+# ---------------------------------------------------------------------------
+
+def seed_everything(seed):
+    """Seed Python, NumPy and TensorFlow and make TF ops deterministic.
+
+    Call before build_model() so the initial weights are reproducible too.
+    seed=None leaves everything unseeded.
+    """
+    if seed is None:
+        return
+    tf.keras.utils.set_random_seed(seed)
+    tf.config.experimental.enable_op_determinism()
+
+
+def epoch_rng(seed, epoch):
+    """Generator for one epoch's shuffle and augmentation.
+
+    Derived from (seed, epoch) alone rather than from RNG state, so a run
+    resumed at any epoch sees the same batches as an uninterrupted one.
+    """
+    return np.random.default_rng(None if seed is None else (seed, epoch))
+
+
+def make_augmenter(params):
+    """bnn_augment.Augmenter for the augment_* hyperparameters (falsy if all are off)."""
+    return augment.Augmenter(params['augment_shift'], params['augment_angle'], params['augment_flip'])
+
+
+def evaluate(model, images, labels, batch_size=1024):
+    """(cross-entropy, accuracy) on labelled images, whatever loss the model was compiled with."""
+    probs = model.predict(images, batch_size=batch_size, verbose=0)
+    acc = float(np.mean(np.argmax(probs, axis=1) == labels))
+    picked = probs[np.arange(len(labels)), labels.astype(np.int64)]
+    return float(-np.mean(np.log(np.clip(picked, 1e-7, 1.0)))), acc
+
+
+def fit_epochs(model, images, labels, epochs, batch_size, seed=None, initial_epoch=0,
+               callbacks=(), validation=None, augmenter=None, verbose=1):
+    """model.fit() one epoch at a time, shuffled by epoch_rng(); return a per-epoch log.
+
+    With an augmenter (make_augmenter()) every epoch trains on a fresh
+    augmented copy, drawn from the same per-epoch generator as the order.
+    Each entry holds the epoch's training seconds (augmentation included)
+    and samples/s, and the accuracy on validation=(images, labels) if given
+    (not counted in the training time).
+    """
+    log = []
+    words = augment.pack_rows(images) if augmenter else None
+    for epoch in range(initial_epoch, epochs):
+        rng = epoch_rng(seed, epoch)
+        order = rng.permutation(len(images))
+        t0 = time.perf_counter()
+        batch = augmenter.images(words[order], rng) if augmenter else images[order]
+        model.fit(batch, labels[order], batch_size=batch_size, epochs=epoch + 1,
+                  initial_epoch=epoch, shuffle=False, callbacks=list(callbacks), verbose=verbose)
+        secs = time.perf_counter() - t0
+        entry = dict(epoch=epoch + 1, seconds=secs, samples_per_second=len(images) / secs)
+        if validation is not None:
+            entry['val_accuracy'] = evaluate(model, *validation)[1]
+        log.append(entry)
+    return log
+
+
+def time_to_target(epoch_log, target):
+    """Training seconds until the validation accuracy first reached target, or None."""
+    elapsed = 0.0
+    for entry in epoch_log:
+        elapsed += entry['seconds']
+        if entry.get('val_accuracy', 0.0) >= target:
+            return elapsed
+    return None
+
+
+def train(model, data=None, epochs=6, batch_size=64, seed=None, verbose=1):
+    """Fit on the training set; return the verifying-set accuracy."""
+    training_images, training_labels, verifying_images, verifying_labels = data or load_dataset()
+    fit_epochs(model, training_images, training_labels, epochs, batch_size, seed, verbose=verbose)
+    _test_loss, test_acc = model.evaluate(verifying_images, verifying_labels, verbose=verbose)
+    return test_acc
+
+
+# ---------------------------------------------------------------------------
+# Checkpointed, content-addressed training runs
+#
+# runs/<key>/ holds one training run, where key hashes the hyperparameters,
+# the dataset contents and the seed:
+#   config.json              what the key was computed from
+#   checkpoints/epoch_NNN.h5 full model (with optimizer state) after each epoch
+#   model.h5, weights/       final model and its exported CSVs
+#   metrics.json             written last; its presence marks a complete run
+# runs/teacher-<key>/ holds a float teacher and its training-set logits.
+# ---------------------------------------------------------------------------
+
+@functools.lru_cache(maxsize=None)
+def dataset_hash():
+    h = hashlib.sha256()
+    for path in (images_training_filepath, labels_training_filepath,
+                 images_verifying_filepath, labels_verifying_filepath):
+        with open(path, 'rb') as file:
+            h.update(file.read())
+    return h.hexdigest()
+
+
+def normalize_hparams(hparams=None, **overrides):
+    params = dict(DEFAULT_HPARAMS, **(hparams or {}), **overrides)
+    unknown = set(params) - set(DEFAULT_HPARAMS)
+    if unknown:
+        raise ValueError(f"Unknown hyperparameters: {', '.join(sorted(unknown))}")
+    for name in ('filters', 'dense_units'):
+        params[name] = [int(n) for n in params[name]]
+    for name in ('learning_rate', 'bop_gamma', 'bop_threshold', 'distill', 'temperature', 'augment_flip'):
+        params[name] = float(params[name])
+    return params
+
+
+def run_config(hparams, seed=None):
+    return dict(hparams=normalize_hparams(hparams), dataset=dataset_hash(), seed=seed)
+
+
+def run_key(config):
+    blob = json.dumps(config, sort_keys=True).encode()
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+def _checkpoints(run_dir):
+    """{epoch: path} of the checkpoints saved in a run directory."""
+    found = {}
+    for path in glob.glob(os.path.join(run_dir, "checkpoints", "epoch_*.h5")):
+        found[int(re.search(r"epoch_(\d+)\.h5$", path).group(1))] = path
+    return found
+
+
+def nearest_checkpoint(config, runs_dir=runs_dirpath):
+    """Best (epoch, path) to warm-start a new run from, or None.
+
+    Only runs with the same dataset, architecture, optimizer and loss
+    qualify (WARM_START_HPARAMS), and only checkpoints no later than the
+    requested epochs; among those the run differing in the fewest other
+    settings (seed included) wins, then the latest epoch. A decaying
+    schedule depends on the total epochs, so it never warm-starts.
+    """
+    params = config['hparams']
+    if params['schedule'] != 'constant':
+        return None
+    best = None
+    for config_path in glob.glob(os.path.join(runs_dir, "*", "config.json")):
+        with open(config_path) as file:
+            other = json.load(file)
+        theirs = normalize_hparams(other['hparams'])
+        if other['dataset'] != config['dataset'] or any(theirs[k] != params[k] for k in WARM_START_HPARAMS):
+            continue
+        distance = sum(theirs[k] != params[k] for k in params if k not in WARM_START_HPARAMS + ('epochs',))
+        distance += other['seed'] != config['seed']
+        usable = [e for e in _checkpoints(os.path.dirname(config_path)) if e <= params['epochs']]
+        if usable:
+            epoch = max(usable)
+            rank = (-distance, epoch)
+            if best is None or rank > best[0]:
+                best = (rank, epoch, _checkpoints(os.path.dirname(config_path))[epoch])
+    return None if best is None else best[1:]
+
+
+def load_run(run_dir):
+    """(model, metrics) of a completed run."""
+    with open(os.path.join(run_dir, "metrics.json")) as file:
+        metrics = json.load(file)
+    model = tf.keras.models.load_model(os.path.join(run_dir, "model.h5"), custom_objects=larq_custom_objects)
+    return model, metrics
+
+
+def teacher_logits(data=None, seed=None, runs_dir=runs_dirpath, verbose=1):
+    """Training-set logits of the float teacher (TEACHER_HPARAMS).
+
+    Trained once per dataset and seed, then read from
+    runs/teacher-<key>/logits.npy.
+    """
+    config = dict(teacher=json.loads(json.dumps(TEACHER_HPARAMS)), dataset=dataset_hash(), seed=seed)
+    run_dir = os.path.join(runs_dir, "teacher-" + run_key(config))
+    logits_path = os.path.join(run_dir, "logits.npy")
+    if os.path.exists(logits_path):
+        return np.load(logits_path)
+
+    training_images, training_labels, verifying_images, verifying_labels = data or load_dataset()
+    seed_everything(seed)
+    teacher = build_teacher(TEACHER_HPARAMS['filters'], TEACHER_HPARAMS['dense_units'])
+    log = fit_epochs(teacher, training_images, training_labels, TEACHER_HPARAMS['epochs'],
+                     TEACHER_HPARAMS['batch_size'], seed, verbose=verbose)
+    _loss, acc = evaluate(teacher, verifying_images, verifying_labels)
+    if verbose:
+        print(f"Teacher test accuracy {acc * 100:.2f} %")
+    logits = teacher.predict(training_images, batch_size=1024, verbose=0).astype(np.float32)
+
+    os.makedirs(run_dir, exist_ok=True)
+    teacher.save(os.path.join(run_dir, "teacher.h5"))
+    with open(os.path.join(run_dir, "teacher.json"), 'w') as file:
+        json.dump(dict(config, test_accuracy=acc, epoch_log=log), file, indent=2)
+    np.save(logits_path, logits)
+    return logits
+
+
+def train_cached(hparams=None, seed=None, data=None, force=False, warm_start=True,
+                 runs_dir=runs_dirpath, verbose=1):
+    """Train (or fetch) the run for these hyperparameters; return (model, metrics, run_dir).
+
+    seed defaults to $BNN_SEED; with a seed, the initial weights, the batch
+    order and the TF kernels are deterministic, so the same key always
+    yields the same weights. With hparams distill > 0 the loss mixes in the
+    cached float teacher's softened outputs (teacher_logits()).
+
+    An identical finished run is returned from disk without training. An
+    interrupted run resumes from its last epoch checkpoint. A new run can
+    warm-start from nearest_checkpoint(), e.g. a shorter run of the same
+    network, and then only trains the remaining epochs.
+    """
+    import bnn_retrieve_weights as retrieve
+
+    seed = hw.default_seed(seed)
+    config = run_config(hparams, seed)
+    params = config['hparams']
+    key = run_key(config)
+    run_dir = os.path.join(runs_dir, key)
+    if not force and os.path.exists(os.path.join(run_dir, "metrics.json")):
+        model, metrics = load_run(run_dir)
+        if verbose:
+            print(f"Using cached run {key} (test accuracy {metrics['test_accuracy'] * 100:.2f} %)")
+        return model, metrics, run_dir
+
+    os.makedirs(os.path.join(run_dir, "checkpoints"), exist_ok=True)
+    with open(os.path.join(run_dir, "config.json"), 'w') as file:
+        json.dump(config, file, indent=2, sort_keys=True)
 
+    own = {e: p for e, p in _checkpoints(run_dir).items() if e <= params['epochs']}
+    start, source = 0, None
+    if own and not force:
+        start, source = max(own), own[max(own)]
+    elif warm_start and not force:
+        start, source = nearest_checkpoint(config, runs_dir) or (0, None)
+    data = data or load_dataset()
+    training_images, training_labels, verifying_images, verifying_labels = data
+    seed_everything(seed)
+    if source:
+        if verbose:
+            print(f"Run {key}: starting from epoch {start} of {source}")
+        model = tf.keras.models.load_model(source, custom_objects=larq_custom_objects)
+    else:
+        model = build_model(params['filters'], params['kernel_size'], params['pool_size'],
+                            params['dense_units'])
+        compile_model(model, params, math.ceil(len(training_images) / params['batch_size']))
 
-model.add(lq.layers.QuantConv2D(4, (3,3), padding="same", **kwargs))
-model.add(tf.keras.layers.BatchNormalization(scale=False))
-model.add(tf.keras.layers.MaxPooling2D((2,2)))
+    targets = training_labels
+    if params['distill']:
+        logits = teacher_logits(data, seed, runs_dir, verbose)
+        targets = np.concatenate([training_labels[:, None], logits], axis=1).astype(np.float32)
 
-model.add(tf.keras.layers.Flatten())
+    checkpoint = tf.keras.callbacks.ModelCheckpoint(
+        os.path.join(run_dir, "checkpoints", "epoch_{epoch:03d}.h5"), save_weights_only=False)
+    t0 = time.time()
+    epoch_log = fit_epochs(model, training_images, targets, params['epochs'], params['batch_size'],
+                           seed, initial_epoch=start, callbacks=[checkpoint],
+                           validation=(verifying_images, verifying_labels),
+                           augmenter=make_augmenter(params), verbose=verbose)
+    test_loss, test_acc = evaluate(model, verifying_images, verifying_labels)
 
-model.add(lq.layers.QuantDense(10, **kwargs))
-model.add(tf.keras.layers.BatchNormalization(scale=False))
-model.add(tf.keras.layers.Activation("softmax"))
+    # The saved model is compiled plainly so other scripts load it without this module
+    model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    model.save(os.path.join(run_dir, "model.h5"), include_optimizer=False)
+    retrieve.extract_weights(model, os.path.join(run_dir, "weights"), provenance=dict(config, key=key))
+    trained = sum(e['seconds'] for e in epoch_log)
+    metrics = dict(key=key, seed=seed, test_accuracy=test_acc, test_loss=test_loss,
+                   epochs=params['epochs'], resumed_from_epoch=start, warm_start_source=source,
+                   train_seconds=time.time() - t0, epoch_log=epoch_log,
+                   samples_per_second=len(training_images) * len(epoch_log) / trained if trained else None)
+    with open(os.path.join(run_dir, "metrics.json"), 'w') as file:
+        json.dump(metrics, file, indent=2)
+    return model, metrics, run_dir
 
-model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
 
-model.fit(training_images, training_labels, batch_size=64, epochs=6)
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Train the BNN (cached per hyperparameters in runs/)")
+    parser.add_argument('--filters', help="conv filter counts, e.g. 8,4 or 16,4 (default 8,4)")
+    parser.add_argument('--epochs', type=int, help=f"default {DEFAULT_HPARAMS['epochs']}")
+    parser.add_argument('--batch-size', type=int, help=f"default {DEFAULT_HPARAMS['batch_size']}")
+    parser.add_argument('--fast', action='store_true',
+                        help="large-batch Bop with warmup and cosine decay: " +
+                             ", ".join(f"{k}={v}" for k, v in FAST_HPARAMS.items()))
+    parser.add_argument('--optimizer', choices=('adam', 'bop'))
+    parser.add_argument('--lr', type=float, help="peak learning rate of Adam")
+    parser.add_argument('--schedule', choices=('constant', 'cosine'))
+    parser.add_argument('--warmup-epochs', type=int)
+    parser.add_argument('--distill', type=float, metavar='ALPHA',
+                        help="weight of the float teacher's soft targets in the loss (0 = off)")
+    parser.add_argument('--temperature', type=float, help=f"distillation temperature (default {DEFAULT_HPARAMS['temperature']})")
+    parser.add_argument('--shift', type=int, help="augment: random shift of up to N pixels per axis")
+    parser.add_argument('--rotate', type=int, help="augment: random rotation of up to N degrees, in steps of 5")
+    parser.add_argument('--flip', type=float, help="augment: per-pixel flip probability")
+    parser.add_argument('--target', type=float, default=0.85,
+                        help="test accuracy for the time-to-target report (default 0.85)")
+    parser.add_argument('--seed', type=int, default=None,
+                        help=f"seed for weights init, batch order and TF ops (default ${hw.SEED_ENV}, else unseeded)")
+    parser.add_argument('--force', action='store_true', help="retrain even if the run is cached")
+    parser.add_argument('--no-warm-start', action='store_true', help="never start from another run's checkpoint")
+    parser.add_argument('--export', action='store_true',
+                        help=f"also save the model to {os.path.basename(model_filepath)} for bnn_retrieve_weights.py")
+    args = parser.parse_args()
 
-test_loss, test_acc = model.evaluate(verifying_images, verifying_labels)
+    hparams = dict(FAST_HPARAMS) if args.fast else {}
+    overrides = dict(filters=args.filters and [int(f) for f in args.filters.split(',')],
+                     epochs=args.epochs, batch_size=args.batch_size, optimizer=args.optimizer,
+                     learning_rate=args.lr, schedule=args.schedule, warmup_epochs=args.warmup_epochs,
+                     distill=args.distill, temperature=args.temperature, augment_shift=args.shift,
+                     augment_angle=args.rotate, augment_flip=args.flip)
+    hparams.update({k: v for k, v in overrides.items() if v is not None})
+    model, metrics, run_dir = train_cached(hparams, seed=args.seed, force=args.force,
+                                           warm_start=not args.no_warm_start)
 
-model.summary()
+    model.summary()
 
-print(f"Test accuracy {test_acc * 100:.2f} %")
+    print(f"Test accuracy {metrics['test_accuracy'] * 100:.2f} %")
+    if metrics.get('samples_per_second'):
+        print(f"Throughput    {metrics['samples_per_second']:,.0f} samples/s")
+    reached = time_to_target(metrics.get('epoch_log', []), args.target)
+    if metrics.get('resumed_from_epoch'):
+        print(f"Time to {args.target * 100:.0f} % not measured (run resumed at epoch {metrics['resumed_from_epoch']})")
+    elif reached is None:
+        print(f"Time to {args.target * 100:.0f} % not reached")
+    else:
+        print(f"Time to {args.target * 100:.0f} % {reached:.1f} s of training")
+    print(f"Run directory {run_dir}")
 
-#model.save("./src/Python311_training/mnist_bnn_unconverted.h5")
\ No newline at end of file
+    if args.export:
+        model.save(model_filepath)
+        # bnn_retrieve_weights.py copies this into the exported weights directory
+        with open(os.path.join(run_dir, "config.json")) as file:
+            provenance = dict(json.load(file), key=metrics['key'])
+        with open(os.path.splitext(model_filepath)[0] + ".json", 'w') as file:
+            json.dump(provenance, file, indent=2, sort_keys=True)
@@ -0,0 +1,16 @@
+// Generated by Python311_training/bnn_rtl_params.py from Python311_training/weights/
+// Do not edit: rerun the script (or bnn_retrieve_weights.py) instead.
+//
+// Batch-norm thresholds are flat vectors, filter f at [f*BITS +: BITS];
+// a filter fires when its XNOR popcount is >= its threshold, and the
+// dense layer ranks popcount - threshold per output neuron.
+package bnn_params;
+
+    localparam [31:0] LAYER1_THRESHOLDS =
+        {4'd6, 4'd8, 4'd8, 4'd8, 4'd6, 4'd5, 4'd5, 4'd6};  // filter 7 .. filter 0
+    localparam [27:0] LAYER2_THRESHOLDS =
+        {7'd37, 7'd35, 7'd42, 7'd41};  // filter 3 .. filter 0
+    localparam [79:0] DENSE_THRESHOLDS =
+        {8'd103, 8'd105, 8'd90, 8'd99, 8'd106, 8'd110, 8'd100, 8'd101, 8'd110, 8'd112};  // filter 9 .. filter 0
+
+endpackage
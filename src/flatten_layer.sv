@@ -3,33 +3,67 @@
 // To load a new set of inputs:
 // 		1) Ensure reset signal is high
 // 		2) Load inputs to data_in and weights_in
-//		3) Answer will appear on next rising clock edge after state enters s_LAYER_3
+//		3) Answer will appear ceil(NUM_INPUTS / CHUNK_BITS) rising clock edges after state enters s_LAYER_3
+//		   (the next edge with the default CHUNK_BITS), or earlier with EARLY_EXIT
+//
+// CHUNK_BITS sets how many of the NUM_INPUTS XNOR bits are popcounted per clock.
+// The default (CHUNK_BITS = NUM_INPUTS) is the original single-cycle layer; smaller
+// chunks shorten the adder chain (higher fmax, smaller popcount trees) at the cost of
+// ceil(NUM_INPUTS / CHUNK_BITS) cycles. With EARLY_EXIT set, the layer also stops as soon
+// as no other neuron can catch the current leader with the bits that are left.
+// Accumulators are cleared while the FSM is in s_LOAD so each image starts from zero.
+//
+// thresholds holds one 8-bit batch-norm offset per neuron, neuron n at [n*8 +: 8]
+// (registers.sv: compiled-in bnn_params::DENSE_THRESHOLDS or the loaded segment).
+// The comparator ranks score = popcount + ~threshold, the 9-bit unsigned form of
+// popcount - threshold; all-zero thresholds rank the raw popcounts.
 
 // FYi ICARUS VERILOG IS OLD VERSION.. CAN'T SUPPORT A LOT OF THE THINGS LIKE ALWAYS_COMB, ALWAYS_FF AND ASSIGNING ARRAYS TO ARRAYS (MANUALLY DONE WITH FOR LOOP IN THIS FILE FOR NEURON POPCOUNT).. CHANGE BACK TO OLD SV CODE IF NEEDED!!
 
-module final_layer_sequential #(parameter NUM_INPUTS = 196) (
+module final_layer_sequential #(
+	parameter NUM_INPUTS = 196,
+	parameter CHUNK_BITS = NUM_INPUTS,
+	parameter EARLY_EXIT = 0
+	) (
 	input logic clock,
 	input logic reset,
 	input logic [2:0] state,
 	input logic [NUM_INPUTS-1:0] data_in,
 	input logic [NUM_INPUTS*10-1:0] weights_in,
+	input logic [79:0] thresholds,
 	output logic [3:0] answer,
 	output logic layer_3_done
 	);
 
+	localparam s_LOAD    = 3'b001;
 	localparam s_LAYER_3 = 3'b100;
+	localparam NUM_CHUNKS    = (NUM_INPUTS + CHUNK_BITS - 1) / CHUNK_BITS;
+	localparam PADDED_INPUTS = NUM_CHUNKS * CHUNK_BITS;
+	localparam [PADDED_INPUTS-1:0] VALID_MASK = {NUM_INPUTS{1'b1}};
+
 	logic [7:0] popcount [9:0];
 	logic [7:0] next_popcount [9:0];
-	logic [NUM_INPUTS-1:0] xnor_result [9:0];
+	logic [8:0] score [9:0];
+	logic [PADDED_INPUTS-1:0] xnor_result [9:0];
+	logic [PADDED_INPUTS-1:0] data_ext, weight_ext;
+	logic [CHUNK_BITS-1:0] chunk;
+	logic [7:0] chunk_idx;
+	logic [8:0] remaining;
+	logic [8:0] best_val;
+	logic exit_safe;
 
-	// DOT PRODUCT LOGIC
+	// DOT PRODUCT LOGIC (one CHUNK_BITS slice per clock)
+	// Padding bits past NUM_INPUTS are masked so they never count as matches.
 
 	always @(*) begin
+		data_ext = data_in;
 		for (int neuron = 0; neuron < 10; neuron++) begin
-			xnor_result[neuron] = weights_in[neuron*NUM_INPUTS +: NUM_INPUTS] ^~ data_in;
+			weight_ext = weights_in[neuron*NUM_INPUTS +: NUM_INPUTS];
+			xnor_result[neuron] = (weight_ext ^~ data_ext) & VALID_MASK;
+			chunk = xnor_result[neuron][chunk_idx*CHUNK_BITS +: CHUNK_BITS];
 			next_popcount[neuron] = 0;
-			for (int i = 0; i<NUM_INPUTS; i++) begin
-				next_popcount[neuron] = next_popcount[neuron] + xnor_result[neuron][i];
+			for (int i = 0; i<CHUNK_BITS; i++) begin
+				next_popcount[neuron] = next_popcount[neuron] + chunk[i];
 			end
 		end
 	end
@@ -41,27 +75,51 @@ module final_layer_sequential #(parameter NUM_INPUTS = 196) (
 			for (int i = 0; i < 10; i++) begin
 				popcount[i] <= 8'd0;
 			end
-		end else if (state == s_LAYER_3 && !layer_3_done) begin
+			chunk_idx <= 8'd0;
+			remaining <= NUM_INPUTS;
+			layer_3_done <= 1'b0;
+		end else if (state == s_LOAD) begin
 			for (int i = 0; i < 10; i++) begin
-				popcount[i] <= next_popcount[i];
+				popcount[i] <= 8'd0;
+			end
+			chunk_idx <= 8'd0;
+			remaining <= NUM_INPUTS;
+			layer_3_done <= 1'b0;
+		end else if (state == s_LAYER_3 && !layer_3_done) begin
+			if (EARLY_EXIT && exit_safe) begin
+				layer_3_done <= 1'b1;
+			end else begin
+				for (int i = 0; i < 10; i++) begin
+					popcount[i] <= popcount[i] + next_popcount[i];
+				end
+				chunk_idx <= chunk_idx + 1;
+				remaining <= (remaining > CHUNK_BITS) ? remaining - CHUNK_BITS : 9'd0;
+				if (chunk_idx == NUM_CHUNKS - 1) begin
+					layer_3_done <= 1'b1;
+				end
 			end
 		end
 	end
 	
 	// COMPARATOR LOGIC
 	
-	logic [7:0] round_1_val [4:0]; logic [3:0] round_1_idx [4:0];
-	logic [7:0] round_2_val [1:0]; logic [3:0] round_2_idx [1:0];
-	logic [7:0] round_3_val; logic [3:0] round_3_idx;
+	logic [8:0] round_1_val [4:0]; logic [3:0] round_1_idx [4:0];
+	logic [8:0] round_2_val [1:0]; logic [3:0] round_2_idx [1:0];
+	logic [8:0] round_3_val; logic [3:0] round_3_idx;
 	
 	always @(*) begin
+		// Batch-norm offsets: popcount - threshold + 255
+		for (int i = 0; i < 10; i++) begin
+			score[i] = {1'b0, popcount[i]} + {1'b0, ~thresholds[i*8 +: 8]};
+		end
+
 		// First round
 		for (int i = 0; i < 5; i++) begin
-			if (popcount[i*2] >= popcount[i*2+1]) begin
-				round_1_val[i] = popcount[i*2];
+			if (score[i*2] >= score[i*2+1]) begin
+				round_1_val[i] = score[i*2];
 				round_1_idx[i] = i*2;
 			end else begin
-				round_1_val[i] = popcount[i*2+1];
+				round_1_val[i] = score[i*2+1];
 				round_1_idx[i] = i*2+1;
 			end
 		end
@@ -89,14 +147,19 @@ module final_layer_sequential #(parameter NUM_INPUTS = 196) (
 		// Fourth/final round (round_1_val[4] gets passthrough to end)
 		if (round_3_val >= round_1_val[4]) begin
 			answer = round_3_idx;
+			best_val = round_3_val;
 		end else begin
 			answer = round_1_idx[4];
+			best_val = round_1_val[4];
 		end
 
-		if (answer != 0 || (answer == 0 && (round_3_val | round_1_val[4] != 0))) begin
-			layer_3_done = 1'b1;
-		end else begin
-			layer_3_done = 1'b0;
+		// EARLY EXIT: safe once every other neuron stays below the leader
+		// even if it matched all of the remaining bits
+		exit_safe = 1'b1;
+		for (int i = 0; i < 10; i++) begin
+			if (i != answer && ({1'b0, score[i]} + remaining >= {1'b0, best_val})) begin
+				exit_safe = 1'b0;
+			end
 		end
 	end
 			
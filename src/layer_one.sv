@@ -1,18 +1,32 @@
-module layer_one (
+// PIPE_STAGES inserts registers into the per-pixel cone for a shorter clock
+// period, at PIPE_STAGES - 1 extra cycles of latency (0 = original):
+//   0 - XNOR, popcount, threshold and max-pool all combinational into layer_one_out
+//   1 - layer_one_out bits are written by a register at the end of the cycle
+//   2 - + register between the popcounts and the threshold / max-pool
+//   3 - + register between the XNOR convolution and the popcounts
+// Outputs are bit-identical for every setting; done waits for the pipeline to drain.
+module layer_one #(
+    parameter PIPE_STAGES = 0
+) (
     input wire clk, rst_n,
     input wire [2:0] state, // Top level input
 
-    // Flattened arrays for Verilog-2001 compatibility
+    // Flattened arrays for Verilog-2001 compatibility, indexed exactly as
+    // registers.sv writes them (bnn_layouts.py PIXELS / WEIGHTS1)
     // pixels: 28x28 = 784 bits [783:0]
-    input wire [0:783] pixels,
+    input wire [783:0] pixels,
     // weights: 3x3x8 = 72 bits [71:0]
-    input wire [0:71] weights,
+    input wire [71:0] weights,
+    // batch-norm thresholds: 8 x 4 bits, filter f at [f*4 +: 4]
+    // (registers.sv; bnn_params::LAYER1_THRESHOLDS unless loaded)
+    input wire [31:0] thresholds,
 
     // layer_one_out: 14x14x8 = 1568 bits [1567:0]
     output reg [1567:0] layer_one_out,
     output reg done
 );
     
+    localparam [2:0] s_LOAD    = 3'b001;
     localparam [2:0] s_LAYER_1 = 3'b010;
 
     reg [4:0] row, col;
@@ -33,7 +47,7 @@ module layer_one (
         input [1:0] r, c;
         input [3:0] w;
         begin
-            wt_idx = (w*9 + r*3 + c);
+            wt_idx = (r*24 + c*8 + w);
         end
     endfunction
 
@@ -50,7 +64,17 @@ module layer_one (
     // convolution + normalization + max pooling part
     reg [8:0] conv_result_00, conv_result_01, conv_result_10, conv_result_11;
     reg [3:0] count_00, count_01, count_10, count_11;
-    reg [0:7][3:0] thresholds = {4'd6, 4'd5, 4'd5, 4'd6, 4'd8, 4'd8, 4'd8, 4'd6};
+
+    // Pipeline position tag {weight_num, row, col} and valid bit per stage:
+    //   _x: XNOR stage, _p: popcount stage, _t: threshold / max-pool stage
+    reg  [13:0] tag_x, tag_p, tag_t;
+    reg         valid_x, valid_p, valid_t;
+    reg  [35:0] conv_x, conv_q;    // _q: registered copy (PIPE_STAGES >= 3)
+    reg  [15:0] count_p, count_q;  // _q: registered copy (PIPE_STAGES >= 2)
+    reg  [13:0] tag_xq, tag_pq;
+    reg         valid_xq, valid_pq;
+    reg         pool_t;
+    wire        pipe_empty = !((PIPE_STAGES >= 3 && valid_xq) || (PIPE_STAGES >= 2 && valid_pq));
 
     
     always @(posedge clk or negedge rst_n) begin
@@ -61,7 +85,13 @@ module layer_one (
             weight_num <= 0;
         end
         else begin
-            if (state == s_LAYER_1) begin
+            if (state == s_LOAD) begin
+                // Re-arm for the next image without needing a reset
+                row <= 0;
+                col <= 0;
+                done <= 0;
+                weight_num <= 0;
+            end else if (state == s_LAYER_1) begin
                 if (weight_num < 8) begin
                     if (col < 13) begin
                         col <= col + 1;
@@ -75,7 +105,7 @@ module layer_one (
                             weight_num <= weight_num + 1;
                         end
                     end
-                end else begin
+                end else if (pipe_empty) begin
                     done <= 1;
                 end
             end
@@ -95,6 +125,7 @@ module layer_one (
     endfunction
 
 
+    // XNOR stage
     always @(*) begin
         //threshold = 5 + (weight_num & 4'b1);
         conv_result_00 = conv(row << 1, col << 1, weight_num);
@@ -102,16 +133,86 @@ module layer_one (
         conv_result_10 = conv((row << 1) + 1, col << 1, weight_num);
         conv_result_11 = conv((row << 1) + 1, (col << 1) + 1, weight_num);
 
-        count_00 = count_ones(conv_result_00);
-        count_01 = count_ones(conv_result_01);
-        count_10 = count_ones(conv_result_10);
-        count_11 = count_ones(conv_result_11);
+        conv_x  = {conv_result_00, conv_result_01, conv_result_10, conv_result_11};
+        tag_x   = {weight_num, row, col};
+        valid_x = (state == s_LAYER_1) && (weight_num < 8);
+    end
 
-        layer_one_out[out_idx(weight_num, row, col)] =
-            ((count_00 >= thresholds[weight_num]) | (count_01 >= thresholds[weight_num]) |
-             (count_10 >= thresholds[weight_num]) | (count_11 >= thresholds[weight_num]));
+    // Popcount stage
+    always @(*) begin
+        if (PIPE_STAGES >= 3) begin
+            {count_00, count_01, count_10, count_11} = {count_ones(conv_q[35:27]), count_ones(conv_q[26:18]),
+                                                        count_ones(conv_q[17:9]),  count_ones(conv_q[8:0])};
+            tag_p   = tag_xq;
+            valid_p = valid_xq;
+        end else begin
+            {count_00, count_01, count_10, count_11} = {count_ones(conv_x[35:27]), count_ones(conv_x[26:18]),
+                                                        count_ones(conv_x[17:9]),  count_ones(conv_x[8:0])};
+            tag_p   = tag_x;
+            valid_p = valid_x;
+        end
+        count_p = {count_00, count_01, count_10, count_11};
+    end
+
+    // Threshold + max-pool stage
+    always @(*) begin
+        if (PIPE_STAGES >= 2) begin
+            tag_t   = tag_pq;
+            valid_t = valid_pq;
+            pool_t  = pool(count_q, tag_pq[13:10]);
+        end else begin
+            tag_t   = tag_p;
+            valid_t = valid_p;
+            pool_t  = pool(count_p, tag_p[13:10]);
+        end
+    end
+
+    // Stage registers (only used when PIPE_STAGES enables them)
+    always @(posedge clk or negedge rst_n) begin
+        if (!rst_n) begin
+            valid_xq <= 1'b0;
+            valid_pq <= 1'b0;
+        end else begin
+            valid_xq <= valid_x;
+            valid_pq <= valid_p;
+        end
     end
 
+    always @(posedge clk) begin
+        conv_q  <= conv_x;
+        tag_xq  <= tag_x;
+        count_q <= count_p;
+        tag_pq  <= tag_p;
+    end
+
+    generate
+        if (PIPE_STAGES == 0) begin : g_comb_out
+            always @(*) begin
+                if (valid_t) begin
+                    layer_one_out[out_idx(tag_t[13:10], tag_t[9:5], tag_t[4:0])] = pool_t;
+                end
+            end
+        end else begin : g_reg_out
+            always @(posedge clk) begin
+                if (valid_t) begin
+                    layer_one_out[out_idx(tag_t[13:10], tag_t[9:5], tag_t[4:0])] <= pool_t;
+                end
+            end
+        end
+    endgenerate
+
+    // Batch-norm threshold on each of the four popcounts, then 2x2 max-pool (OR)
+    function pool;
+        input [15:0] counts;
+        input [3:0]  wt_num;
+        reg   [3:0]  thresh;
+        begin
+            thresh = thresholds[wt_num*4 +: 4];
+            pool   = (counts[15:12] >= thresh) | (counts[11:8] >= thresh) |
+                     (counts[7:4]   >= thresh) | (counts[3:0]  >= thresh);
+        end
+    endfunction
+
 
     function [8:0] conv;
         input [4:0] r, c;
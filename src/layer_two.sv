@@ -1,4 +1,3 @@
-<<<<<<< Updated upstream
 // Rewritten for Icarus Verilog 10.2 / Verilog-2001 compatibility.
 // Replaces SystemVerilog-only features from the original:
 //   always_ff / always_comb  -> always @(posedge clk) / always @(*)
@@ -7,50 +6,56 @@
 //   packed multi-dim arrays  -> flat 1-D arrays
 //   $countones               -> count_ones72 function
 //
-// Flat array encoding (matches layer_one.sv conventions):
-//   pixels        [1567:0]  (row*14 + col)*8 + ch          (14x14x8 bits)
+// Flat array encoding (bnn_layouts.py LAYER1_OUT / WEIGHTS2 / LAYER2_OUT):
+//   pixels        [1567:0]  ch*196 + row*14 + col          (layer_one_out order)
 //   weights       [287:0]   wt_num*72 + (row*3+col)*8 + ch (4x3x3x8 bits)
-//   layer_two_out [195:0]   wn*49 + row*7 + col            (4x7x7 bits)
-//   pixels        [1567:0]  (row*14 + col)*8 + ch          (14x14x8 bits)
-//   weights       [287:0]   wt_num*72 + (row*3+col)*8 + ch (4x3x3x8 bits)
-//   layer_two_out [195:0]   wn*49 + row*7 + col            (4x7x7 bits)
+//   layer_two_out [195:0]   (row*7 + col)*4 + wn           (Flatten order of the
+//                                                          trained dense layer)
+//
+// PIPE_STAGES inserts registers into the per-pixel cone for a shorter clock
+// period, at PIPE_STAGES - 1 extra cycles of latency (0 = original):
+//   0 - XNOR, popcount, threshold and max-pool all combinational into layer_two_out
+//   1 - layer_two_out bits are written by a register at the end of the cycle
+//   2 - + register between the count_ones72 popcounts and the threshold / max-pool
+//   3 - + register between the XNOR convolution and the popcounts
+// Outputs are bit-identical for every setting; done waits for the pipeline to drain.
 
-=======
->>>>>>> Stashed changes
-module layer_two (
+module layer_two #(
+    parameter PIPE_STAGES = 0
+) (
     input wire clk, rst_n,
     input wire [2:0] state,
 
     input wire [1567:0] pixels,    // layer_one_out: 14x14 pixels, 8 channels each
     input wire [287:0]  weights,   // 4 filters of 3x3x8 binary weights
-    input wire [287:0]  weights,   // 4 filters of 3x3x8 binary weights
+    input wire [27:0]   thresholds,  // 4 x 7-bit batch-norm thresholds, filter f at [f*7 +: 7]
+                                     // (registers.sv; bnn_params::LAYER2_THRESHOLDS unless loaded)
 
     output reg [195:0] layer_two_out,  // 4 filters of 7x7 binary output
     output reg done
 );
 
+    localparam [2:0] s_LOAD    = 3'b001;
     localparam [2:0] s_LAYER_2 = 3'b011;
 
     reg [3:0] row, col;
     reg [3:0] weight_num;
+    wire      pipe_empty;
 
-    // Per-filter batch-norm thresholds (72-bit popcount space):
-    //   Filter 0: 41,  Filter 1: 42,  Filter 2: 35,  Filter 3: 37
+    // Per-filter batch-norm threshold (72-bit popcount space) from the
+    // thresholds port; out-of-range filter numbers read filter 0's
     function [6:0] get_threshold;
         input [3:0] wt_num;
         begin
-            case (wt_num)
-                4'd0:    get_threshold = 7'd41;
-                4'd1:    get_threshold = 7'd42;
-                4'd2:    get_threshold = 7'd35;
-                4'd3:    get_threshold = 7'd37;
-                default: get_threshold = 7'd41;
-            endcase
+            if (wt_num < 4)
+                get_threshold = thresholds[wt_num*7 +: 7];
+            else
+                get_threshold = thresholds[6:0];
         end
     endfunction
 
     // Extract an 8-bit pixel from the flat array at position (r, c)
-    // Encoding: pixels[(r*14 + c)*8 + ch] for ch in 0..7
+    // Encoding: pixels[ch*196 + r*14 + c] for ch in 0..7, as layer_one writes it
     function [7:0] get_pixel;
         input [3:0] r, c;
         integer base, i;
@@ -59,7 +64,7 @@ module layer_two (
             base   = r * 14 + c;
             result = 8'b0;
             for (i = 0; i < 8; i = i + 1)
-                result[i] = pixels[base * 8 + i];
+                result[i] = pixels[i * 196 + base];
             get_pixel = result;
         end
     endfunction
@@ -76,31 +81,22 @@ module layer_two (
         end
     endfunction
 
-    // Flat index into layer_two_out: wn*49 + r*7 + c
+    // Flat index into layer_two_out: (r*7 + c)*4 + wn
     function [7:0] out_idx;
         input [3:0] wn, r, c;
         integer tmp;
         begin
-            tmp     = wn * 49 + r * 7 + c;
+            tmp     = (r * 7 + c) * 4 + wn;
             out_idx = tmp[7:0];
         end
     endfunction
 
     // 3x3 XNOR convolution over the 8-channel binary feature map.
     // Returns 72 bits: 9 kernel positions x 8 channels of XNOR matches.
-<<<<<<< Updated upstream
     // Accesses module-level 'pixels' and 'weights' directly (like layer_one).
     //
     // Weight slice for filter wt_num at kernel position (kr, kc):
     //   weights[wt_num*72 + (kr*3+kc)*8 +: 8]  (one bit per input channel)
-    // Weight slice for filter wt_num at kernel position (kr, kc):
-    //   weights[wt_num*72 + (kr*3+kc)*8 +: 8]  (one bit per input channel)
-    // -----------------------------------------------------------------------
-=======
-    //
-    // Weight slice for filter wt_num at kernel position (kr, kc):
-    //   weights[wt_num*72 + (kr*3+kc)*8 +: 8]  (one bit per input channel)
->>>>>>> Stashed changes
     function [71:0] conv;
         input [3:0] r, c;
         input [3:0] wt_num;
@@ -126,8 +122,6 @@ module layer_two (
             bm = (r == 13)            ? 8'b0 : get_pixel(r+1, c);
             br = (r == 13 || c == 13) ? 8'b0 : get_pixel(r+1, c+1);
 
-            // XNOR each 8-channel pixel against its 8-bit weight slice for filter wn.
-            // Each channel has its own independent weight bit.
             // XNOR each 8-channel pixel against its 8-bit weight slice for filter wn.
             // Each channel has its own independent weight bit.
             conv = {
@@ -140,15 +134,6 @@ module layer_two (
                 ~(bl ^ weights[wn*72 + 48 +: 8]),   // kernel[2][0]
                 ~(bm ^ weights[wn*72 + 56 +: 8]),   // kernel[2][1]
                 ~(br ^ weights[wn*72 + 64 +: 8])    // kernel[2][2]
-                ~(tl ^ weights[wn*72 +  0 +: 8]),   // kernel[0][0]
-                ~(tm ^ weights[wn*72 +  8 +: 8]),   // kernel[0][1]
-                ~(tr ^ weights[wn*72 + 16 +: 8]),   // kernel[0][2]
-                ~(ml ^ weights[wn*72 + 24 +: 8]),   // kernel[1][0]
-                ~(mm ^ weights[wn*72 + 32 +: 8]),   // kernel[1][1]
-                ~(mr ^ weights[wn*72 + 40 +: 8]),   // kernel[1][2]
-                ~(bl ^ weights[wn*72 + 48 +: 8]),   // kernel[2][0]
-                ~(bm ^ weights[wn*72 + 56 +: 8]),   // kernel[2][1]
-                ~(br ^ weights[wn*72 + 64 +: 8])    // kernel[2][2]
             };
         end
     endfunction
@@ -162,7 +147,13 @@ module layer_two (
             weight_num <= 4'b0;
         end
         else begin
-            if (state == s_LAYER_2) begin
+            if (state == s_LOAD) begin
+                // Re-arm for the next image without needing a reset
+                row        <= 4'b0;
+                col        <= 4'b0;
+                done       <= 1'b0;
+                weight_num <= 4'b0;
+            end else if (state == s_LAYER_2) begin
                 if (weight_num < 4) begin
                     if (col < 6) begin
                         col <= col + 1;
@@ -176,7 +167,7 @@ module layer_two (
                             weight_num <= weight_num + 1;
                         end
                     end
-                end else begin
+                end else if (pipe_empty) begin
                     done <= 1'b1;
                 end
             end
@@ -188,23 +179,104 @@ module layer_two (
     // Input is 14x14; each output pixel (row, col) covers a 2x2 max-pool
     // window at input positions (row*2, col*2) through (row*2+1, col*2+1).
     // Output is 1 if ANY of the 4 convolution results crosses the threshold.
-    // Only the single bit indexed by (weight_num, row, col) is written;
-    // all other bits of layer_two_out retain their registered value.
+    // Only the single bit indexed by (weight_num, row, col) is written, and
+    // only while valid: the idle tag after the last filter (weight_num = 4,
+    // row = col = 0) would otherwise alias output bit 4. All other bits of
+    // layer_two_out retain their registered value.
+    //
+    // Each stage carries a {weight_num, row, col} tag and a valid bit:
+    //   _x: XNOR stage, _p: popcount stage, _t: threshold / max-pool stage
+    // and _q is the registered copy used when PIPE_STAGES enables it.
     reg [71:0] cr00, cr01, cr10, cr11;
-    reg [6:0]  thresh;
+    reg [287:0] conv_x, conv_q;
+    reg [27:0]  count_p, count_q;
+    reg [11:0]  tag_x, tag_p, tag_t, tag_xq, tag_pq;
+    reg         valid_x, valid_p, valid_t, valid_xq, valid_pq;
+    reg         pool_t;
 
+    assign pipe_empty = !((PIPE_STAGES >= 3 && valid_xq) || (PIPE_STAGES >= 2 && valid_pq));
+
+    // XNOR stage
     always @(*) begin
-        thresh = get_threshold(weight_num);
         cr00   = conv(row << 1,         col << 1,       weight_num);
         cr01   = conv(row << 1,       (col << 1) + 1,   weight_num);
         cr10   = conv((row << 1) + 1,   col << 1,       weight_num);
         cr11   = conv((row << 1) + 1, (col << 1) + 1,   weight_num);
 
-        layer_two_out[out_idx(weight_num, row, col)] =
-            ((count_ones72(cr00) >= thresh) |
-             (count_ones72(cr01) >= thresh) |
-             (count_ones72(cr10) >= thresh) |
-             (count_ones72(cr11) >= thresh));
+        conv_x  = {cr00, cr01, cr10, cr11};
+        tag_x   = {weight_num, row, col};
+        valid_x = (state == s_LAYER_2) && (weight_num < 4);
+    end
+
+    // Popcount stage
+    always @(*) begin
+        if (PIPE_STAGES >= 3) begin
+            count_p = {count_ones72(conv_q[287:216]), count_ones72(conv_q[215:144]),
+                       count_ones72(conv_q[143:72]),  count_ones72(conv_q[71:0])};
+            tag_p   = tag_xq;
+            valid_p = valid_xq;
+        end else begin
+            count_p = {count_ones72(conv_x[287:216]), count_ones72(conv_x[215:144]),
+                       count_ones72(conv_x[143:72]),  count_ones72(conv_x[71:0])};
+            tag_p   = tag_x;
+            valid_p = valid_x;
+        end
+    end
+
+    // Threshold + max-pool stage
+    always @(*) begin
+        if (PIPE_STAGES >= 2) begin
+            tag_t   = tag_pq;
+            valid_t = valid_pq;
+            pool_t  = pool(count_q, tag_pq[11:8]);
+        end else begin
+            tag_t   = tag_p;
+            valid_t = valid_p;
+            pool_t  = pool(count_p, tag_p[11:8]);
+        end
+    end
+
+    // Stage registers (only used when PIPE_STAGES enables them)
+    always @(posedge clk) begin
+        if (!rst_n) begin
+            valid_xq <= 1'b0;
+            valid_pq <= 1'b0;
+        end else begin
+            valid_xq <= valid_x;
+            valid_pq <= valid_p;
+        end
+        conv_q  <= conv_x;
+        tag_xq  <= tag_x;
+        count_q <= count_p;
+        tag_pq  <= tag_p;
     end
 
+    generate
+        if (PIPE_STAGES == 0) begin : g_comb_out
+            always @(*) begin
+                if (valid_t) begin
+                    layer_two_out[out_idx(tag_t[11:8], tag_t[7:4], tag_t[3:0])] = pool_t;
+                end
+            end
+        end else begin : g_reg_out
+            always @(posedge clk) begin
+                if (valid_t) begin
+                    layer_two_out[out_idx(tag_t[11:8], tag_t[7:4], tag_t[3:0])] <= pool_t;
+                end
+            end
+        end
+    endgenerate
+
+    // Batch-norm threshold on each of the four popcounts, then 2x2 max-pool (OR)
+    function pool;
+        input [27:0] counts;
+        input [3:0]  wt_num;
+        reg   [6:0]  thresh;
+        begin
+            thresh = get_threshold(wt_num);
+            pool   = (counts[27:21] >= thresh) | (counts[20:14] >= thresh) |
+                     (counts[13:7]  >= thresh) | (counts[6:0]   >= thresh);
+        end
+    endfunction
+
 endmodule
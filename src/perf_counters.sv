@@ -0,0 +1,89 @@
+module perf_counters(
+    input clk,
+    input reset_n,
+    input logic [2:0] state,
+    input logic [3:0] sel,
+    output logic [7:0] data_out
+);
+    //////////////////////////////////////////////////
+    // Debug / performance counters
+    //
+    // Per-image cycle counts for each FSM state (cleared when a new LOAD
+    // starts) plus a running count of completed images, read out one byte
+    // at a time:
+    //
+    //   sel[3:1] = counter, sel[0] = byte (0 = low, 1 = high)
+    //     0: {5'b0, state}        (high byte reads 0)
+    //     1: cycles in s_LOAD
+    //     2: cycles in s_LAYER_1
+    //     3: cycles in s_LAYER_2
+    //     4: cycles in s_LAYER_3
+    //     5: images processed (LAYER_3 -> IDLE transitions since reset)
+    //
+    // All counters are 16 bits and saturate at 16'hFFFF.
+    //////////////////////////////////////////////////
+
+    localparam s_IDLE    = 3'b000,
+               s_LOAD    = 3'b001,
+               s_LAYER_1 = 3'b010,
+               s_LAYER_2 = 3'b011,
+               s_LAYER_3 = 3'b100;
+
+    logic [2:0]  prev_state;
+    logic [15:0] cyc_load, cyc_layer_1, cyc_layer_2, cyc_layer_3, images;
+    logic [15:0] selected;
+
+    function [15:0] sat_inc;
+        input [15:0] val;
+        begin
+            sat_inc = (val == 16'hFFFF) ? val : val + 1;
+        end
+    endfunction
+
+    always @ (posedge clk) begin
+        if (!reset_n) begin
+            prev_state  <= s_IDLE;
+            cyc_load    <= 'd0;
+            cyc_layer_1 <= 'd0;
+            cyc_layer_2 <= 'd0;
+            cyc_layer_3 <= 'd0;
+            images      <= 'd0;
+        end else begin
+            prev_state <= state;
+            case (state)
+                s_LOAD: begin
+                    if (prev_state != s_LOAD) begin
+                        // New image: restart the per-image counts
+                        cyc_load    <= 'd1;
+                        cyc_layer_1 <= 'd0;
+                        cyc_layer_2 <= 'd0;
+                        cyc_layer_3 <= 'd0;
+                    end else begin
+                        cyc_load <= sat_inc(cyc_load);
+                    end
+                end
+                s_LAYER_1: cyc_layer_1 <= sat_inc(cyc_layer_1);
+                s_LAYER_2: cyc_layer_2 <= sat_inc(cyc_layer_2);
+                s_LAYER_3: cyc_layer_3 <= sat_inc(cyc_layer_3);
+                default: ;
+            endcase
+            if ((prev_state == s_LAYER_3) && (state == s_IDLE)) begin
+                images <= sat_inc(images);
+            end
+        end
+    end
+
+    always @(*) begin
+        case (sel[3:1])
+            3'd0:    selected = {13'd0, state};
+            3'd1:    selected = cyc_load;
+            3'd2:    selected = cyc_layer_1;
+            3'd3:    selected = cyc_layer_2;
+            3'd4:    selected = cyc_layer_3;
+            3'd5:    selected = images;
+            default: selected = 'd0;
+        endcase
+        data_out = sel[0] ? selected[15:8] : selected[7:0];
+    end
+
+endmodule
@@ -4,14 +4,23 @@ module registers(
     input logic [2:0] state,
     input d_in_p,
     input d_in_w,
+    input load_thr,                     // sampled in s_IDLE: next LOAD carries thresholds
     output logic [783:0] pixels,
     output logic [71:0] weights1,
     output logic [287:0] weights2,
     output logic [1959:0] weights3,
+    output logic [31:0] thresholds1,    // layer_one,  filter f at [f*4 +: 4]
+    output logic [27:0] thresholds2,    // layer_two,  filter f at [f*7 +: 7]
+    output logic [79:0] thresholds3,    // dense layer, neuron n at [n*8 +: 8]
     output logic load_done
 );
 
-    localparam s_LOAD = 3'b001;
+    localparam s_IDLE = 3'b000,
+               s_LOAD = 3'b001;
+
+    // The data registers keep their contents between images; only the load
+    // counters and done flags are re-armed in s_IDLE so a new LOAD can
+    // start without a reset.
 
     // logic sync_out_pixel, sync_out_weight;
 
@@ -40,6 +49,10 @@ module registers(
             pic_done <= 1'b0;
             row <= 'd0;
             col <= 'd0;
+        end else if (state == s_IDLE) begin
+            pic_done <= 1'b0;
+            row <= 'd0;
+            col <= 'd0;
         end else if ((state == s_LOAD) && ~pic_done) begin
            pixels[row*28 + col] <= sync_out_pixel;
            if (col < 'd27) begin
@@ -67,6 +80,11 @@ module registers(
             bitt <= 'd0;
             trit <= 'd0;
             level <= 'd0;
+        end else if (state == s_IDLE) begin
+            w_done <= 'd0;
+            bitt <= 'd0;
+            trit <= 'd0;
+            level <= 'd0;
         end else if ((state == s_LOAD) && ~w_done) begin
             weights1[trit*24 + bitt*8 + level] <= sync_out_weight;
             if (bitt < 2) begin
@@ -107,6 +125,12 @@ module registers(
             trit1    <= 'd0;
             level1   <= 'd0;
             chan1     <= 'd0;
+        end else if (state == s_IDLE) begin
+            w_done1  <= 'd0;
+            bitt1    <= 'd0;
+            trit1    <= 'd0;
+            level1   <= 'd0;
+            chan1    <= 'd0;
         end else if ((state == s_LOAD) && w_done && ~w_done1) begin
             weights2[level1*72 + (trit1*3 + bitt1)*8 + chan1] <= sync_out_weight;
             if (chan1 < 7) begin
@@ -147,6 +171,10 @@ module registers(
             w_done3    <= 'd0;
             neuron_w3  <= 'd0;
             bit_w3     <= 'd0;
+        end else if (state == s_IDLE) begin
+            w_done3    <= 'd0;
+            neuron_w3  <= 'd0;
+            bit_w3     <= 'd0;
         end else if ((state == s_LOAD) && w_done && w_done1 && ~w_done3) begin
             weights3[neuron_w3*196 + bit_w3] <= sync_out_weight;
             if (bit_w3 < 195) begin
@@ -166,6 +194,39 @@ module registers(
         end
     end
 
-    assign load_done = (pic_done && w_done && w_done1 && w_done3) ? 1'b1 : 1'b0;
+    // Optional threshold segment: if load_thr is high in s_IDLE, the weight
+    // line carries THR_BITS more bits after weights3, captured in order into
+    // {thresholds3, thresholds2, thresholds1} (each field LSB first, filter /
+    // neuron 0 first). Otherwise the thresholds of the last such load are
+    // kept; reset restores the compiled-in ones from bnn_params.sv.
+    localparam THR_BITS = 32 + 28 + 80;
+
+    logic [THR_BITS-1:0] thr;
+    logic [7:0] bit_thr = 'd0;
+    logic t_done = 'd1;
+
+    always @ (posedge clk) begin
+        if (~reset_n) begin
+            thr     <= {bnn_params::DENSE_THRESHOLDS, bnn_params::LAYER2_THRESHOLDS,
+                        bnn_params::LAYER1_THRESHOLDS};
+            t_done  <= 'd1;
+            bit_thr <= 'd0;
+        end else if (state == s_IDLE) begin
+            t_done  <= ~load_thr;
+            bit_thr <= 'd0;
+        end else if ((state == s_LOAD) && w_done3 && ~t_done) begin
+            thr[bit_thr] <= sync_out_weight;
+            if (bit_thr < THR_BITS - 1) begin
+                bit_thr <= bit_thr + 1;
+            end else begin
+                // Full
+                t_done <= 1;
+            end
+        end
+    end
+
+    assign {thresholds3, thresholds2, thresholds1} = thr;
+
+    assign load_done = (pic_done && w_done && w_done1 && w_done3 && t_done) ? 1'b1 : 1'b0;
 
 endmodule
@@ -5,7 +5,16 @@
 
 `default_nettype none
 
-module tt_um_mnist_bnn (
+module tt_um_mnist_bnn #(
+    // Pipeline registers inside the layer_one / layer_two per-pixel cone
+    // (0 = fully combinational, up to 3; see layer_one.sv)
+    parameter LAYER_PIPE_STAGES = 0,
+    // Dense layer area/fmax trade-off (see flatten_layer.sv):
+    //   DENSE_CHUNK_BITS - XNOR bits popcounted per clock (196 = single cycle)
+    //   DENSE_EARLY_EXIT - stop once the leading neuron can no longer be overtaken
+    parameter DENSE_CHUNK_BITS = 196,
+    parameter DENSE_EARLY_EXIT = 0
+) (
     input  logic [7:0] ui_in,    // Dedicated inputs
     output logic [7:0] uo_out,   // Dedicated outputs
     input  logic [7:0] uio_in,   // IOs: Input path
@@ -19,8 +28,12 @@ module tt_um_mnist_bnn (
   // All output pins must be assigned. If not used, assign to 0.
   wire [3:0] answer_w;
   assign uo_out  = {4'b0, answer_w};  // bits[3:0]=answer, bits[7:4]=0
-  assign uio_out = 'd0;
-  assign uio_oe  = 'd0;
+
+  // Debug / perf readout: ui_in[3] drives uio_out, ui_in[7:4] selects the byte
+  // (see perf_counters.sv). uio stays an input bus while ui_in[3] is low.
+  wire [7:0] perf_data;
+  assign uio_out = ui_in[3] ? perf_data : 8'd0;
+  assign uio_oe  = {8{ui_in[3]}};
 
     // fsm top_fsm ( 
     //       .clk(clk), 
@@ -60,6 +73,9 @@ module tt_um_mnist_bnn (
   logic [71:0] weights1;
   logic [287:0] weights2;
   logic [1959:0] weights3;
+  logic [31:0] thresholds1;
+  logic [27:0] thresholds2;
+  logic [79:0] thresholds3;
   logic [1567:0] layer_1_out;
   logic [195:0] layer_2_out;
 
@@ -69,10 +85,16 @@ module tt_um_mnist_bnn (
     .state(state),
     .d_in_p(ui_in[1]),
     .d_in_w(ui_in[2]),
+    // uio[0] high while idle: the next load carries thresholds (registers.sv);
+    // ignored while uio drives the perf readout
+    .load_thr(uio_in[0] & ~ui_in[3]),
     .pixels(pixels),
     .weights1(weights1),
     .weights2(weights2),
     .weights3(weights3),
+    .thresholds1(thresholds1),
+    .thresholds2(thresholds2),
+    .thresholds3(thresholds3),
     .load_done(load_done)
   );
 
@@ -82,12 +104,15 @@ module tt_um_mnist_bnn (
   //Might not be necessary between memory fill-up and layer_one
   //Stick to comb stages
 
-  layer_one u1(
+  layer_one #(
+    .PIPE_STAGES(LAYER_PIPE_STAGES)
+  ) u1 (
     .clk(clk),
     .rst_n(synchronous_reset),
     .state(state),
     .pixels(pixels),
     .weights(weights1),
+    .thresholds(thresholds1),
     .layer_one_out(layer_1_out),
     .done(layer1_done)
   );
@@ -95,12 +120,15 @@ module tt_um_mnist_bnn (
   //Flop Stage (not trivial)
   //Michael will try to cook this up
 
-  layer_two u2(
+  layer_two #(
+    .PIPE_STAGES(LAYER_PIPE_STAGES)
+  ) u2 (
     .clk(clk),
     .rst_n(synchronous_reset),
     .state(state),
     .pixels(layer_1_out),
     .weights(weights2),
+    .thresholds(thresholds2),
     .layer_two_out(layer_2_out),
     .done(layer2_done)
   );
@@ -108,21 +136,33 @@ module tt_um_mnist_bnn (
   //Flop Stage (not trivial)
   //Michael will try to cook this up
 
-  final_layer_sequential u3 (
+  final_layer_sequential #(
+    .CHUNK_BITS(DENSE_CHUNK_BITS),
+    .EARLY_EXIT(DENSE_EARLY_EXIT)
+  ) u3 (
     .clock(clk),
     // CHANGE TO SYNCHRONOUS RESET
 	  .reset(rst_n),
     .state(state),
 	  .data_in(layer_2_out),
 	  .weights_in(weights3),
+	  .thresholds(thresholds3),
 	  .answer(answer_w),
     .layer_3_done(layer3_done)
   );
 
   //Flop Stage (not trivial)
   //Michael will try to cook this up
+
+  perf_counters u4 (
+    .clk(clk),
+    .reset_n(synchronous_reset),
+    .state(state),
+    .sel(ui_in[7:4]),
+    .data_out(perf_data)
+  );
     
   // List all unused inputs to prevent warnings
-  wire _unused = &{ena,ui_in[7:3], 1'b0};
+  wire _unused = &{ena, uio_in[7:1], 1'b0};
 
 endmodule
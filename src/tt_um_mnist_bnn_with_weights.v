@@ -49,6 +49,9 @@ module tt_um_mnist_bnn (
   logic [71:0]   weights1;   // Layer 1 weights
   logic [287:0]  weights2;   // Layer 2 weights
   logic [1959:0] weights3;   // Layer 3 weights
+  logic [31:0]   thresholds1;  // Layer 1 thresholds
+  logic [27:0]   thresholds2;  // Layer 2 thresholds
+  logic [79:0]   thresholds3;  // Layer 3 thresholds
   logic [1567:0] layer_1_out;
   logic [195:0]  layer_2_out;
 
@@ -59,10 +62,14 @@ module tt_um_mnist_bnn (
     .state(state),
     .d_in_p(ui_in[1]),      // pixel input
     .d_in_w(ui_in[2]),      // weight input
+    .load_thr(uio_in[0]),   // next load carries thresholds
     .pixels(pixels),
     .weights1(weights1),
     .weights2(weights2),
     .weights3(weights3),
+    .thresholds1(thresholds1),
+    .thresholds2(thresholds2),
+    .thresholds3(thresholds3),
     .load_done(load_done)
   );
 
@@ -73,6 +80,7 @@ module tt_um_mnist_bnn (
     .state(state),
     .pixels(pixels),
     .weights(weights1),
+    .thresholds(thresholds1),
     .layer_one_out(layer_1_out),
     .done(layer1_done)
   );
@@ -84,6 +92,7 @@ module tt_um_mnist_bnn (
     .state(state),
     .pixels(layer_1_out),
     .weights(weights2),
+    .thresholds(thresholds2),
     .layer_two_out(layer_2_out),
     .done(layer2_done)
   );
@@ -95,11 +104,12 @@ module tt_um_mnist_bnn (
     .state(state),
     .data_in(layer_2_out),
     .weights_in(weights3),
+    .thresholds(thresholds3),
     .answer(answer_w),
     .layer_3_done(layer3_done)
   );
     
   // List all unused inputs to prevent warnings
-  wire _unused = &{ena, uio_in, 1'b0};
+  wire _unused = &{ena, uio_in[7:1], 1'b0};
 
 endmodule
\ No newline at end of file
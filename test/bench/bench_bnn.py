@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+bench_bnn.py
+Benchmark suite for the reference model, stream builders and simulations.
+
+Usage:
+    python3 bench_bnn.py [-k PATTERN] [-j JOBS] [--repeat R]
+                         [--json results.json] [--save baseline.json]
+                         [--baseline baseline.json] [--tolerance PCT]
+
+Benchmarks (name: metric):
+    load.*     decoding the .ubin dataset and the weight CSVs       seconds
+    streams.*  pixel / weight stream building and hex packing       seconds
+    augment.*  packed-bit shift / rotate / flip augmentation        images/s
+    model.*    bnn_hw_model inference, one image at a time and
+               batched over the verifying set, and the bit-sliced
+               engine (bnn_bitslice)                                images/s
+    script.*   the standalone reference and generator scripts, run as
+               subprocesses (generators write to a temp directory)  seconds
+    sim.*      simulation throughput: the Verilator batch driver (if
+               built) and the last cocotb run (test/results.xml)   cycles/s
+
+Each benchmark is run --repeat times and reports its median. Decoded inputs
+are cached per process, so only the load.* benchmarks pay for decoding.
+With -j the benchmarks run in a process pool; this is faster but noisier,
+so baselines should be recorded with -j 1.
+
+--baseline compares against a file written by --save and exits 1 if any
+metric is more than --tolerance percent (default 20) worse. Benchmarks that
+need a tool this machine lacks (iverilog, the built Verilator model) are
+reported as skipped; a script or simulator that runs and fails is an error
+and also exits 1.
+The JSON report also carries weights/provenance.json (training seed, run
+key, dataset hash); comparing against a baseline recorded with other
+weights prints a warning.
+"""
+
+import argparse
+import concurrent.futures
+import fnmatch
+import functools
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+HERE      = os.path.dirname(os.path.abspath(__file__))
+TEST_DIR  = os.path.join(HERE, '..')
+MODEL_DIR = os.path.join(HERE, '../../src/Python311_training')
+sys.path.insert(0, MODEL_DIR)
+
+import bnn_augment as augment  # noqa: E402
+import bnn_bitslice as bitslice  # noqa: E402
+import bnn_hw_model as hw  # noqa: E402
+import bnn_streams as streams  # noqa: E402
+
+VERILATOR_DIR  = os.path.join(TEST_DIR, 'top_verilator')
+VERILATOR_EXEC = os.path.join(VERILATOR_DIR, 'obj_dir', 'Vtt_um_mnist_bnn')
+COCOTB_RESULTS = os.path.join(TEST_DIR, 'results.xml')
+CLOCK_PERIOD_NS = 10000       # test.py: Clock(dut.clk, 10, unit="us")
+
+SINGLE_IMAGES = 200           # model.per_image sample size
+SIM_IMAGES    = 20            # sim.verilator bundle size
+
+BENCHMARKS = {}
+
+
+class Skip(Exception):
+    """Raised by a benchmark whose tools are missing in this environment."""
+
+
+class BenchError(Exception):
+    """Raised when a benchmarked script or simulator runs and fails."""
+
+
+def bench(name, unit, higher_is_better=False, repeat=True):
+    """Register a benchmark: a function returning one measurement in `unit`."""
+    def register(fn):
+        BENCHMARKS[name] = dict(fn=fn, unit=unit, higher_is_better=higher_is_better,
+                                repeat=repeat)
+        return fn
+    return register
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+# ---------------------------------------------------------------------------
+# Cached inputs (decoded once per process)
+# ---------------------------------------------------------------------------
+@functools.lru_cache(maxsize=None)
+def images():
+    return hw.load_images()
+
+
+@functools.lru_cache(maxsize=None)
+def weights():
+    return hw.load_weights()
+
+# ---------------------------------------------------------------------------
+# Data loading
+# ---------------------------------------------------------------------------
+@bench('load.images', 's')
+def bench_load_images():
+    return timed(hw.load_images)
+
+
+@bench('load.labels', 's')
+def bench_load_labels():
+    return timed(hw.load_labels)
+
+
+@bench('load.weights', 's')
+def bench_load_weights():
+    return timed(hw.load_weights)
+
+# ---------------------------------------------------------------------------
+# Stream building
+# ---------------------------------------------------------------------------
+@bench('streams.pixel', 's')
+def bench_pixel_streams():
+    return timed(streams.pixel_streams, images())
+
+
+@bench('streams.weight', 's')
+def bench_weight_stream():
+    streams._weight_streams.clear()     # time the build, not the memo lookup
+    return timed(streams.weight_stream, weights())
+
+
+@bench('streams.hex_bundle', 's')
+def bench_hex_bundle():
+    return timed(streams.hex_text, streams.pixel_streams(images()))
+
+# ---------------------------------------------------------------------------
+# Training-data augmentation
+# ---------------------------------------------------------------------------
+@bench('augment.batch', 'images/s', higher_is_better=True)
+def bench_augment_batch():
+    words = augment.pack_rows(images())
+    aug = augment.Augmenter(max_shift=2, max_angle=10, flip=0.01)
+    return len(words) / timed(aug.images, words, np.random.default_rng(0))
+
+# ---------------------------------------------------------------------------
+# Golden-model inference
+# ---------------------------------------------------------------------------
+@bench('model.per_image', 'images/s', higher_is_better=True)
+def bench_model_per_image():
+    imgs, w = images()[:SINGLE_IMAGES], weights()
+    secs = timed(lambda: [hw.predict(imgs[i:i + 1], w) for i in range(len(imgs))])
+    return len(imgs) / secs
+
+
+@bench('model.layer_one', 'images/s', higher_is_better=True)
+def bench_model_layer_one():
+    imgs = images()
+    return len(imgs) / timed(hw.layer_one, imgs, weights()[0])
+
+
+@bench('model.batch', 'images/s', higher_is_better=True)
+def bench_model_batch():
+    imgs = images()
+    return len(imgs) / timed(hw.predict, imgs, weights())
+
+
+@bench('model.bitslice', 'images/s', higher_is_better=True)
+def bench_model_bitslice():
+    imgs = images()
+    return len(imgs) / timed(bitslice.predict, imgs, weights())
+
+
+@bench('model.state_cycles', 'images/s', higher_is_better=True)
+def bench_state_cycles():
+    w = weights()
+    l2_out = hw.layer_two(hw.layer_one(images(), w[0]), w[1])
+    return len(l2_out) / timed(hw.state_cycles, l2_out, w[2])
+
+# ---------------------------------------------------------------------------
+# Reference and generator scripts
+# ---------------------------------------------------------------------------
+def need_tools(*tools):
+    missing = [t for t in tools if not shutil.which(t)]
+    if missing:
+        raise Skip(f"{', '.join(missing)} not installed")
+
+
+def run_script(cwd, *cmd):
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, *cmd], cwd=os.path.join(TEST_DIR, cwd),
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    secs = time.perf_counter() - start
+    if proc.returncode != 0:
+        last = proc.stderr.strip().splitlines()[-1:] or ['no output']
+        raise BenchError(f"{cmd[0]} exit {proc.returncode}: {last[0]}")
+    return secs
+
+
+@bench('script.compare_trained_model', 's')
+def bench_compare_trained_model():
+    return run_script('layer_one_tb', 'compare_trained_model.py', '20')
+
+
+@bench('script.report_comparison', 's')
+def bench_report_comparison():
+    need_tools('iverilog', 'vvp')
+    return run_script('layer_one_tb', 'report_comparison.py', '1')
+
+
+@bench('script.gen_layer_two_tb', 's')
+def bench_gen_layer_two_tb():
+    with tempfile.TemporaryDirectory() as tmp:
+        return run_script('layer_two_tb', 'gen_layer_two_tb.py', '5',
+                          os.path.join(tmp, 'tb_layer_two.sv'))
+
+
+@bench('script.top_bundle_pack', 's')
+def bench_top_bundle_pack(tmp='bench_bundle.bin'):
+    try:
+        return run_script('top_verilator', 'top_bundle.py', 'pack', tmp, '1000')
+    finally:
+        path = os.path.join(VERILATOR_DIR, tmp)
+        if os.path.exists(path):
+            os.remove(path)
+
+# ---------------------------------------------------------------------------
+# Simulation throughput
+# ---------------------------------------------------------------------------
+@bench('sim.verilator', 'cycles/s', higher_is_better=True)
+def bench_sim_verilator():
+    if not os.path.exists(VERILATOR_EXEC):
+        raise Skip("Verilator model not built (make -C test/top_verilator build)")
+    bundle, results = 'bench_bundle.bin', 'bench_results.bin'
+    try:
+        run_script('top_verilator', 'top_bundle.py', 'pack', bundle, str(SIM_IMAGES))
+        proc = subprocess.run([VERILATOR_EXEC, bundle, results], cwd=VERILATOR_DIR,
+                              capture_output=True, text=True)
+    finally:
+        for name in (bundle, results):
+            path = os.path.join(VERILATOR_DIR, name)
+            if os.path.exists(path):
+                os.remove(path)
+    m = re.search(r'\(([\d.]+) cycles/s', proc.stdout)
+    if proc.returncode != 0 or not m:
+        raise BenchError(f"batch driver failed (exit {proc.returncode})")
+    return float(m.group(1))
+
+
+@bench('sim.cocotb', 'cycles/s', higher_is_better=True, repeat=False)
+def bench_sim_cocotb():
+    if not os.path.exists(COCOTB_RESULTS):
+        raise Skip("no test/results.xml (run make in test/ first)")
+    cycles = secs = 0.0
+    for case in ET.parse(COCOTB_RESULTS).iter('testcase'):
+        if case.get('sim_time_ns') and case.get('time'):
+            cycles += float(case.get('sim_time_ns')) / CLOCK_PERIOD_NS
+            secs   += float(case.get('time'))
+    if not secs:
+        raise Skip("results.xml has no timed test cases")
+    return cycles / secs
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+def run_one(name, repeat):
+    """Run one benchmark; return (name, result dict). Runs in a worker with -j."""
+    spec = BENCHMARKS[name]
+    try:
+        samples = [spec['fn']() for _ in range(repeat if spec['repeat'] else 1)]
+    except Skip as e:
+        return name, dict(unit=spec['unit'], skipped=str(e))
+    except BenchError as e:
+        return name, dict(unit=spec['unit'], failed=str(e))
+    return name, dict(unit=spec['unit'], higher_is_better=spec['higher_is_better'],
+                      median=statistics.median(samples), min=min(samples),
+                      max=max(samples), samples=len(samples))
+
+
+def run_all(names, repeat, jobs):
+    if jobs > 1:
+        with concurrent.futures.ProcessPoolExecutor(jobs) as pool:
+            results = dict(pool.map(run_one, names, [repeat] * len(names)))
+    else:
+        results = dict(run_one(name, repeat) for name in names)
+    return {name: results[name] for name in names}
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regression messages for metrics worse than tolerance %."""
+    regressions = []
+    for name, res in results.items():
+        base = baseline.get('results', {}).get(name)
+        if 'median' not in res or not base or 'median' not in base:
+            continue
+        new, old = res['median'], base['median']
+        change = 100.0 * (new - old) / old if old else 0.0
+        worse  = -change if res['higher_is_better'] else change
+        res['change_pct'] = change
+        if worse > tolerance:
+            regressions.append(f"{name}: {old:.4g} -> {new:.4g} {res['unit']} ({change:+.1f} %)")
+    return regressions
+
+
+def print_results(results):
+    print(f"{'benchmark':<32} {'median':>12} {'min':>12}  unit")
+    for name, res in results.items():
+        if 'skipped' in res or 'failed' in res:
+            status = 'skipped' if 'skipped' in res else 'FAILED'
+            print(f"{name:<32} {status:>12} {'':>12}  {res.get('skipped', res.get('failed'))}")
+            continue
+        change = f"  ({res['change_pct']:+.1f} % vs baseline)" if 'change_pct' in res else ''
+        print(f"{name:<32} {res['median']:>12.4g} {res['min']:>12.4g}  {res['unit']}{change}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BNN benchmark suite")
+    parser.add_argument('-k', dest='pattern', default='*', help="fnmatch pattern of benchmarks to run")
+    parser.add_argument('-j', dest='jobs', type=int, default=1, help="parallel worker processes")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per benchmark (default 5)")
+    parser.add_argument('--list', action='store_true', help="list benchmarks and exit")
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--save', help="write the results as a new baseline")
+    parser.add_argument('--baseline', help="baseline to compare against")
+    parser.add_argument('--tolerance', type=float, default=20.0,
+                        help="allowed regression per metric, in percent (default 20)")
+    args = parser.parse_args()
+
+    names = [n for n in BENCHMARKS if fnmatch.fnmatch(n, args.pattern)]
+    if args.list:
+        print('\n'.join(names))
+        return
+
+    if args.baseline and not os.path.exists(args.baseline):
+        parser.error(f"no baseline at {args.baseline} (record one with --save)")
+
+    results = run_all(names, args.repeat, args.jobs)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if baseline.get('weights', {}) != hw.load_provenance():
+            print(f"WARNING: {args.baseline} was recorded with different weights "
+                  f"(seed {baseline.get('weights', {}).get('seed')}, now {hw.load_provenance().get('seed')})")
+    print_results(results)
+
+    report = dict(python=platform.python_version(), numpy=np.__version__,
+                  machine=platform.machine(), processor=platform.processor(),
+                  repeat=args.repeat, jobs=args.jobs, weights=hw.load_provenance(), results=results)
+    for path in filter(None, (args.json, args.save)):
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Written {path}")
+
+    failures = [f"{name}: {res['failed']}" for name, res in results.items() if 'failed' in res]
+    for msg in failures:
+        print(f"ERROR: {msg}")
+    for msg in regressions:
+        print(f"REGRESSION: {msg}")
+    if args.baseline or failures:
+        print("PASS" if not (regressions or failures)
+              else f"FAILED: {len(regressions)} regressions, {len(failures)} errors")
+    sys.exit(1 if regressions or failures else 0)
+
+
+if __name__ == '__main__':
+    main()
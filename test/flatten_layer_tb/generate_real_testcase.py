@@ -4,8 +4,9 @@ os.environ["TF_USE_LEGACY_KERAS"] = "1"
 import larq as lq
 import tensorflow as tf
 import numpy as np
+import argparse
 import struct
-import random
+import sys
 
 # Every time this module is run, a layer_inputs.mem file is created in the current_test_cases_values directory that contains the inputs to the final layer
 # The associated label for the inputs is also generated and placed in the label.mem file
@@ -13,13 +14,30 @@ import random
 # To use this module for the testbench, first generate the .mem files by running this script, then run the testbench where the 3rd testcase will
 # automatically load in the generated values for verification
 
+# The test image is drawn from the verifying set with a seeded generator (--seed, default $BNN_SEED, else 0),
+# so the same seed always regenerates the same test case; --index picks one directly
+
 images_verifying_filepath = "./src/Python311_training/training_data/mnist_binary_verifying.ubin"
 labels_verifying_filepath = "./src/Python311_training/training_data/mnist_binary_labels_verifying.ubin"
 script_location = os.path.dirname(__file__)
+sys.path.insert(0, os.path.join(script_location, '../../src/Python311_training'))
+
+import bnn_hw_model as hw  # noqa: E402
+
+parser = argparse.ArgumentParser(description="Write the flatten-layer test case for one verifying image")
+parser.add_argument('--seed', type=int, default=hw.default_seed() or 0, help="selects the image (default $BNN_SEED, else 0)")
+parser.add_argument('--index', type=int, default=None, help="verifying-set index to use instead of a seeded draw")
+args = parser.parse_args()
 
 with open(images_verifying_filepath, 'rb') as file:
 	magic, size, rows, cols = struct.unpack(">IIII", file.read(16))
-	image_index_to_get = random.randint(0, size) # Index in MNIST data to test
+	if args.index is not None:
+		image_index_to_get = args.index
+	else:
+		image_index_to_get = int(np.random.default_rng(args.seed).integers(size)) # Index in MNIST data to test, 0..size-1
+	if not 0 <= image_index_to_get < size:
+		raise ValueError(f"Image index {image_index_to_get} out of range 0..{size - 1}")
+	print(f"Verifying image {image_index_to_get} (seed {args.seed})")
 	if magic != 2051:
 		raise ValueError(f"Magic number incorrect, should be 2051, was {magic}")
 	verifying_image_data = np.frombuffer(file.read(), dtype=np.uint8)
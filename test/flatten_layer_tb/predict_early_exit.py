@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+predict_early_exit.py
+Predicts how many s_LAYER_3 cycles the chunked dense layer spends per image
+on the verifying set, with and without early exit, using the bit-exact
+hardware model (src/Python311_training/bnn_hw_model.py).
+
+Usage:
+    python3 predict_early_exit.py [num_images] [chunk_bits...]
+
+    num_images: images from the verifying set to evaluate (default: all)
+    chunk_bits: CHUNK_BITS values to compare (default: 196 98 64 49 28 14 7)
+"""
+
+import os
+import sys
+
+import numpy as np
+
+HERE      = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(HERE, '../../src/Python311_training')
+sys.path.insert(0, MODEL_DIR)
+
+import bnn_hw_model as hw  # noqa: E402
+
+DEFAULT_CHUNKS = [196, 98, 64, 49, 28, 14, 7]
+
+
+def main():
+    num_images = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    chunks     = [int(x) for x in sys.argv[2:]] or DEFAULT_CHUNKS
+
+    images  = hw.load_images()[:num_images]
+    labels  = hw.load_labels()[:len(images)]
+    weights = hw.load_weights()
+
+    l2_out = hw.layer_two(hw.layer_one(images, weights[0]), weights[1])
+    reference = hw.argmax_first(hw.dense_scores(hw.dense_popcounts(l2_out, weights[2])))
+    print(f"Evaluated {len(images)} images, hardware accuracy "
+          f"{100.0 * np.mean(reference == labels):.2f} %")
+    print("")
+    print(f"{'CHUNK_BITS':>10} {'chunks':>6} {'full':>6} {'early avg':>10} "
+          f"{'saved avg':>10} {'exited':>8} {'p95':>5}")
+
+    for k in chunks:
+        full, _ = hw.dense_layer3_cycles(l2_out, weights[2], k, early_exit=False)
+        early, preds = hw.dense_layer3_cycles(l2_out, weights[2], k, early_exit=True)
+        assert np.array_equal(preds, reference), \
+            f"early exit changed a prediction at CHUNK_BITS={k}"
+        num_chunks = -(-hw.NUM_DENSE_INPUTS // k)
+        saved = full - early
+        print(f"{k:>10} {num_chunks:>6} {full[0]:>6} {early.mean():>10.2f} "
+              f"{saved.mean():>10.2f} {100.0 * np.mean(saved > 0):>7.1f}% "
+              f"{int(np.percentile(early, 95)):>5}")
+
+
+if __name__ == '__main__':
+    main()
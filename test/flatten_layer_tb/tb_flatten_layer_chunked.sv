@@ -0,0 +1,150 @@
+`timescale 1ns / 1ps
+
+// Chunked / early-exit dense layer vs. the single-cycle reference.
+// Every variant must produce the same answer as CHUNK_BITS = NUM_INPUTS;
+// without EARLY_EXIT it must take exactly ceil(NUM_INPUTS / CHUNK_BITS) edges,
+// with EARLY_EXIT never more than that. The reference answer is also checked
+// against a behavioral argmax of popcount - threshold (ties to the lower index)
+// with random dense batch-norm offsets, all-zero in every third test.
+
+module tb_flatten_layer_chunked;
+	parameter NUM_INPUTS = 196;
+	parameter NUM_TESTS  = 200;
+
+	localparam s_IDLE    = 3'b000;
+	localparam s_LOAD    = 3'b001;
+	localparam s_LAYER_3 = 3'b100;
+
+	logic clock;
+	logic reset;
+	logic [2:0] state;
+	logic [NUM_INPUTS-1:0] data_in;
+	logic [NUM_INPUTS*10-1:0] weights_in;
+	logic [79:0] thresholds;
+
+	logic [3:0] answer_ref, answer_49, answer_32_ee, answer_7_ee;
+	logic done_ref, done_49, done_32_ee, done_7_ee;
+
+	final_layer_sequential #(.NUM_INPUTS(NUM_INPUTS)) dut_ref (
+		.clock(clock), .reset(reset), .state(state),
+		.data_in(data_in), .weights_in(weights_in), .thresholds(thresholds),
+		.answer(answer_ref), .layer_3_done(done_ref)
+	);
+
+	final_layer_sequential #(.NUM_INPUTS(NUM_INPUTS), .CHUNK_BITS(49)) dut_49 (
+		.clock(clock), .reset(reset), .state(state),
+		.data_in(data_in), .weights_in(weights_in), .thresholds(thresholds),
+		.answer(answer_49), .layer_3_done(done_49)
+	);
+
+	final_layer_sequential #(.NUM_INPUTS(NUM_INPUTS), .CHUNK_BITS(32), .EARLY_EXIT(1)) dut_32_ee (
+		.clock(clock), .reset(reset), .state(state),
+		.data_in(data_in), .weights_in(weights_in), .thresholds(thresholds),
+		.answer(answer_32_ee), .layer_3_done(done_32_ee)
+	);
+
+	final_layer_sequential #(.NUM_INPUTS(NUM_INPUTS), .CHUNK_BITS(7), .EARLY_EXIT(1)) dut_7_ee (
+		.clock(clock), .reset(reset), .state(state),
+		.data_in(data_in), .weights_in(weights_in), .thresholds(thresholds),
+		.answer(answer_7_ee), .layer_3_done(done_7_ee)
+	);
+
+	initial begin
+		clock = 0;
+		forever #5 clock = ~clock;
+	end
+
+	integer t, i, cyc, errors, early_exits;
+	integer cyc_ref, cyc_49, cyc_32_ee, cyc_7_ee;
+	integer leader, n, matches, thr, score, best_score, expected;
+
+	initial begin
+		errors = 0;
+		early_exits = 0;
+		state = s_IDLE;
+		data_in = '0;
+		weights_in = '0;
+		thresholds = '0;
+		reset = 0;
+		#12 reset = 1;
+
+		$display("--- Chunked dense layer: %0d random tests ---", NUM_TESTS);
+
+		for (t = 0; t < NUM_TESTS; t++) begin
+			for (i = 0; i < NUM_INPUTS; i++) begin
+				data_in[i] = $urandom % 2;
+			end
+			for (i = 0; i < NUM_INPUTS*10; i++) begin
+				weights_in[i] = $urandom % 2;
+			end
+			// Every other test: one neuron is a noisy copy of the input, giving a
+			// clear leader so the early-exit path is exercised
+			if (t % 2) begin
+				leader = t % 10;
+				for (i = 0; i < NUM_INPUTS; i++) begin
+					weights_in[leader*NUM_INPUTS + i] = (($urandom % 8) == 0) ? ~data_in[i] : data_in[i];
+				end
+			end
+			for (n = 0; n < 10; n++) begin
+				thresholds[n*8 +: 8] = (t % 3 == 0) ? 8'd0 : 8'd80 + $urandom % 48;
+			end
+
+			// Behavioral answer: first neuron with the largest popcount - threshold
+			best_score = -1000;
+			expected = 0;
+			for (n = 0; n < 10; n++) begin
+				matches = 0;
+				for (i = 0; i < NUM_INPUTS; i++) begin
+					matches = matches + (weights_in[n*NUM_INPUTS + i] ~^ data_in[i]);
+				end
+				thr = thresholds[n*8 +: 8];
+				score = matches - thr;
+				if (score > best_score) begin
+					best_score = score;
+					expected = n;
+				end
+			end
+
+			// s_LOAD clears the accumulators, then run s_LAYER_3 until all finish
+			@(negedge clock) state = s_LOAD;
+			@(negedge clock) state = s_LAYER_3;
+			cyc_ref = 0; cyc_49 = 0; cyc_32_ee = 0; cyc_7_ee = 0;
+			for (cyc = 1; cyc <= 40; cyc++) begin
+				@(posedge clock) #1;
+				if (done_ref   && cyc_ref   == 0) cyc_ref   = cyc;
+				if (done_49    && cyc_49    == 0) cyc_49    = cyc;
+				if (done_32_ee && cyc_32_ee == 0) cyc_32_ee = cyc;
+				if (done_7_ee  && cyc_7_ee  == 0) cyc_7_ee  = cyc;
+			end
+			@(negedge clock) state = s_IDLE;
+
+			if (answer_ref !== expected[3:0]) begin
+				$display("FAIL test %0d: answer ref=%0d, expected %0d", t, answer_ref, expected);
+				errors++;
+			end
+			if (answer_49 !== answer_ref || answer_32_ee !== answer_ref || answer_7_ee !== answer_ref) begin
+				$display("FAIL test %0d: answers ref=%0d k49=%0d k32ee=%0d k7ee=%0d",
+					t, answer_ref, answer_49, answer_32_ee, answer_7_ee);
+				errors++;
+			end
+			if (cyc_ref != 1 || cyc_49 != 4) begin
+				$display("FAIL test %0d: cycles ref=%0d (exp 1) k49=%0d (exp 4)", t, cyc_ref, cyc_49);
+				errors++;
+			end
+			if (cyc_32_ee < 1 || cyc_32_ee > 7 || cyc_7_ee < 1 || cyc_7_ee > 28) begin
+				$display("FAIL test %0d: early-exit cycles k32ee=%0d (max 7) k7ee=%0d (max 28)",
+					t, cyc_32_ee, cyc_7_ee);
+				errors++;
+			end
+			if (cyc_7_ee < 28) early_exits++;
+		end
+
+		$display("Early exits (CHUNK_BITS=7): %0d / %0d tests", early_exits, NUM_TESTS);
+		if (errors == 0)
+			$display("ALL %0d TESTS PASSED", NUM_TESTS);
+		else
+			$display("FAILED: %0d errors", errors);
+		$display("--- Tests Completed ---");
+		$finish;
+	end
+endmodule
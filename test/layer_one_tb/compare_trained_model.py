@@ -4,8 +4,8 @@ Compare hardware layer_one output against the ACTUAL trained model.
 
 Sources:
   - Pixels:     Real MNIST test images from mnist_binary_verifying.ubin
-  - Weights:    Actual trained weights from layer_0_weights.mem
-  - Thresholds: Actual trained batch-norm thresholds from layer_1_thresholds.mem
+  - Weights:    Actual trained weights from layer_0_weights.csv
+  - Thresholds: Actual trained batch-norm thresholds from layer_1_thresholds.csv
   - Logic:      XNOR convolution + threshold + 2x2 max pooling (same as hardware)
 
 Usage:
@@ -20,19 +20,19 @@ import sys
 # ============================================================
 # Paths
 # ============================================================
-WEIGHTS_PATH    = "../../src/Python311_training/weights/layer_0_weights.mem"
-THRESH_PATH     = "../../src/Python311_training/weights/layer_1_thresholds.mem"
+WEIGHTS_PATH    = "../../src/Python311_training/weights/layer_0_weights.csv"
+THRESH_PATH     = "../../src/Python311_training/weights/layer_1_thresholds.csv"
 IMAGES_PATH     = "../../src/Python311_training/training_data/mnist_binary_verifying.ubin"
 LABELS_PATH     = "../../src/Python311_training/training_data/mnist_binary_labels_verifying.ubin"
 
 # ============================================================
 # Load trained weights: 8 kernels, each 9 bits (3x3)
-# File format: one line per kernel, "000110110" means row-major 3x3
+# File format: one line per kernel, "0,0,0,1,1,0,1,1,0" means row-major 3x3
 # weights[kernel][row][col]
 # ============================================================
 def load_weights():
     with open(WEIGHTS_PATH) as f:
-        lines = [l.strip() for l in f if l.strip()]
+        lines = [l.strip().replace(',', '') for l in f if l.strip()]
     assert len(lines) == 8, f"Expected 8 kernels, got {len(lines)}"
     weights = np.zeros((8, 3, 3), dtype=int)
     for k, line in enumerate(lines):
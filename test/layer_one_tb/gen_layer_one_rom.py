@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Export layer_one's full truth table as a ROM image for a LUT-based layer_one.
+
+Layer 1 only ever sees a zero-padded 3x3 binary window, so for a fixed
+weight set its eight threshold bits are a function of a 9-bit window code
+(bnn_hw_model.window_codes(): bit kr*3 + kc = pixel (r + kr - 1, c + kc - 1)).
+This writes that function as 512 lines of two hex digits, one per code,
+bit f = filter f fires, for
+
+    reg [7:0] layer_one_rom [0:511];
+    initial $readmemh("layer_one_rom.mem", layer_one_rom);
+
+The table is tied to one weight set and threshold set (weights/*.csv and
+layer_one.sv's thresholds by default); the serially loaded weights are no
+longer used by a design built on it.
+
+Usage:
+  python3 gen_layer_one_rom.py [output.mem] [--counts]
+
+--counts also writes the raw XNOR popcounts (one hex digit per filter,
+filter 7 first) to <output>.counts.mem, for checking the thresholds.
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+HERE      = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(HERE, '../../src/Python311_training')
+sys.path.insert(0, MODEL_DIR)
+
+import bnn_hw_model as hw  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the layer-1 lookup table as a ROM .mem")
+    parser.add_argument('output', nargs='?', default='layer_one_rom.mem')
+    parser.add_argument('--counts', action='store_true', help="also write the raw popcounts")
+    args = parser.parse_args()
+
+    w1 = hw.load_weights()[0]
+    rom = hw.layer_one_rom(w1)
+    with open(args.output, 'w') as f:
+        f.writelines(f"{byte:02x}\n" for byte in rom.tolist())
+    print(f"Wrote {args.output}: {len(rom)} x 8 bits, thresholds {list(hw.LAYER1_THRESHOLDS)}")
+
+    if args.counts:
+        counts = hw.layer_one_lut(w1, counts=True)
+        path = os.path.splitext(args.output)[0] + '.counts.mem'
+        with open(path, 'w') as f:
+            f.writelines(''.join(f"{c:x}" for c in row[::-1]) + '\n' for row in counts.tolist())
+        print(f"Wrote {path}")
+
+    fired = np.asarray(hw.layer_one_lut(w1)).sum(axis=0)
+    for f, n in enumerate(fired.tolist()):
+        print(f"  filter {f}: fires on {n:>3}/512 windows")
+
+
+if __name__ == '__main__':
+    main()
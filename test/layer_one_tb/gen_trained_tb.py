@@ -156,7 +156,7 @@ sv.append('    integer errors = 0, total_checks = 0;')
 sv.append('')
 sv.append('    layer_one dut (')
 sv.append('        .clk(clk), .rst_n(rst_n), .state(state),')
-sv.append('        .pixels(pixels), .weights(weights),')
+sv.append('        .pixels(pixels), .weights(weights), .thresholds(bnn_params::LAYER1_THRESHOLDS),')
 sv.append('        .layer_one_out(layer_one_out), .done(done)')
 sv.append('    );')
 sv.append('')
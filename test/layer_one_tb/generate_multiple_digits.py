@@ -1,11 +1,30 @@
 #!/usr/bin/env python3
 """
 Generate test vectors for multiple handwritten-style digits (0, 1, 2, 5, 7)
-Uses the same reference model as generate_test_vectors.py
+Uses the same reference model as generate_test_vectors.py, with the
+layer-1 thresholds of the exported weights (bnn_hw_model.LAYER1_THRESHOLDS,
+the values layer_one.sv gets from bnn_params.sv)
+
+Usage:
+  python3 generate_multiple_digits.py            print the vectors
+  python3 generate_multiple_digits.py --update   also rewrite them in tb_layer_one_digits.sv
 """
 
+import argparse
+import os
+import re
+import sys
+
 import numpy as np
 
+HERE      = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(HERE, '../../src/Python311_training')
+sys.path.insert(0, MODEL_DIR)
+
+import bnn_hw_model as hw  # noqa: E402
+
+TB_PATH = os.path.join(HERE, 'tb_layer_one_digits.sv')
+
 def binary_conv_pooling(pixels, weights):
     """
     Reference implementation of layer_one logic:
@@ -21,8 +40,8 @@ def binary_conv_pooling(pixels, weights):
     output = np.zeros((8, 14, 14), dtype=int)
 
     for w in range(8):  # For each weight kernel
-        # Threshold: even kernels use 5, odd kernels use 6
-        threshold = 5 + (w & 1)
+        # Threshold: per-kernel batch-norm threshold, as in layer_one.sv
+        threshold = hw.LAYER1_THRESHOLDS[w]
 
         for r in range(14):  # For each output row
             for c in range(14):  # For each output col
@@ -248,6 +267,25 @@ DIGITS = {
     ]
 }
 
+def update_testbench(path, declarations):
+    """Replace the `reg [..] NAME = N'b...;` lines of path with declarations."""
+    with open(path) as f:
+        text = f.read()
+    for line in declarations:
+        name = re.search(r"(\w+) =", line).group(1)
+        text, n = re.subn(rf"reg \[\d+:0\] {name} = \d+'b[01]+;", line, text)
+        if n != 1:
+            raise ValueError(f"{path}: expected one declaration of {name}, found {n}")
+    with open(path, 'w') as f:
+        f.write(text)
+    print(f"Updated {len(declarations)} vectors in {path}")
+
+
+parser = argparse.ArgumentParser(description="Generate the layer_one digit test vectors")
+parser.add_argument('--update', action='store_true', help=f"rewrite the vectors in {os.path.basename(TB_PATH)}")
+args = parser.parse_args()
+declarations = []
+
 # Use same weights for all digits
 weights_simple = np.random.randint(0, 2, (3, 3, 8))
 np.random.seed(42)  # For reproducibility
@@ -271,15 +309,18 @@ for digit_name in ['0', '1', '2', '5', '7']:
     # Flatten for Verilog
     p_flat, w_flat, e_flat = flatten_for_verilog(pixels, weights_simple, expected)
 
+    declarations += [f"reg [783:0] TEST_PIXELS_DIGIT_{digit_name} = 784'b{p_flat};",
+                     f"reg [1567:0] EXPECTED_OUTPUT_DIGIT_{digit_name} = 1568'b{e_flat};"]
     print(f"// Digit {digit_name}")
-    print(f"reg [783:0] TEST_PIXELS_DIGIT_{digit_name} = 784'b{p_flat};")
-    print(f"reg [1567:0] EXPECTED_OUTPUT_DIGIT_{digit_name} = 1568'b{e_flat};")
+    print(declarations[-2])
+    print(declarations[-1])
     print()
 
 # Print weights once
 p_flat, w_flat, e_flat = flatten_for_verilog(pixels, weights_simple, expected)
 print(f"// Common weights for all digit tests")
-print(f"reg [71:0] TEST_WEIGHTS_DIGITS = 72'b{w_flat};")
+declarations.append(f"reg [71:0] TEST_WEIGHTS_DIGITS = 72'b{w_flat};")
+print(declarations[-1])
 print()
 
 print("="*70)
@@ -292,3 +333,6 @@ for digit_name in ['0', '1', '2', '5', '7']:
     expected = binary_conv_pooling(pixels, weights_simple)
     print(f"  Digit {digit_name}: {np.sum(expected)} active outputs")
 print("="*70)
+
+if args.update:
+    update_testbench(TB_PATH, declarations)
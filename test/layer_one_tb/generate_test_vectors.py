@@ -4,8 +4,17 @@ Generate test vectors by running simple inputs through a reference model
 This helps verify the hardware implementation against known-good outputs
 """
 
+import os
+import sys
+
 import numpy as np
 
+HERE      = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(HERE, '../../src/Python311_training')
+sys.path.insert(0, MODEL_DIR)
+
+import bnn_hw_model as hw  # noqa: E402
+
 def binary_conv_pooling(pixels, weights):
     """
     Reference implementation of layer_one logic:
@@ -21,8 +30,8 @@ def binary_conv_pooling(pixels, weights):
     output = np.zeros((8, 14, 14), dtype=int)
     
     for w in range(8):  # For each weight kernel
-        # Threshold: even kernels use 5, odd kernels use 6
-        threshold = 5 + (w & 1)
+        # Threshold: per-kernel batch-norm threshold, as in layer_one.sv
+        threshold = hw.LAYER1_THRESHOLDS[w]
         
         for r in range(14):  # For each output row
             for c in range(14):  # For each output col
@@ -16,8 +16,8 @@ import sys
 import subprocess
 import os
 
-WEIGHTS_PATH = "../../src/Python311_training/weights/layer_0_weights.mem"
-THRESH_PATH  = "../../src/Python311_training/weights/layer_1_thresholds.mem"
+WEIGHTS_PATH = "../../src/Python311_training/weights/layer_0_weights.csv"
+THRESH_PATH  = "../../src/Python311_training/weights/layer_1_thresholds.csv"
 IMAGES_PATH  = "../../src/Python311_training/training_data/mnist_binary_verifying.ubin"
 LABELS_PATH  = "../../src/Python311_training/training_data/mnist_binary_labels_verifying.ubin"
 
@@ -26,7 +26,7 @@ NUM_IMAGES = int(sys.argv[1]) if len(sys.argv) > 1 else 5
 # ---- Load data -------------------------------------------------------
 def load_weights():
     with open(WEIGHTS_PATH) as f:
-        lines = [l.strip() for l in f if l.strip()]
+        lines = [l.strip().replace(',', '') for l in f if l.strip()]
     weights = np.zeros((8, 3, 3), dtype=int)
     for k, line in enumerate(lines):
         for i, bit in enumerate(line):
@@ -122,7 +122,7 @@ module tb_one;
     wire [1567:0] layer_one_out;
     wire done;
     layer_one dut(.clk(clk),.rst_n(rst_n),.state(state),
-                  .pixels(pixels),.weights(weights),
+                  .pixels(pixels),.weights(weights),.thresholds(bnn_params::LAYER1_THRESHOLDS),
                   .layer_one_out(layer_one_out),.done(done));
     initial begin clk=0; forever #5 clk=~clk; end
     initial begin
@@ -138,7 +138,7 @@ endmodule
     with open("/tmp/tb_one.sv", "w") as f:
         f.write(sv)
 
-    os.system("iverilog -g2012 -o /tmp/sim_one.vvp ../../src/layer_one.sv /tmp/tb_one.sv 2>/dev/null")
+    os.system("iverilog -g2012 -o /tmp/sim_one.vvp ../../src/bnn_params.sv ../../src/layer_one.sv /tmp/tb_one.sv 2>/dev/null")
     result = subprocess.run(
         ["vvp", "/tmp/sim_one.vvp"],
         capture_output=True, text=True,
@@ -176,8 +176,8 @@ labels     = load_labels()
 print("=" * 70)
 print("LAYER ONE: Hardware vs Trained Model — Comparison Report")
 print("=" * 70)
-print(f"Weights source : layer_0_weights.mem (actual trained weights)")
-print(f"Threshold src  : layer_1_thresholds.mem (actual batch-norm thresholds)")
+print(f"Weights source : layer_0_weights.csv (actual trained weights)")
+print(f"Threshold src  : layer_1_thresholds.csv (actual batch-norm thresholds)")
 print(f"Image source   : mnist_binary_verifying.ubin (real MNIST test set)")
 print(f"Images tested  : {NUM_IMAGES}")
 print()
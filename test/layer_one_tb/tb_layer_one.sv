@@ -160,6 +160,7 @@ module tb_layer_one;
         .state(state),
         .pixels(pixels),
         .weights(weights),
+        .thresholds(bnn_params::LAYER1_THRESHOLDS),
         .layer_one_out(layer_one_out),
         .done(done)
     );
@@ -230,7 +231,7 @@ module tb_layer_one;
         
         r_base = row * 2;
         c_base = col * 2;
-        threshold = 5 + (wt_num & 1);  // Alternates between 5 and 6
+        threshold = bnn_params::LAYER1_THRESHOLDS[wt_num*4 +: 4];  // as layer_one.sv
         
         // Check 4 positions for max pooling (2x2 window)
         val_00 = conv_single(r_base, c_base, pix, wts, wt_num, threshold);
@@ -545,7 +546,7 @@ module tb_layer_one;
         $display("\nTEST_WEIGHTS analysis:");
         for (int ch = 0; ch < 8; ch++) begin
             int zero_count = 0;
-            int threshold = 5 + (ch & 1);
+            int threshold = bnn_params::LAYER1_THRESHOLDS[ch*4 +: 4];
             logic expected_output;
             
             // Count zeros in this channel's kernel
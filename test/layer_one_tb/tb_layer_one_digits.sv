@@ -8,23 +8,23 @@ module tb_layer_one_digits;
 
     // Digit 0
     reg [783:0] TEST_PIXELS_DIGIT_0 = 784'b0000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001111111110000000000000000011111111111110000000000000011110000000111100000000000011110000000001111000000000011110000000000011110000000001110000000000000111000000001111000000000000011110000000111000000000000000111000000011100000000000000011100000001110000000000000001110000000111000000000000000111000000011100000000000000011100000001111000000000000011110000000011100000000000001110000000001111000000000001111000000000011110000000001111000000000000111100000001111000000000000001111111111111000000000000000001111111110000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000;
-    reg [1567:0] EXPECTED_OUTPUT_DIGIT_0 = 1568'b11111111111111111111111111111111100001111111100111100111110011111100111100111111101111011111111011110111111110111101111111001111101111110011111001111011111111100001111111111111111111111111111111111111111111111111111111111111111111111111111110110001111111011111101111110111111101111101111111101111011111111011110111111101111101111111011111101111101111111101111111111111111111111111111111111111000000000000000000000000000000000000000000000001111100000010000001100001101000001100010000000010000100000000100001100000001010001100000010100001100000000000001111110000000000000000000000000000000000000000000000000000000000000000011111100000001111111100000111000011100001100000011000111000000110001100000001100011100000011000011100000110000011000011100000111111110000000000010000000000000000001111111111111111111111111111111110000011111110011110011111100111110011111011111110111100111111100111001111111001110011111110111110011111101111110011100011111111111101111111111111111111111111111111000000000000000000000000000000000111111000000011111111000001110000111000011000000110001110000001100011000000011000111000000110000111000001100000110000111000001111111100000000000100000000000000000000000000000000000000000000000000111110000000011000011000001110000111000011000000110000100000000100001000000001000011000000110000111000001100000111001110000000011110000000000000000000000000000000000000000000000000000000000000000001000110000001111111010000111000111010001100000111100111000000110001100000001100011010000011100111110000110000110100011100000111111110000000111110000000000000000000;
+    reg [1567:0] EXPECTED_OUTPUT_DIGIT_0 = 1568'b11111111111111111111111111111111100001111111100111100111110011111100111100111111101111011111111011110111111110111101111111001111101111110011111001111011111111100001111111111111111111111111111111110000000000000000000000000000000000000000000000000000110000000000000100000000000000100001000000001000010000000010000100000000100000100000000000000100000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001111111111111111111111111111111110000011111110011110011111100111110011111011111110111100111111100111001111111001110011111110111110011111101111110011100011111111111101111111111111111111111111111111000000000000000000000000000000000111111000000011111111000001110000111000011000000110001110000001100011000000011000111000000110000111000001100000110000111000001111111100000000000100000000000000000000000000000000000000000000000000111111000000011100111000001110000111000011000000111001110000001100011000000011000111000000110000111000011100000111111110000000111111000000000000000000000000000000000000000000000000000000000000000000000000000001111111000000011000011000001100000010000010000000110000100000000100011000000001000010000000110000110000011100000111111100000000010000000000000000000000;
 
     // Digit 1
     reg [783:0] TEST_PIXELS_DIGIT_1 = 784'b0000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000011111111111110000000000000001111111111111000000000000000000001111000000000000000000000000111100000000000000000000000011110000000000000000000000001111000000000000000000000000111100000000000000000000000011110000000000000000000000001111000000000000000000000000111100000000000000000000000011110000000000000000000000001111000000000000000000000000111100000000000000000000000011110000000000000000000000001111111000000000000000000000111111000000000000000000000011111000000000000000000000001111000000000000000000000000111000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000;
-    reg [1567:0] EXPECTED_OUTPUT_DIGIT_1 = 1568'b11111111111111111111111111111111000000111111111110011111111111100111111111111001111111111110011111111111100111111111111001111111111110001111111111100111111111111011111111111111111111111111111111111111111111111111111111111111111111111111111111000011111111111110111111111111101111111111111011111111111110111111111111101111111111111011111111111110111111111111101111111111111111111111111111111111000000000000000000000000000000001000000000000011110111000000001000000000000010000000000000100000000000001000000000000010000000000000100000000000001000000000000011000000000000000000000000000000000000000000000000000000000000000000011111110000000111111100000000011100000000000111000000000001110000000000011100000000000111000000000001111000000000011110000000000111000000000000100000000000000000001111111111111111111111111111111110000001111111111001111111111110011111111111100111111111111001111111111110011111111111100111111111111000111111111110001111111111110111111111111111111111111111111111000000000000000000000000000000000111111100000001111111000000000111000000000001110000000000011100000000000111000000000001110000000000011110000000000111100000000001110000000000001000000000000000000000000000000000000000000000000000111111100000000001100000000000011000000000000110000000000001100000000000011000000000000110000000000001110000000000011100000000000110000000000000000000000000000000000000000000000000000000000000000000000001000000111111100000000011100000000000111000000000001110000000000011100000000000111000000000001111100000000011110000000000111000000000001100000000000000000000;
+    reg [1567:0] EXPECTED_OUTPUT_DIGIT_1 = 1568'b11111111111111111111111111111111000000111111111110011111111111100111111111111001111111111110011111111111100111111111111001111111111110001111111111100111111111111011111111111111111111111111111111110000000000000000000000000000000000000000000000000000000000000000010000000000000100000000000001000000000000010000000000000100000000000001000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001111111111111111111111111111111110000001111111111001111111111110011111111111100111111111111001111111111110011111111111100111111111111000111111111110001111111111110111111111111111111111111111111111000000000000000000000000000000000111111100000001111111000000000111000000000001110000000000011100000000000111000000000001110000000000011110000000000111100000000001110000000000001000000000000000000000000000000000000000000000000000111111100000000011110000000000111000000000001110000000000011100000000000111000000000001110000000000011110000000000111100000000001110000000000000000000000000000000000000000000000000000000000000000000000000000000111011100000000001000000000000010000000000000100000000000001000000000000010000000000000100000000000001110000000000111000000000000100000000000000000000;
 
     // Digit 2
     reg [783:0] TEST_PIXELS_DIGIT_2 = 784'b0000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000011111111111111110000000000001111111111111111000000000000000000000011110000000000000000000000011110000000000000000000000011110000000000000000000000011110000000000000000000000011110000000000000000000000011110000000000000000000000011110000000000000000000000011110000000000000000000000011110000000000000000000000011110000000000000000000000011110000000000000000000000011110000000000000000000000001110000000000000000000000000111100000000000111100000000001111000000000111100000000000011111000001111100000000000000111111111111100000000000000000111111110000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000;
-    reg [1567:0] EXPECTED_OUTPUT_DIGIT_2 = 1568'b11111111111111111111111111111110000000111111111111011111111111101111111111110111111111111011111111111101111111111110111111111111001111111111111001111001111111000000111111111111111111111111111111111111111111111111111111111111111111111111111110000001111111111110111111111111011111111111101111111111110111111111111011111111111101111111111111011111111111111011111011111111100011111111111111111111000000000000000000000000000000100000000000001111111011000000000000000000000000000000000000000000000000000000000000000000000001000000000000011000000000000011100010000000011111100000000000000000000000000000000000000000000000001111111110000011111111100000000001110000000000111000000000011100000000001110000000000111000000000011100000010000111100011100000111111110000000111111000000000000000001111111111111111111111111111111000000001111111111100111111111110001111111111000111111111100011111111110001111111111000111111111110011111111111100111100011111100000101111111111111111111111111111111000000000000000000000000000000011111111100000111111111000000000011100000000001110000000000111000000000011100000000001110000000000111000000100001111000111000001111111100000001111110000000000000000000000000000000000000000000000001111111100000000001110000000000011000000000001100000000000110000000000011000000000001100000000000110000000000000110000110000001111111100000000000000000000000000000000000000000000000000000000000000000000001000011111111100000000001110000000000111000000000011100000000001110000000000111000000000011100000001000110110011100001110001110000001111111000000000000000000;
+    reg [1567:0] EXPECTED_OUTPUT_DIGIT_2 = 1568'b11111111111111111111111111111110000000111111111111011111111111101111111111110111111111111011111111111101111111111110111111111111001111111111111001111001111111000000111111111111111111111111111111110000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000100000000000001000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001111111111111111111111111111111000000001111111111100111111111110001111111111000111111111100011111111110001111111111000111111111110011111111111100111100011111100000101111111111111111111111111111111000000000000000000000000000000011111111100000111111111000000000011100000000001110000000000111000000000011100000000001110000000000111000000100001111000111000001111111100000001111110000000000000000000000000000000000000000000000001111111100000000001111000000000111000000000011100000000001110000000000111000000000011100000000000110000001100001110000111000001111111100000000100000000000000000000000000000000000000000000000000000000000000000011111111100000000001110000000000111000000000011100000000001110000000000111000000000011100000000000110000011100000110001110000000111110000000000000000000;
 
     // Digit 5
     reg [783:0] TEST_PIXELS_DIGIT_5 = 784'b0000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000111111110000000000000000001111111111110000000000000001111100001111110000000000001111000000001111100000000001111000000000011110000000001111000000000000000000000000111000000000000000000000000011100000000000000000000000001111000000000000000000000000011110000000000000000000000000111110000000000000000000000000111111111111100000000000000000111111111110000000000000000000000000111000000000000000000000000011100000000000000000000000001110000000000000000000000000111000000000000000000000000111100000000000000111111111111110000000000000011111111111111000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000;
-    reg [1567:0] EXPECTED_OUTPUT_DIGIT_5 = 1568'b11111111111111111111111111111111100001111111110011100111111011111100111100111111111111101111111111111001111111111111110000011111111111100111111111111001111111000000011111111111111111111111111111111111111111111111111111111111111111111111111111011001111111101111100111110111111111111101111111111111101111111111111100111111111111111110111111111111101111111111111011111111000000111111111111111111000000000000000000000000000000000000000000000000111100000000010001111000100000000000001100000000000001100000000000001111110000000000000100000000000001000000010000000000000111111111000000000000000000000000000000000000000000000000011111100000001111111110000011100011100001110000001000011100000000000111100001000000111111110000000000001100000000000011000000111111110000001111111100000000000000001111111111111111111111111111111110000011111111001110001111100111111111111001111111111110011111111111110011111111111111111001111111111111011111111111110111111100000001111111111111111111111111111111000000000000000000000000000000000111111000000011111111100000111000111000011100000010000111000000000001111000010000001111111100000000000011000000000000110000001111111100000011111111000000000000000000000000000000000000000000000000011110000000001110111000000110000111000011000000000000111000000000000111000000000000001111100000000000011000000000000110000000111111100000000000000000000000000000000000000000000000000000000000000001000110000000111111011000011100111100001110000111000011110000000000111010000100000111111110000000011111100000000000011000000000001110000001111111100000000000000000;
+    reg [1567:0] EXPECTED_OUTPUT_DIGIT_5 = 1568'b11111111111111111111111111111111100001111111110011100111111011111100111100111111111111101111111111111001111111111111110000011111111111100111111111111001111111000000011111111111111111111111111111110000000000000000000000000000000000000000000000000000010000000000000100000000000000000000100000000000000000000000000000000001000000000000010000000000000100000000000001000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001111111111111111111111111111111110000011111111001110001111100111111111111001111111111110011111111111110011111111111111111001111111111111011111111111110111111100000001111111111111111111111111111111000000000000000000000000000000000111111000000011111111100000111000111000011100000010000111000000000001111000010000001111111100000000000011000000000000110000001111111100000011111111000000000000000000000000000000000000000000000000011111000000011110111100001110000111000011000000000000111000000000000111111110000000111111100000000000011000000000000110000000111111100000000000000000000000000000000000000000000000000000000000000000000000000000111110000000011100111100001110000010000010000000000000110000000000000111111000000000010001000000000000010000000000000100000001111111100000000000000000;
 
     // Digit 7
     reg [783:0] TEST_PIXELS_DIGIT_7 = 784'b0000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000011100000000000000000000000011110000000000000000000000001110000000000000000000000001111000000000000000000000000111000000000000000000000000111100000000000000000000000011100000000000000000000000011110000000000000000000000001110000000000000000000000001111000000000000000000000000111000000000000000000000000111100000000000000000000000011100000000000000000000000011110000000000000000000000001110000000000000000000000001111000000000000000000000000111000000000000000000000000111100000000000000000000000111100000000000000000000000111111111111111111000000000011111111111111111100000000000000000000000000000000000000000000000000000000000000000000000000000000000000000;
-    reg [1567:0] EXPECTED_OUTPUT_DIGIT_7 = 1568'b11111111111111111111111111111111111001111111111110011111111111001111111111110011111111111001111111111110011111111111001111111111110011111111111001111111111100010000011111111111111111111111111111111111111111111111111111111111111111101111111111111011111111111101111111111111011111111111101111111111111011111111111101111111111111011111111111101111111111110011111111111100000000011111111111111111000000000000000000000000000000000001010000000000110100000000001010000000000110100000000001010000000000110100000000001010000000000110100000000001010000000000100000000000001111111111000000000000000000000000000000000000000100000000000011000000000000110000000000011100000000000110000000000011100000000000110000000000011100000000000110000000000011100000000001111111110000011111111100000000000000001111111111111111111111111111111111110111111111111101111111111110111111111111101111111111110111111111111101111111111110111111111111101111111111110111111111111000000001111111111111111111111111111111000000000000000000000001000000000000110000000000001100000000000111000000000001100000000000111000000000001100000000000111000000000001100000000000111000000000011111111100000111111111000000000000000000000000000000000000000000000000000110000000000001100000000000110000000000001100000000000110000000000001100000000000110000000000001100000000000110000000000011111111100000000000000000000000000000000000000000000000000000010000000000011100000000000110000000000011100000000000110000000000011100000000000110000000000011100000000000110000000000011100000000001110000001000011111111100000000000000000;
+    reg [1567:0] EXPECTED_OUTPUT_DIGIT_7 = 1568'b11111111111111111111111111111111111001111111111110011111111111001111111111110011111111111001111111111110011111111111001111111111110011111111111001111111111100010000011111111111111111111111111111110000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001111111111111111111111111111111111110111111111111101111111111110111111111111101111111111110111111111111101111111111110111111111111101111111111110111111111111000000001111111111111111111111111111111000000000000000000000001000000000000110000000000001100000000000111000000000001100000000000111000000000001100000000000111000000000001100000000000111000000000011111111100000111111111000000000000000000000000000000000000001000000000000110000000000001100000000000111000000000001100000000000111000000000001100000000000111000000000001100000000000111000000000011111111100000000000000000000000000000000000000000000000000000000000000000001000000000000110000000000001000000000000110000000000001000000000000110000000000001000000000000110000000000011000000000000100000000000011111111100000000000000000;
 
     // Common weights for all digit tests
     reg [71:0] TEST_WEIGHTS_DIGITS = 72'b111101100000000110101011011111000001011100111111110101110100001000100010;
@@ -49,6 +49,7 @@ module tb_layer_one_digits;
         .state(state),
         .pixels(pixels),
         .weights(weights),
+        .thresholds(bnn_params::LAYER1_THRESHOLDS),
         .layer_one_out(layer_one_out),
         .done(done)
     );
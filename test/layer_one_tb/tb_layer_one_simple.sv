@@ -48,6 +48,7 @@ module tb_layer_one_simple;
         .state(state),
         .pixels(pixels),
         .weights(weights),
+        .thresholds(bnn_params::LAYER1_THRESHOLDS),
         .layer_one_out(layer_one_out),
         .done(done)
     );
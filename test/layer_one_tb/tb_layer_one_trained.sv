@@ -63,7 +63,7 @@ module tb_layer_one_trained;
 
     layer_one dut (
         .clk(clk), .rst_n(rst_n), .state(state),
-        .pixels(pixels), .weights(weights),
+        .pixels(pixels), .weights(weights), .thresholds(bnn_params::LAYER1_THRESHOLDS),
         .layer_one_out(layer_one_out), .done(done)
     );
 
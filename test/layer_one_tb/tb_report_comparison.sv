@@ -39,6 +39,7 @@ module tb_report_comparison;
         .state        (state),
         .pixels       (pixels),
         .weights      (wt_vec),
+        .thresholds   (bnn_params::LAYER1_THRESHOLDS),
         .layer_one_out(layer_one_out),
         .done         (done)
     );
@@ -95,11 +96,11 @@ module tb_report_comparison;
     // Software implementation of layer_one's conv + threshold + max-pool,
     // matching report_comparison.py::run_layer_one().
     //
-    // Reads module-level pixel_arr, weight_bits, thresholds.
+    // Reads module-level pixel_arr, weight_bits.
     // Writes result into module-level golden_out.
     //
-    // Note: threshold source matches the .mem file (alternates 5/6),
-    // which is identical to the hardware formula 5 + (weight_num & 1).
+    // Note: thresholds come from bnn_params::LAYER1_THRESHOLDS, the same
+    // vector the DUT gets (generated from weights/layer_1_thresholds.csv).
     // -----------------------------------------------------------------
     task compute_golden;
         integer gk, gr, gc, gpr, gpc, gkr, gkc;
@@ -107,7 +108,7 @@ module tb_report_comparison;
         logic   g_pval, g_wval, g_maxval;
 
         for (gk = 0; gk < 8; gk++) begin
-            g_thresh = thresholds[gk];
+            g_thresh = bnn_params::LAYER1_THRESHOLDS[gk*4 +: 4];
             for (gr = 0; gr < 14; gr++) begin
                 for (gc = 0; gc < 14; gc++) begin
                     g_maxval = 1'b0;
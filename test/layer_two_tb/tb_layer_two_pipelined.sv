@@ -0,0 +1,85 @@
+`timescale 1ns/1ps
+
+// layer_two PIPE_STAGES = 1..3 vs. the combinational layer (PIPE_STAGES = 0).
+// layer_two_out must be bit-identical, and done must rise exactly
+// max(PIPE_STAGES - 1, 0) cycles after the combinational version.
+
+module tb_layer_two_pipelined;
+
+    localparam [2:0] s_IDLE    = 3'b000;
+    localparam [2:0] s_LAYER_2 = 3'b011;
+    localparam NUM_TESTS = 8;
+
+    reg clk, rst_n;
+    reg [2:0]   state;
+    reg [1567:0] pixels;
+    reg [287:0]  weights;
+
+    wire [195:0]  out0, out1, out2, out3;
+    wire          done0, done1, done2, done3;
+
+    layer_two #(.PIPE_STAGES(0)) dut0 (.clk(clk), .rst_n(rst_n), .state(state),
+        .pixels(pixels), .weights(weights), .thresholds(bnn_params::LAYER2_THRESHOLDS), .layer_two_out(out0), .done(done0));
+    layer_two #(.PIPE_STAGES(1)) dut1 (.clk(clk), .rst_n(rst_n), .state(state),
+        .pixels(pixels), .weights(weights), .thresholds(bnn_params::LAYER2_THRESHOLDS), .layer_two_out(out1), .done(done1));
+    layer_two #(.PIPE_STAGES(2)) dut2 (.clk(clk), .rst_n(rst_n), .state(state),
+        .pixels(pixels), .weights(weights), .thresholds(bnn_params::LAYER2_THRESHOLDS), .layer_two_out(out2), .done(done2));
+    layer_two #(.PIPE_STAGES(3)) dut3 (.clk(clk), .rst_n(rst_n), .state(state),
+        .pixels(pixels), .weights(weights), .thresholds(bnn_params::LAYER2_THRESHOLDS), .layer_two_out(out3), .done(done3));
+
+    initial begin clk = 0; forever #5 clk = ~clk; end
+
+    integer t, i, cyc, errors;
+    integer cyc0, cyc1, cyc2, cyc3;
+
+    initial begin
+        errors = 0;
+        state  = s_IDLE;
+        rst_n  = 1'b1;
+
+        $display("\n====================================================");
+        $display("layer_two pipelined vs combinational (%0d random images)", NUM_TESTS);
+        $display("====================================================");
+
+        for (t = 0; t < NUM_TESTS; t = t + 1) begin
+            for (i = 0; i < 1568; i = i + 1) pixels[i]  = $urandom % 2;
+            for (i = 0; i < 288; i = i + 1) weights[i] = $urandom % 2;
+
+            @(negedge clk) rst_n = 1'b0;
+            @(negedge clk) rst_n = 1'b1;
+            @(negedge clk) state = s_LAYER_2;
+
+            cyc0 = 0; cyc1 = 0; cyc2 = 0; cyc3 = 0;
+            for (cyc = 1; cyc <= 210; cyc = cyc + 1) begin
+                @(posedge clk) #1;
+                if (done0 && cyc0 == 0) cyc0 = cyc;
+                if (done1 && cyc1 == 0) cyc1 = cyc;
+                if (done2 && cyc2 == 0) cyc2 = cyc;
+                if (done3 && cyc3 == 0) cyc3 = cyc;
+            end
+            @(negedge clk) state = s_IDLE;
+
+            if (out1 !== out0 || out2 !== out0 || out3 !== out0) begin
+                $display("FAIL  image=%0d  outputs differ from PIPE_STAGES=0", t);
+                errors = errors + 1;
+            end
+            if (cyc0 != 197 || cyc1 != cyc0 || cyc2 != cyc0 + 1 || cyc3 != cyc0 + 2) begin
+                $display("FAIL  image=%0d  done cycles %0d %0d %0d %0d (expected 197 197 198 199)",
+                         t, cyc0, cyc1, cyc2, cyc3);
+                errors = errors + 1;
+            end else begin
+                $display("PASS  image=%0d  (196/196 outputs identical, done at %0d/%0d/%0d/%0d)",
+                         t, cyc0, cyc1, cyc2, cyc3);
+            end
+        end
+
+        $display("\n====================================================");
+        if (errors == 0)
+            $display("ALL %0d TESTS PASSED", NUM_TESTS);
+        else
+            $display("FAILED: %0d errors", errors);
+        $display("====================================================\n");
+        $finish;
+    end
+
+endmodule
@@ -0,0 +1,116 @@
+# SPDX-FileCopyrightText: © 2024 Tiny Tapeout
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Bulk driver for the serial LOAD phase.
+
+The whole ui_in word sequence for an image (mode pulse, then one
+{weight, pixel} pair per clock) is built up front as a NumPy array and
+handed to the simulator in one of two ways:
+
+  hdl     written once to stream.hex and played back by the stream player
+          in tb.v (one word per clock); Python waits for a single
+          FallingEdge(stream_busy) per image.
+  python  one ui_in write per clock, awaiting a single reused RisingEdge
+          trigger with cached handles (used when tb.v has no player).
+
+Both produce exactly the same ui_in waveform as the original per-bit loop:
+word 0 is driven for the edge that moves the FSM into LOAD, word i for the
+i-th edge after it, and ui_in returns to 0 after the last word.
+
+SERIAL_LOADER=python|hdl in the environment overrides the automatic choice.
+With BNN_PROFILE set (bnn_profile.py), the hdl path is split into the
+Python side (stream file + handle writes) and the simulator side.
+"""
+
+import os
+import time
+
+import numpy as np
+from cocotb.triggers import FallingEdge, RisingEdge
+
+import bnn_profile as profile
+
+STREAM_FILE = 'stream.hex'
+MAX_WORDS   = 4096          # tb.v stream_mem depth
+
+MODE_BIT   = 0b001
+PIXEL_BIT  = 0b010
+WEIGHT_BIT = 0b100
+
+
+def build_load_words(p_bits, w_bits, hold_mode=False, extra=0):
+    """ui_in words for one image: mode pulse, then len(w_bits) data words.
+
+    hold_mode keeps ui_in[0] high while streaming; extra is OR-ed into
+    every word (e.g. the perf_counters readout enable).
+    """
+    w = np.asarray(w_bits, dtype=np.uint8)
+    p = np.zeros(len(w), dtype=np.uint8)
+    p_bits = np.asarray(p_bits, dtype=np.uint8).ravel()[:len(w)]
+    p[:len(p_bits)] = p_bits
+
+    words = np.empty(len(w) + 1, dtype=np.uint8)
+    words[0]  = MODE_BIT | extra
+    words[1:] = (w << 2) | (p << 1) | (MODE_BIT if hold_mode else 0) | extra
+    return words
+
+
+class SerialLoader:
+    """Drives precomputed ui_in word sequences into the tb.v top."""
+
+    def __init__(self, dut, mode=None):
+        self.dut  = dut
+        self._ui  = dut.ui_in
+        self._edge = RisingEdge(dut.clk)
+        mode = mode or os.environ.get('SERIAL_LOADER') or 'auto'
+        if mode == 'auto':
+            mode = 'hdl' if hasattr(dut, 'stream_start') else 'python'
+        if mode not in ('hdl', 'python'):
+            raise ValueError(f"unknown SerialLoader mode {mode!r}")
+        self.mode   = mode
+        self.cycles = 0
+        self.wall   = 0.0
+        if mode == 'hdl':
+            self._busy_fall = FallingEdge(dut.stream_busy)
+
+    async def load(self, words):
+        """Drive words, one per clock, starting now (call just after a rising edge)."""
+        words = np.asarray(words, dtype=np.uint8)
+        start = time.perf_counter()
+        if self.mode == 'hdl' and 2 <= len(words) <= MAX_WORDS:
+            await self._load_hdl(words)
+        else:
+            await self._load_python(words)
+        self.wall   += time.perf_counter() - start
+        self.cycles += len(words)
+
+    async def _load_python(self, words):
+        ui, edge = self._ui, self._edge
+        with profile.phase('cocotb.load.python'):
+            for w in words.tolist():
+                ui.value = w
+                await edge
+        ui.value = 0
+
+    async def _load_hdl(self, words):
+        dut = self.dut
+        with profile.phase('cocotb.load.write'):
+            with open(STREAM_FILE, 'w') as f:
+                f.write('\n'.join(f'{w:02x}' for w in words.tolist()))
+                f.write('\n')
+            dut.stream_len.value  = len(words)
+            dut.stream_load.value = 1 - int(dut.stream_load.value)    # $readmemh
+            self._ui.value = int(words[0])
+            dut.stream_start.value = 1 - int(dut.stream_start.value)  # play from word 1
+        with profile.phase('cocotb.load.sim'):
+            await self._busy_fall
+
+    @property
+    def cycles_per_second(self):
+        return self.cycles / self.wall if self.wall else 0.0
+
+    def report(self):
+        self.dut._log.info(
+            f"SerialLoader ({self.mode}): {self.cycles} cycles driven in "
+            f"{self.wall:.3f} s ({self.cycles_per_second:,.0f} cycles/s)")
@@ -6,13 +6,6 @@
 */
 module tb ();
 
-  // Dump the signals to a FST file. You can view it with gtkwave or surfer.
-  initial begin
-    $dumpfile("tb.fst");
-    $dumpvars(0, tb);
-    #1;
-  end
-
   // Wire up the inputs and outputs:
   reg clk;
   reg rst_n;
@@ -46,4 +39,71 @@ module tb ();
       .rst_n  (rst_n)     // not reset
   );
 
+  // Waveform dump, off by default (see TRACE* in the Makefile):
+  //   +trace*                     any trace plusarg opens tb.fst (paused)
+  //   +trace_all                  dump the whole run
+  //   +trace_from=N +trace_to=M   dump clock cycles [N, M)
+  // cocotb can also window the dump per image by driving trace_on.
+  reg        windowed = 1'b0;  // +trace without +trace_all
+  reg        trace_on = 1'b0;
+  reg [31:0] cycle    = 32'd0;
+  reg [31:0] trace_from, trace_to;
+
+  initial begin
+    if (!$value$plusargs("trace_from=%d", trace_from)) trace_from = 32'hFFFFFFFF;
+    if (!$value$plusargs("trace_to=%d", trace_to))     trace_to   = 32'hFFFFFFFF;
+    if ($test$plusargs("trace")) begin
+      $dumpfile("tb.fst");
+      $dumpvars(0, tb);
+      if (!$test$plusargs("trace_all")) begin
+        windowed = 1'b1;
+        $dumpoff;
+      end
+    end
+  end
+
+  always @(posedge clk) begin
+    cycle <= cycle + 1;
+    if (windowed && cycle == trace_from) $dumpon;
+    if (windowed && cycle == trace_to)   $dumpoff;
+  end
+
+  always @(trace_on) begin
+    if (windowed) begin
+      if (trace_on) $dumpon;
+      else          $dumpoff;
+    end
+  end
+
+  // Stream player for test/serial_loader.py: cocotb writes the ui_in word
+  // sequence to stream.hex, toggles stream_load to read it and drives word 0
+  // itself, then toggles stream_start; words 1..stream_len-1 follow one per
+  // clock and ui_in returns to 0 when stream_busy falls.
+  reg  [7:0]  stream_mem [0:4095];
+  reg  [12:0] stream_len   = 13'd0;
+  reg  [12:0] stream_pos   = 13'd0;
+  reg         stream_load  = 1'b0;
+  reg         stream_start = 1'b0;
+  reg         stream_seen  = 1'b0;
+  reg         stream_busy  = 1'b0;
+
+  always @(stream_load) if (stream_len != 0) $readmemh("stream.hex", stream_mem);
+
+  always @(posedge clk) begin
+    if (stream_start != stream_seen) begin
+      stream_seen <= stream_start;
+      stream_busy <= 1'b1;
+      stream_pos  <= 13'd2;
+      ui_in       <= stream_mem[1];
+    end else if (stream_busy) begin
+      if (stream_pos < stream_len) begin
+        ui_in      <= stream_mem[stream_pos];
+        stream_pos <= stream_pos + 1;
+      end else begin
+        stream_busy <= 1'b0;
+        ui_in       <= 8'd0;
+      end
+    end
+  end
+
 endmodule
@@ -7,65 +7,52 @@ from cocotb.triggers import ClockCycles
 
 import os
 import struct
+import sys
+
+import numpy as np
 
 # ---------------------------------------------------------------------------
 # Paths to pre-trained weights and binary MNIST data (relative to this file)
 # ---------------------------------------------------------------------------
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-WEIGHT_DIR = os.path.join(SCRIPT_DIR, '..', 'src', 'Python311_training', 'weights')
 DATA_DIR   = os.path.join(SCRIPT_DIR, '..', 'src', 'Python311_training', 'training_data')
+MODEL_DIR  = os.path.join(SCRIPT_DIR, '..', 'src', 'Python311_training')
+sys.path.insert(0, MODEL_DIR)
+
+import bnn_hw_model as hw  # noqa: E402
+import bnn_profile as profile  # noqa: E402
+import bnn_rtl_params as rtl_params  # noqa: E402
+import bnn_streams as streams  # noqa: E402
+from serial_loader import SerialLoader, build_load_words  # noqa: E402
 
 # ---------------------------------------------------------------------------
-# Cycle counts for each design phase (conservative upper bounds)
+# Cycle counts
 #
 #   LOAD:   max(784 pixel bits, 72 + 288 + 1960 weight bits) = 2320
-#   Layer1: 8 filters x 14 x 14 computations + 4 overhead   = 1572
-#   Layer2: 4 filters x 7  x 7  computations + 4 overhead   =  200
-#   Layer3: combinational pop-count -> 1 clock to register + margin = 10
+#   Layers: from bnn_hw_model.state_cycles() for the DUT's LAYER_PIPE_STAGES,
+#           DENSE_CHUNK_BITS and DENSE_EARLY_EXIT (inference_wait()),
+#           plus WAIT_MARGIN
 # ---------------------------------------------------------------------------
 LOAD_CYCLES   = 2320
-LAYER1_CYCLES = 1572
-LAYER2_CYCLES = 200
-LAYER3_CYCLES = 10
-
+THRESHOLD_CYCLES = 140    # optional threshold segment after the weights (uio_in[0])
+WAIT_MARGIN   = 10
 
 # ---------------------------------------------------------------------------
-# Data helpers
+# perf_counters readout: ui_in[3] enables uio_out, ui_in[7:4] = {counter, byte}
 # ---------------------------------------------------------------------------
+PERF_ENABLE = 0b1000
+PERF_STATE, PERF_LOAD, PERF_LAYER_1, PERF_LAYER_2, PERF_LAYER_3, PERF_IMAGES = range(6)
 
-def load_csv_bits(path):
-    """Return a flat list of ints (0/1) from a comma-separated CSV file."""
-    bits = []
-    with open(path) as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                bits.extend(int(x) for x in line.split(','))
-    return bits
-
-
-def build_weight_stream():
-    """
-    Concatenate weights for all three layers into a single 2320-bit stream
-    matching the serial loading order in registers.sv:
-
-      Layer-1 (weights1): 72  bits -- 8 filters x 3x3 kernel, 1 input channel
-                                      order: filter (outer) -> row -> col (inner)
-      Layer-2 (weights2): 288 bits -- 4 filters x 3x3 kernel, 8 input channels
-                                      order: filter -> row -> col -> channel (inner)
-      Layer-3 (weights3): 1960 bits -- 10 neurons x 196 inputs
-                                      order: neuron (outer) -> bit (inner)
+# ---------------------------------------------------------------------------
+# Waveform windowing (set by the Makefile's TRACE_IMAGE / TRACE_ON_FAIL)
+# ---------------------------------------------------------------------------
+TRACE_IMAGE   = int(os.environ['TRACE_IMAGE']) if os.environ.get('TRACE_IMAGE') else None
+TRACE_ON_FAIL = os.environ.get('TRACE_ON_FAIL') == '1'
 
-    The CSV rows already encode weights in this order (see bnn_retrieve_weights.py).
-    """
-    w1 = load_csv_bits(os.path.join(WEIGHT_DIR, 'layer_0_weights.csv'))
-    w2 = load_csv_bits(os.path.join(WEIGHT_DIR, 'layer_3_weights.csv'))
-    w3 = load_csv_bits(os.path.join(WEIGHT_DIR, 'layer_7_weights.csv'))
-    assert len(w1) == 72,   f"weight-1: expected 72 bits, got {len(w1)}"
-    assert len(w2) == 288,  f"weight-2: expected 288 bits, got {len(w2)}"
-    assert len(w3) == 1960, f"weight-3: expected 1960 bits, got {len(w3)}"
-    return w1 + w2 + w3   # 2320 bits total
 
+# ---------------------------------------------------------------------------
+# Data helpers
+# ---------------------------------------------------------------------------
 
 def load_image_and_label(index=0):
     """
@@ -101,14 +88,92 @@ def load_image_and_label(index=0):
     return pixels, label
 
 
+def dut_param(dut, name, default):
+    """Read a top-level parameter; gate-level netlists have none, so fall back."""
+    try:
+        return int(getattr(dut.user_project, name).value)
+    except Exception:
+        return default
+
+
+def inference_wait(dut, images, weights, thresholds1=hw.LAYER1_THRESHOLDS,
+                   thresholds2=hw.LAYER2_THRESHOLDS, thresholds3=hw.DENSE_THRESHOLDS):
+    """Cycles to wait after stream_image() until the slowest of images has
+    its answer, from the cycle model and the DUT's top-level parameters."""
+    pipe_stages = dut_param(dut, 'LAYER_PIPE_STAGES', 0)
+    chunk_bits  = dut_param(dut, 'DENSE_CHUNK_BITS', hw.NUM_DENSE_INPUTS)
+    early_exit  = bool(dut_param(dut, 'DENSE_EARLY_EXIT', 0))
+    images = np.asarray(images, dtype=np.uint8).reshape(-1, 28, 28)
+    l2_out = hw.layer_two(hw.layer_one(images, weights[0], thresholds1), weights[1], thresholds2)
+    cycles = hw.state_cycles(l2_out, weights[2], pipe_stages, chunk_bits, early_exit,
+                             thresholds3=thresholds3)
+    # s_LOAD lasts one edge past the last streamed bit
+    return int(np.max(cycles['total'] - cycles['load'])) + 1 + WAIT_MARGIN
+
+
+# ---------------------------------------------------------------------------
+# Drive helpers
+# ---------------------------------------------------------------------------
+
+async def reset_dut(dut):
+    """Active-low rst_n for 10 cycles, then let reset_pipe release."""
+    dut.ena.value    = 1
+    dut.ui_in.value  = 0
+    dut.uio_in.value = 0
+    dut.rst_n.value  = 0
+    with profile.phase('cocotb.reset'):
+        await ClockCycles(dut.clk, 10)
+        dut.rst_n.value  = 1
+        await ClockCycles(dut.clk, 3)   # wait for synchronous_reset to propagate
+
+
+async def stream_image(loader, p_bits, w_stream):
+    """Pulse mode for one cycle (FSM IDLE -> LOAD), then drive the pixel /
+    weight streams, one bit of each per clock."""
+    with profile.phase('cocotb.load'):
+        await loader.load(build_load_words(p_bits, w_stream[:LOAD_CYCLES + THRESHOLD_CYCLES]))
+
+
+def set_trace(dut, on):
+    """Resume / pause the tb.v waveform dump (no effect unless a +trace plusarg is set)."""
+    dut.trace_on.value = int(on)
+
+
+async def retrace_image(dut, loader, p_bits, w_stream, cycles):
+    """Re-run one image from reset with the dump on, for TRACE_ON_FAIL."""
+    dut._log.info("Re-running the failing image with tracing on (tb.fst)")
+    await reset_dut(dut)
+    set_trace(dut, True)
+    await stream_image(loader, p_bits, w_stream)
+    await ClockCycles(dut.clk, cycles)
+    set_trace(dut, False)
+
+
+async def read_perf_counter(dut, counter):
+    """Read one 16-bit perf_counters value, low byte first."""
+    value = 0
+    for byte in range(2):
+        dut.ui_in.value = (((counter << 1) | byte) << 4) | PERF_ENABLE
+        with profile.phase('cocotb.readout'):
+            await ClockCycles(dut.clk, 1)
+        assert int(dut.uio_oe.value) == 0xFF, "uio_oe must be all-output while ui_in[3] is set"
+        value |= (int(dut.uio_out.value) & 0xFF) << (8 * byte)
+    dut.ui_in.value = 0
+    return value
+
+
 # ---------------------------------------------------------------------------
-# Cocotb test
+# Cocotb tests
 # ---------------------------------------------------------------------------
 
 @cocotb.test()
 async def test_project(dut):
     dut._log.info("Start")
 
+    # The RTL's thresholds (bnn_params.sv) must be the golden model's (weights/*.csv)
+    assert rtl_params.is_current(), \
+        f"{rtl_params.PACKAGE_PATH} does not match the exported weights; run bnn_rtl_params.py"
+
     # 10 us clock period (100 kHz) -- matches default Makefile setting
     clock = Clock(dut.clk, 10, unit="us")
     cocotb.start_soon(clock.start())
@@ -116,7 +181,7 @@ async def test_project(dut):
     # ------------------------------------------------------------------
     # 1.  Load weights and one test image
     # ------------------------------------------------------------------
-    w_stream = build_weight_stream()          # 2320 bits
+    w_stream = streams.weight_stream()        # 2320 bits, registers.sv order
 
     try:
         p_bits, label = load_image_and_label(0)
@@ -132,23 +197,11 @@ async def test_project(dut):
     #     2 extra rising edges after rst_n goes high.
     # ------------------------------------------------------------------
     dut._log.info("Reset")
-    dut.ena.value    = 1
-    dut.ui_in.value  = 0
-    dut.uio_in.value = 0
-    dut.rst_n.value  = 0
-    await ClockCycles(dut.clk, 10)
-    dut.rst_n.value  = 1
-    await ClockCycles(dut.clk, 3)   # wait for synchronous_reset to propagate
+    await reset_dut(dut)
 
     # ------------------------------------------------------------------
-    # 3.  Trigger LOAD state: pulse mode (ui_in[0] = 1) for one cycle
+    # 3.  Trigger LOAD state: pulse mode (ui_in[0] = 1) for one cycle,
     #     FSM: IDLE -> LOAD on the next rising edge
-    # ------------------------------------------------------------------
-    dut._log.info("Triggering LOAD state")
-    dut.ui_in.value = 0b001   # mode=1
-    await ClockCycles(dut.clk, 1)
-
-    # ------------------------------------------------------------------
     # 4.  Stream data into the design during LOAD
     #
     #     ui_in[1] = d_in_p  -- pixel bit, consumed for the first 784 cycles
@@ -159,17 +212,19 @@ async def test_project(dut):
     #     driven continuously on d_in_w.
     # ------------------------------------------------------------------
     dut._log.info("Streaming pixels and weights")
-    for i in range(LOAD_CYCLES):
-        p_bit = int(p_bits[i]) if i < 784 else 0
-        w_bit = int(w_stream[i])
-        dut.ui_in.value = (w_bit << 2) | (p_bit << 1)
-        await ClockCycles(dut.clk, 1)
+    loader = SerialLoader(dut)
+    set_trace(dut, TRACE_IMAGE == 0)
+    await stream_image(loader, p_bits, w_stream)
+    loader.report()
 
     # ------------------------------------------------------------------
     # 5.  Wait for all three BNN layers to compute
     # ------------------------------------------------------------------
     dut._log.info("Waiting for BNN inference to complete")
-    await ClockCycles(dut.clk, LAYER1_CYCLES + LAYER2_CYCLES + LAYER3_CYCLES)
+    wait = inference_wait(dut, p_bits, hw.load_weights())
+    with profile.phase('cocotb.wait'):
+        await ClockCycles(dut.clk, wait)
+    set_trace(dut, False)
 
     # ------------------------------------------------------------------
     # 6.  Read answer from uo_out[3:0] and validate
@@ -191,3 +246,126 @@ async def test_project(dut):
             f"Classification mismatch: hardware={answer}, expected={label}. "
             "Check model accuracy or streaming bit order if this persists."
         )
+        if TRACE_ON_FAIL:
+            await retrace_image(dut, loader, p_bits, w_stream, wait)
+
+    profile.report(dut._log.info, reset=True)
+
+
+@cocotb.test()
+async def test_perf_counters(dut):
+    """Run two images back to back and check the perf counters on uio_out
+    against the cycle model in bnn_hw_model.state_cycles()."""
+    clock = Clock(dut.clk, 10, unit="us")
+    cocotb.start_soon(clock.start())
+
+    pipe_stages = dut_param(dut, 'LAYER_PIPE_STAGES', 0)
+    chunk_bits  = dut_param(dut, 'DENSE_CHUNK_BITS', hw.NUM_DENSE_INPUTS)
+    early_exit  = bool(dut_param(dut, 'DENSE_EARLY_EXIT', 0))
+
+    weights  = hw.load_weights()
+    w_stream = streams.weight_stream()
+    indices  = [0, 1]
+    images   = hw.load_images()[indices]
+    l2_out   = hw.layer_two(hw.layer_one(images, weights[0]), weights[1])
+    expected = hw.state_cycles(l2_out, weights[2], pipe_stages, chunk_bits, early_exit)
+    _, predictions = hw.dense_layer3_cycles(l2_out, weights[2], chunk_bits, early_exit)
+
+    loader = SerialLoader(dut)
+    await reset_dut(dut)
+    assert int(dut.uio_oe.value) == 0, "uio must stay an input bus while ui_in[3] is low"
+    assert await read_perf_counter(dut, PERF_IMAGES) == 0
+
+    # No reset between images: the load counters and layer done flags re-arm
+    for n, index in enumerate(indices):
+        p_bits = images[n].ravel()
+        wait   = inference_wait(dut, p_bits, weights)
+        set_trace(dut, TRACE_IMAGE == n)
+        await stream_image(loader, p_bits, w_stream)
+        with profile.phase('cocotb.wait'):
+            await ClockCycles(dut.clk, wait)
+        set_trace(dut, False)
+
+        measured = {
+            'load':    await read_perf_counter(dut, PERF_LOAD),
+            'layer_1': await read_perf_counter(dut, PERF_LAYER_1),
+            'layer_2': await read_perf_counter(dut, PERF_LAYER_2),
+            'layer_3': await read_perf_counter(dut, PERF_LAYER_3),
+        }
+        state  = await read_perf_counter(dut, PERF_STATE)
+        done   = await read_perf_counter(dut, PERF_IMAGES)
+        answer = int(dut.uo_out.value) & 0xF
+        dut._log.info(f"Image {index}: cycles {measured}, "
+                      f"total {sum(measured.values())}, answer {answer}")
+
+        errors = []
+        if state != 0:
+            errors.append(f"FSM not back in IDLE after image {index} (state={state})")
+        if done != n + 1:
+            errors.append(f"images counter {done}, expected {n + 1}")
+        for key, value in measured.items():
+            if value != expected[key][n]:
+                errors.append(f"image {index}: {key} took {value} cycles, "
+                              f"model predicts {expected[key][n]}")
+        if answer != predictions[n]:
+            errors.append(f"image {index}: answer {answer}, hardware model predicts {predictions[n]}")
+
+        if errors and TRACE_ON_FAIL:
+            await retrace_image(dut, loader, p_bits, w_stream, wait)
+        assert not errors, "; ".join(errors)
+
+    loader.report()
+    profile.report(dut._log.info, reset=True)
+
+
+@cocotb.test()
+async def test_loaded_thresholds(dut):
+    """Load thresholds over the serial threshold segment and check they are
+    used: they must hold for a later load without the segment and give way
+    to the compiled-in ones (bnn_params.sv) after reset."""
+    clock = Clock(dut.clk, 10, unit="us")
+    cocotb.start_soon(clock.start())
+
+    weights = hw.load_weights()
+    images  = hw.load_images()[:200]
+    thresholds1 = tuple(min(t + 1, 9) for t in hw.LAYER1_THRESHOLDS)
+    thresholds2 = tuple(t + 3 for t in hw.LAYER2_THRESHOLDS)
+    thresholds3 = (0,) * hw.NUM_CLASSES                 # raw dense popcounts
+    default, _ = hw.predict(images, weights)
+    only_1, _  = hw.predict(images, weights, thresholds1=thresholds1)
+    only_2, _  = hw.predict(images, weights, thresholds2=thresholds2)
+    only_3, _  = hw.predict(images, weights, thresholds3=thresholds3)
+    loaded, _  = hw.predict(images, weights, thresholds1=thresholds1, thresholds2=thresholds2,
+                            thresholds3=thresholds3)
+    # An image whose answer moves with any one layer's thresholds alone
+    moved  = (only_1 != default) & (only_2 != default) & (only_3 != default) & (loaded != default)
+    index  = int(np.flatnonzero(moved)[0])
+    p_bits = images[index].ravel()
+    w_stream = streams.weight_stream()
+    t_stream = np.concatenate([w_stream, streams.threshold_stream(thresholds1, thresholds2, thresholds3)])
+    wait = max(inference_wait(dut, p_bits, weights),
+               inference_wait(dut, p_bits, weights, thresholds1, thresholds2, thresholds3))
+    dut._log.info(f"Image {index}: default answer {default[index]}, with thresholds "
+                  f"{thresholds1} / {thresholds2} / {thresholds3}: {loaded[index]}")
+
+    loader = SerialLoader(dut)
+    await reset_dut(dut)
+    runs = [
+        ('threshold segment', 1, t_stream, loaded[index], False),
+        ('no segment',        0, w_stream, loaded[index], False),
+        ('after reset',       0, w_stream, default[index], True),
+    ]
+    for name, load_thr, stream, expected, reset in runs:
+        if reset:
+            await reset_dut(dut)
+        dut.uio_in.value = load_thr     # sampled while the FSM is idle
+        await stream_image(loader, p_bits, stream)
+        dut.uio_in.value = 0
+        with profile.phase('cocotb.wait'):
+            await ClockCycles(dut.clk, wait)
+        answer = int(dut.uo_out.value) & 0xF
+        dut._log.info(f"{name}: answer {answer}, hardware model predicts {expected}")
+        assert answer == expected, f"{name}: answer {answer}, hardware model predicts {expected}"
+
+    loader.report()
+    profile.report(dut._log.info, reset=True)
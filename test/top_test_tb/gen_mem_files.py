@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 gen_mem_files.py
-Generates pixels.mem and weights.mem for the top-level BNN testbench.
+Generates weights.mem and a one-image bundle (MNIST_data_gen/images.mem,
+labels.mem, test_config.mem) for the top-level BNN testbench.
 
 Weights are loaded from the real trained CSV files.
 The pixel image is a synthetic 28x28 binary pattern (no MNIST file needed).
@@ -11,13 +12,17 @@ Usage:
         digit: 0-9, selects which synthetic digit shape to use (default: 7)
 """
 
-import csv, os, sys
+import os, sys
 
 # ---------------------------------------------------------------------------
 # Paths (relative to this script's location)
 # ---------------------------------------------------------------------------
 HERE        = os.path.dirname(os.path.abspath(__file__))
-WEIGHTS_DIR = os.path.join(HERE, '../../src/Python311_training/weights')
+MODEL_DIR   = os.path.join(HERE, '../../src/Python311_training')
+sys.path.insert(0, MODEL_DIR)
+
+import bnn_streams as streams  # noqa: E402
+from gen_real_mnist_images import write_image_bundle  # noqa: E402
 
 # ---------------------------------------------------------------------------
 # Synthetic 28x28 binary digit images
@@ -223,42 +228,6 @@ DIGITS = {
 def _checkerboard():
     return [[(r+c)%2 for c in range(28)] for r in range(28)]
 
-# ---------------------------------------------------------------------------
-# Weight stream builders (must match registers.sv capture order)
-# ---------------------------------------------------------------------------
-
-def load_csv(path):
-    rows = []
-    with open(path, newline='') as f:
-        for line in csv.reader(f):
-            rows.append([int(x) for x in line])
-    return rows
-
-def build_w1(w1_csv):
-    """72 bits: level(0-7) outer, trit(0-2), bitt(0-2) inner."""
-    bits = []
-    for level in range(8):
-        for trit in range(3):
-            for bitt in range(3):
-                bits.append(w1_csv[level][trit*3 + bitt])
-    return bits
-
-def build_w2(w2_csv):
-    """288 bits: level1(0-3) outer, j(0-71) inner [=(kr*3+kc)*8+ch]."""
-    bits = []
-    for level1 in range(4):
-        for j in range(72):
-            bits.append(w2_csv[level1][j])
-    return bits
-
-def build_w3(w3_csv):
-    """1960 bits: neuron(0-9) outer, bit(0-195) inner."""
-    bits = []
-    for neuron in range(10):
-        for b in range(196):
-            bits.append(w3_csv[neuron][b])
-    return bits
-
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -275,31 +244,19 @@ def main():
         print("|" + "".join("#" if p else "." for p in row) + "|")
     print("+" + "-"*28 + "+")
 
-    # Pixel stream: row outer, col inner
-    pixel_bits = []
-    for row in image:
-        pixel_bits.extend(row)
+    # Serial streams in registers.sv capture order (weights from the CSVs)
+    pixel_bits  = streams.pixel_streams(image)[0]
+    weight_bits = streams.weight_stream()
     assert len(pixel_bits) == 784
-
-    # Weight streams from CSV
-    w1 = load_csv(os.path.join(WEIGHTS_DIR, 'layer_0_weights.csv'))
-    w2 = load_csv(os.path.join(WEIGHTS_DIR, 'layer_3_weights.csv'))
-    w3 = load_csv(os.path.join(WEIGHTS_DIR, 'layer_7_weights.csv'))
-
-    weight_bits = build_w1(w1) + build_w2(w2) + build_w3(w3)
     assert len(weight_bits) == 2320
 
-    # Write .mem files (one bit per line, $readmemb compatible)
-    with open(os.path.join(HERE, 'pixels.mem'), 'w') as f:
-        for b in pixel_bits:
-            f.write(f"{b}\n")
-
+    # weights.mem is one bit per line ($readmemb); the image goes into the
+    # same packed bundle as the real MNIST tests, labelled with the digit
     with open(os.path.join(HERE, 'weights.mem'), 'w') as f:
-        for b in weight_bits:
-            f.write(f"{b}\n")
-
-    print(f"Written pixels.mem  ({len(pixel_bits)} bits)")
+        f.write(streams.mem_text(weight_bits))
     print(f"Written weights.mem ({len(weight_bits)} bits)")
+
+    write_image_bundle([pixel_bits], [digit], [0])
     print("Ready to simulate.")
 
 if __name__ == '__main__':
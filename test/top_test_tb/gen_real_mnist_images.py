@@ -4,16 +4,29 @@ gen_real_mnist_images.py
 Loads real MNIST images from the binary training data and generates
 multiple test cases for the BNN testbench.
 
+All test images go into one packed bundle read once by tb_top.sv:
+    MNIST_data_gen/images.mem   one 784-bit pixel stream per line (196 hex digits)
+    MNIST_data_gen/labels.mem   one expected label per line (hex)
+    test_config.mem             number of images, then one MNIST index per line (hex)
+Line N of each file belongs to test image N.
+
 Usage:
     python3 gen_real_mnist_images.py [indices...]
-    
-    indices: Space-separated list of MNIST image indices to test (default: 0 1)
+    python3 gen_real_mnist_images.py --start S --count N
+    python3 gen_real_mnist_images.py --all
+    python3 gen_real_mnist_images.py --sample N [--seed S]
+
+    indices: Space-separated list of MNIST image indices to test
+    --start/--count: a contiguous range of the verifying set (default: 0..79)
+    --all: the whole verifying set
+    --sample: N distinct random indices, drawn with --seed (default $BNN_SEED,
+              else 0) so a seed always regenerates the same bundle
     Example: python3 gen_real_mnist_images.py 0 5 10 15 20
 """
 
+import argparse
 import struct
 import numpy as np
-import csv
 import os
 import sys
 
@@ -23,10 +36,19 @@ import sys
 HERE        = os.path.dirname(os.path.abspath(__file__))
 MNIST_DIR   = os.path.join(HERE, 'MNIST_data_gen')
 DATA_DIR    = os.path.join(HERE, '../../src/Python311_training/training_data')
-WEIGHTS_DIR = os.path.join(HERE, '../../src/Python311_training/weights')
+MODEL_DIR   = os.path.join(HERE, '../../src/Python311_training')
+
+IMAGES_MEM  = os.path.join(MNIST_DIR, 'images.mem')
+LABELS_MEM  = os.path.join(MNIST_DIR, 'labels.mem')
+CONFIG_MEM  = os.path.join(HERE, 'test_config.mem')
+MAX_IMAGES  = 10000     # tb_top.sv MAX_IMAGES
 
 IMAGES_PATH = os.path.join(DATA_DIR, 'mnist_binary_verifying.ubin')
 LABELS_PATH = os.path.join(DATA_DIR, 'mnist_binary_labels_verifying.ubin')
+sys.path.insert(0, MODEL_DIR)
+
+import bnn_hw_model as hw  # noqa: E402
+import bnn_streams as streams  # noqa: E402
 
 # ---------------------------------------------------------------------------
 # Load MNIST binary data
@@ -60,70 +82,61 @@ def load_mnist_labels(filepath):
         return labels
 
 # ---------------------------------------------------------------------------
-# Weight stream builders (must match registers.sv capture order)
+# Packed image bundle for tb_top.sv
 # ---------------------------------------------------------------------------
-
-def load_csv(path):
-    rows = []
-    with open(path, newline='') as f:
-        for line in csv.reader(f):
-            rows.append([int(x) for x in line])
-    return rows
-
-def build_w1(w1_csv):
-    """72 bits: level(0-7) outer, trit(0-2), bitt(0-2) inner."""
-    bits = []
-    for level in range(8):
-        for trit in range(3):
-            for bitt in range(3):
-                bits.append(w1_csv[level][trit*3 + bitt])
-    return bits
-
-def build_w2(w2_csv):
-    """288 bits: level1(0-3) outer, j(0-71) inner [=(kr*3+kc)*8+ch]."""
-    bits = []
-    for level1 in range(4):
-        for j in range(72):
-            bits.append(w2_csv[level1][j])
-    return bits
-
-def build_w3(w3_csv):
-    """1960 bits: neuron(0-9) outer, bit(0-195) inner."""
-    bits = []
-    for neuron in range(10):
-        for b in range(196):
-            bits.append(w3_csv[neuron][b])
-    return bits
+def write_image_bundle(pixel_streams, labels, indices):
+    """Write images.mem, labels.mem and test_config.mem (line N = test image N)."""
+    assert len(pixel_streams) == len(labels) == len(indices)
+    assert len(indices) <= MAX_IMAGES, f"tb_top.sv holds at most {MAX_IMAGES} images"
+    os.makedirs(MNIST_DIR, exist_ok=True)
+    with open(IMAGES_MEM, 'w') as f:
+        f.write(streams.hex_text(pixel_streams))
+    with open(LABELS_MEM, 'w') as f:
+        f.writelines(f"{int(label):X}\n" for label in labels)
+    with open(CONFIG_MEM, 'w') as f:
+        f.write(f"{len(indices):X}\n")
+        f.writelines(f"{int(idx):X}\n" for idx in indices)
+    print(f"Written {IMAGES_MEM} ({len(indices)} images)")
+    print(f"Written {LABELS_MEM}")
+    print(f"Written {CONFIG_MEM}")
 
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
 def main():
-    # Parse command line arguments for image indices
-    if len(sys.argv) > 1:
-        indices = [int(x) for x in sys.argv[1:]]
-    else:
-        indices = [
-             0,  1,  2,  3,  4,  5,  6,  7,  8,  9,
-            10, 11, 12, 13, 14, 15, 16, 17, 18, 19,
-            20, 21, 22, 23, 24, 25, 26, 27, 28, 29,
-            30, 31, 32, 33, 34, 35, 36, 37, 38, 39,
-            40, 41, 42, 43, 44, 45, 46, 47, 48, 49,
-            50, 51, 52, 53, 54, 55, 56, 57, 58, 59,
-            60, 61, 62, 63, 64, 65, 66, 67,
-            91, 92,
-           111, 122, 131, 142, 151, 159,
-           184, 189, 202, 203,
-        ]
-    
+    parser = argparse.ArgumentParser(description="Generate the tb_top.sv image bundle")
+    parser.add_argument('indices', nargs='*', type=int, help="MNIST verifying-set indices")
+    parser.add_argument('--start', type=int, default=0, help="first index of a range (default 0)")
+    parser.add_argument('--count', type=int, default=80, help="images in the range (default 80)")
+    parser.add_argument('--all', action='store_true', help="every image in the verifying set")
+    parser.add_argument('--sample', type=int, help="N random distinct indices (seeded)")
+    parser.add_argument('--seed', type=int, default=None, help="seed for --sample (default $BNN_SEED, else 0)")
+    parser.add_argument('--quiet', action='store_true', help="skip the ASCII previews")
+    args = parser.parse_args()
+
     # Load MNIST data
     print(f"Loading MNIST data from {IMAGES_PATH}...")
     images, num_images, rows, cols = load_mnist_images(IMAGES_PATH)
     labels = load_mnist_labels(LABELS_PATH)
-    
+
+    if args.indices:
+        indices = args.indices
+    elif args.all:
+        indices = list(range(num_images))
+    elif args.sample:
+        seed = hw.default_seed(args.seed) or 0
+        rng = np.random.default_rng(seed)
+        indices = sorted(rng.choice(num_images, min(args.sample, num_images), replace=False).tolist())
+        print(f"Sampled {len(indices)} images with seed {seed}")
+    else:
+        indices = list(range(args.start, min(args.start + args.count, num_images)))
+
     print(f"Loaded {num_images} images of size {rows}x{cols}")
-    print(f"Will generate test cases for indices: {indices}")
+    if len(indices) > 20:
+        print(f"Will generate {len(indices)} test cases for indices {indices[0]}..{indices[-1]}")
+    else:
+        print(f"Will generate test cases for indices: {indices}")
     
     # Validate indices
     for idx in indices:
@@ -133,55 +146,30 @@ def main():
     
     # Load weights (same for all images)
     print("Loading trained weights...")
-    w1 = load_csv(os.path.join(WEIGHTS_DIR, 'layer_0_weights.csv'))
-    w2 = load_csv(os.path.join(WEIGHTS_DIR, 'layer_3_weights.csv'))
-    w3 = load_csv(os.path.join(WEIGHTS_DIR, 'layer_7_weights.csv'))
-    
-    weight_bits = build_w1(w1) + build_w2(w2) + build_w3(w3)
+    weight_bits = streams.weight_stream()
     assert len(weight_bits) == 2320, f"Expected 2320 weight bits, got {len(weight_bits)}"
     
     # Write weights.mem (same for all tests)
     weights_file = os.path.join(HERE, 'weights.mem')
     with open(weights_file, 'w') as f:
-        for b in weight_bits:
-            f.write(f"{b}\n")
+        f.write(streams.mem_text(weight_bits))
     print(f"Written {weights_file} ({len(weight_bits)} bits)")
     
-    # Write test configuration file with image indices and labels (HEX format for $readmemh)
-    config_file = os.path.join(HERE, 'test_config.mem')
-    with open(config_file, 'w') as f:
-        f.write(f"{len(indices):X}\n")  # Number of test images in HEX
-        for idx in indices:
-            f.write(f"{idx:X} {labels[idx]:X}\n")  # index and expected label in HEX
-    print(f"Written {config_file}")
-    
-    # Ensure output directory exists
-    os.makedirs(MNIST_DIR, exist_ok=True)
-
-    # Write individual pixel memory files for each image
-    for i, idx in enumerate(indices):
-        image = images[idx]
-        label = labels[idx]
-
-        # Print ASCII preview
-        print(f"\nTest image {i}: MNIST index {idx}, label={label}")
+    # Print ASCII previews
+    for i, idx in enumerate([] if args.quiet else indices):
+        print(f"\nTest image {i}: MNIST index {idx}, label={labels[idx]}")
         print("Image preview (# = white, . = black):")
         print("+" + "-"*28 + "+")
-        for row in image:
+        for row in images[idx]:
             print("|" + "".join("#" if p else "." for p in row) + "|")
         print("+" + "-"*28 + "+")
 
-        # Flatten to bit stream (row-major order)
-        pixel_bits = image.flatten().tolist()
-        assert len(pixel_bits) == 784, f"Expected 784 pixels, got {len(pixel_bits)}"
+    # Pixel streams in registers.sv order (row-major), one bundle for all images
+    pixel_streams = streams.pixel_streams(images[indices])
+    assert pixel_streams.shape == (len(indices), 784)
+    print()
+    write_image_bundle(pixel_streams, labels[indices], indices)
 
-        # Write pixels_N.mem file into MNIST_data_gen/
-        pixel_file = os.path.join(MNIST_DIR, f'pixels_{i}.mem')
-        with open(pixel_file, 'w') as f:
-            for b in pixel_bits:
-                f.write(f"{b}\n")
-        print(f"Written {pixel_file} ({len(pixel_bits)} bits)")
-    
     print(f"\n{'='*60}")
     print(f"Generated {len(indices)} test cases from real MNIST images!")
     print(f"Ready to simulate with updated testbench.")
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+summarize_results.py
+Summarizes the per-image results CSV written by tb_top.sv
+(test,index,label,prediction,cycles,timeout) and optionally diffs it
+against the results of a previous run.
+
+Usage:
+    python3 summarize_results.py [tb_results.csv] [--baseline old.csv]
+                                 [--json summary.json] [--latency-tol PCT]
+
+Prints the confusion matrix (rows = label, columns = prediction), per-class
+accuracy and cycles-to-done percentiles, overall and per class.
+
+With --baseline the two runs are matched by MNIST index and compared on
+the images both ran. The script exits 1 on a regression there: lower
+accuracy, more timeouts, or a latency percentile more than --latency-tol
+percent (default 0) above the baseline. Images whose prediction changed
+are listed either way.
+"""
+
+import argparse
+import csv
+import json
+import sys
+
+import numpy as np
+
+NUM_CLASSES = 10
+PERCENTILES = (50, 90, 99, 100)
+FIELDS      = ('test', 'index', 'label', 'prediction', 'cycles', 'timeout')
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+def load_results(path):
+    """Read a tb_top.sv results CSV into a dict of int arrays keyed by column."""
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    if rows and set(FIELDS) - set(rows[0]):
+        raise ValueError(f"{path}: expected columns {', '.join(FIELDS)}")
+    return {k: np.array([int(r[k]) for r in rows], dtype=np.int64) for k in FIELDS}
+
+
+# ---------------------------------------------------------------------------
+# Statistics
+# ---------------------------------------------------------------------------
+def confusion_matrix(labels, predictions):
+    """(NUM_CLASSES, 16) counts: row = label, column = 4-bit prediction."""
+    cm = np.zeros((NUM_CLASSES, 16), dtype=np.int64)
+    np.add.at(cm, (labels, predictions), 1)
+    return cm
+
+
+def percentiles(cycles):
+    if len(cycles) == 0:
+        return {f"p{p}": None for p in PERCENTILES}
+    return {f"p{p}": float(np.percentile(cycles, p)) for p in PERCENTILES}
+
+
+def is_correct(res):
+    """Per-image correctness: right prediction and no timeout."""
+    return (res['label'] == res['prediction']) & (res['timeout'] == 0)
+
+
+def subset(res, idx):
+    return {k: v[idx] for k, v in res.items()}
+
+
+def summarize(res):
+    """Summary dict (JSON-serialisable) for one results table."""
+    labels, preds, cycles = res['label'], res['prediction'], res['cycles']
+    correct = is_correct(res)
+    cm = confusion_matrix(labels, preds)
+    per_class = {}
+    for c in range(NUM_CLASSES):
+        mask = labels == c
+        per_class[c] = {
+            'images':   int(mask.sum()),
+            'accuracy': float(correct[mask].mean()) if mask.any() else None,
+            'cycles':   percentiles(cycles[mask]),
+        }
+    return {
+        'images':           int(len(labels)),
+        'correct':          int(correct.sum()),
+        'accuracy':         float(correct.mean()) if len(labels) else 0.0,
+        'timeouts':         int(res['timeout'].sum()),
+        'cycles':           percentiles(cycles),
+        'per_class':        per_class,
+        'confusion_matrix': cm[:, :NUM_CLASSES].tolist(),
+        'out_of_range':     int(cm[:, NUM_CLASSES:].sum()),
+    }
+
+
+def diff(res, base, latency_tol):
+    """Compare two runs on their common images; return (report dict, list
+    of regression messages)."""
+    common, i_new, i_old = np.intersect1d(res['index'], base['index'], return_indices=True)
+    new, old = subset(res, i_new), subset(base, i_old)
+    summary, base_summary = summarize(new), summarize(old)
+    ok_new, ok_old = is_correct(new), is_correct(old)
+    changed = new['prediction'] != old['prediction']
+    report = {
+        'common_images':  int(len(common)),
+        'accuracy_delta': summary['accuracy'] - base_summary['accuracy'],
+        'newly_wrong':    common[ok_old & ~ok_new].tolist(),
+        'newly_right':    common[~ok_old & ok_new].tolist(),
+        'changed':        common[changed].tolist(),
+        'cycles_delta':   {},
+    }
+    regressions = []
+    if summary['accuracy'] < base_summary['accuracy']:
+        regressions.append(f"accuracy {100 * base_summary['accuracy']:.2f} % -> "
+                           f"{100 * summary['accuracy']:.2f} %")
+    if summary['timeouts'] > base_summary['timeouts']:
+        regressions.append(f"timeouts {base_summary['timeouts']} -> {summary['timeouts']}")
+    for p, new in summary['cycles'].items():
+        old = base_summary['cycles'][p]
+        if new is None or old is None:
+            continue
+        report['cycles_delta'][p] = new - old
+        if new > old * (1 + latency_tol / 100.0):
+            regressions.append(f"cycles {p} {old:.0f} -> {new:.0f}")
+    return report, regressions
+
+
+# ---------------------------------------------------------------------------
+# Printing
+# ---------------------------------------------------------------------------
+def fmt_cycles(pct):
+    return "  ".join(f"{p} {'-' if v is None else f'{v:.0f}':>6}" for p, v in pct.items())
+
+
+def print_summary(summary):
+    print(f"Images      : {summary['images']}")
+    print(f"Accuracy    : {100 * summary['accuracy']:.2f} % ({summary['correct']} correct)")
+    print(f"Timeouts    : {summary['timeouts']}")
+    print(f"Cycles      : {fmt_cycles(summary['cycles'])}")
+    if summary['out_of_range']:
+        print(f"Predictions outside 0-9: {summary['out_of_range']}")
+    print("")
+    print("Confusion matrix (rows = label, columns = prediction):")
+    print("       " + "".join(f"{c:>6}" for c in range(NUM_CLASSES)))
+    for c, row in enumerate(summary['confusion_matrix']):
+        print(f"  {c:>3}  " + "".join(f"{n:>6}" for n in row))
+    print("")
+    print("Class  Images  Accuracy  Cycles")
+    for c, stats in summary['per_class'].items():
+        acc = '-' if stats['accuracy'] is None else f"{100 * stats['accuracy']:.1f} %"
+        print(f"  {c:>3}  {stats['images']:>6}  {acc:>8}  {fmt_cycles(stats['cycles'])}")
+
+
+def print_diff(report, regressions):
+    print("")
+    print(f"Against baseline ({report['common_images']} common images):")
+    print(f"  Accuracy delta : {100 * report['accuracy_delta']:+.2f} %")
+    print("  Cycles delta   : " + "  ".join(f"{p} {d:+.0f}" for p, d in report['cycles_delta'].items()))
+    for name in ('newly_wrong', 'newly_right', 'changed'):
+        idx = report[name]
+        if idx:
+            more = f" ... (+{len(idx) - 20})" if len(idx) > 20 else ""
+            print(f"  {name.replace('_', ' ').capitalize():<15}: {idx[:20]}{more}")
+    for msg in regressions:
+        print(f"REGRESSION: {msg}")
+    print("PASS" if not regressions else f"FAILED: {len(regressions)} regressions")
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Summarize tb_top.sv results")
+    parser.add_argument('results', nargs='?', default='tb_results.csv')
+    parser.add_argument('--baseline', help="results CSV of a previous run to diff against")
+    parser.add_argument('--json', help="also write the summary (and diff) as JSON")
+    parser.add_argument('--latency-tol', type=float, default=0.0,
+                        help="allowed cycles increase per percentile, in percent (default 0)")
+    args = parser.parse_args()
+
+    res = load_results(args.results)
+    summary = summarize(res)
+    print_summary(summary)
+
+    regressions = []
+    if args.baseline:
+        base = load_results(args.baseline)
+        report, regressions = diff(res, base, args.latency_tol)
+        summary['baseline'] = dict(report, file=args.baseline, regressions=regressions)
+        print_diff(report, regressions)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Written {args.json}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,9 @@
 // Top-level BNN testbench — plain Icarus Verilog (no cocotb)
-// Reads pixels.mem and weights.mem generated by gen_mem_files.py,
-// drives tt_um_mnist_bnn serially, and prints the result.
+// Reads weights.mem and the packed image bundle (MNIST_data_gen/images.mem,
+// labels.mem, test_config.mem) written by gen_real_mnist_images.py or
+// gen_mem_files.py, drives tt_um_mnist_bnn serially, and prints the result.
+// Every image is also logged to a CSV results file (+results=FILE, default
+// tb_results.csv) for summarize_results.py.
 `timescale 1ns/1ps
 
 module tb_top;
@@ -37,25 +40,57 @@ initial clk = 0;
 always  #5 clk = ~clk;
 
 // ---------------------------------------------------------------------------
-// Waveform dump (view with gtkwave)
+// Waveform dump (view with gtkwave) -- off by default:
+//   +trace_all                 dump the whole run
+//   +trace_image=N             dump only test image N
+//   +trace_from=A +trace_to=B  dump clock cycles [A, B)
+//   +trace_on_fail             re-run each failing image with the dump on
+// Any +trace* plusarg opens dumpfile.fst; windowed modes start paused.
 // ---------------------------------------------------------------------------
+reg        windowed = 1'b0;
+reg        trace_on_fail;
+reg [31:0] trace_image, trace_from, trace_to;
+reg [31:0] cycle = 32'd0;
+
 initial begin
-    $dumpfile("dumpfile.fst");
-    $dumpvars(0, tb_top);
+    trace_on_fail = $test$plusargs("trace_on_fail");
+    if (!$value$plusargs("trace_image=%d", trace_image)) trace_image = 32'hFFFFFFFF;
+    if (!$value$plusargs("trace_from=%d",  trace_from))  trace_from  = 32'hFFFFFFFF;
+    if (!$value$plusargs("trace_to=%d",    trace_to))    trace_to    = 32'hFFFFFFFF;
+    if ($test$plusargs("trace")) begin
+        $dumpfile("dumpfile.fst");
+        $dumpvars(0, tb_top);
+        if (!$test$plusargs("trace_all")) begin
+            windowed = 1'b1;
+            $dumpoff;
+        end
+    end
+end
+
+always @(posedge clk) begin
+    cycle <= cycle + 1;
+    if (windowed && cycle == trace_from) $dumpon;
+    if (windowed && cycle == trace_to)   $dumpoff;
 end
 
 // ---------------------------------------------------------------------------
-// Serial stream memory (one bit per address)
+// Serial stream memory
 // ---------------------------------------------------------------------------
-reg pixel_stream  [0:783];    // 784 pixels
-reg weight_stream [0:2319];   // 2320 weight bits (w1+w2+w3)
+reg [0:783] pixel_stream;     // 784 pixels, bit i = stream bit i
+reg weight_stream [0:2319];   // 2320 weight bits (w1+w2+w3), one per address
 
 // ---------------------------------------------------------------------------
-// Test configuration
+// Test images: one packed word per image, read once with $readmemh
+//   MNIST_data_gen/images.mem  784-bit pixel stream (196 hex digits)
+//   MNIST_data_gen/labels.mem  expected label
+//   test_config.mem            number of images, then one MNIST index each
 // ---------------------------------------------------------------------------
+localparam MAX_IMAGES = 10000;
+
 reg [31:0] num_tests;
-reg [31:0] test_indices [0:160];   // 1 count + 80 tests x 2 (index, label) = 161 entries
-reg [7:0]  expected_labels [0:79];
+reg [0:783] image_mem  [0:MAX_IMAGES-1];
+reg [7:0]   label_mem  [0:MAX_IMAGES-1];
+reg [31:0]  test_config [0:MAX_IMAGES];   // count, then MNIST index per image
 
 // ---------------------------------------------------------------------------
 // Helpers
@@ -65,11 +100,66 @@ integer passed_tests, failed_tests;
 reg [31:0] current_index;
 reg [7:0]  current_label;
 reg [3:0]  hw_result;
-string pixel_filename;
+reg [31:0] done_cycles;    // clocks from the edge entering LOAD until the FSM is back in IDLE
+reg        timed_out;
+integer    results_fd;
+string     results_file;
+
+localparam DONE_TIMEOUT = 10000;
 
 // Pass/fail tracking (store MNIST dataset index for each outcome)
-reg [31:0] passed_mnist_idx [0:79];
-reg [31:0] failed_mnist_idx [0:79];
+reg [31:0] passed_mnist_idx [0:MAX_IMAGES-1];
+reg [31:0] failed_mnist_idx [0:MAX_IMAGES-1];
+
+// ---------------------------------------------------------------------------
+// Run one image from reset: stream pixel_stream / weight_stream, wait for
+// inference and latch the answer into hw_result
+// ---------------------------------------------------------------------------
+task run_image;
+begin
+    // Initialise signals
+    ui_in  = 8'b0;
+    uio_in = 8'b0;
+    rst_n  = 1'b0;
+
+    // Reset: hold low for 10 cycles
+    repeat(10) @(posedge clk);
+    #1 rst_n = 1'b1;
+    repeat(2)  @(posedge clk);  // let reset_pipe settle
+
+    // Assert mode=1 → FSM transitions to s_LOAD on next posedge
+    $display("[%0t] Entering LOAD state...", $time);
+    #1 ui_in = 8'b00000001;   // mode=1, no data yet
+    @(posedge clk);
+
+    // Stream 2320 cycles: pixels and weights
+    for (i = 0; i < 2320; i = i + 1) begin
+        #1 ui_in = {5'b0,
+                    weight_stream[i],
+                    (i < 784) ? pixel_stream[i] : 1'b0,
+                    1'b1};    // bit2=weight, bit1=pixel, bit0=mode
+        @(posedge clk);
+    end
+
+    $display("[%0t] LOAD complete. Running inference...", $time);
+    #1 ui_in = 8'b0;   // drop mode
+
+    // Wait for inference to finish: FSM back in s_IDLE (~1770 cycles)
+    done_cycles = 1 + 2320;
+    #1;
+    while (dut.state !== 3'd0 && done_cycles < DONE_TIMEOUT) begin
+        @(posedge clk);
+        done_cycles = done_cycles + 1;
+        #1;
+    end
+    timed_out = (dut.state !== 3'd0);
+    if (timed_out)
+        $display("[%0t] ERROR: FSM not back in IDLE after %0d cycles", $time, done_cycles);
+
+    // Read result
+    hw_result = uo_out[3:0];
+end
+endtask
 
 // ---------------------------------------------------------------------------
 // Main test
@@ -82,20 +172,26 @@ initial begin
     $display("TEST START");
     $display("");
     
-    // Load test configuration
-    $readmemh("test_config.mem", test_indices);
-    num_tests = test_indices[0];
-    
-    // Parse test configuration: extract indices and labels
-    for (test_num = 0; test_num < num_tests; test_num = test_num + 1) begin
-        expected_labels[test_num] = test_indices[test_num*2 + 2][7:0];
+    // Load test configuration and the image / label bundle
+    $readmemh("test_config.mem", test_config);
+    num_tests = test_config[0];
+    if (num_tests > MAX_IMAGES) begin
+        $display("ERROR: test_config.mem lists %0d images, MAX_IMAGES is %0d", num_tests, MAX_IMAGES);
+        $finish;
     end
+    $readmemh("MNIST_data_gen/images.mem", image_mem, 0, num_tests - 1);
+    $readmemh("MNIST_data_gen/labels.mem", label_mem, 0, num_tests - 1);
     
     // Load weights (same for all tests)
     $readmemb("weights.mem", weight_stream);
     
     passed_tests = 0;
     failed_tests = 0;
+
+    // Per-image results, one CSV row each
+    if (!$value$plusargs("results=%s", results_file)) results_file = "tb_results.csv";
+    results_fd = $fopen(results_file, "w");
+    $fdisplay(results_fd, "test,index,label,prediction,cycles,timeout");
     
     $display("Number of test images: %0d", num_tests);
     $display("");
@@ -104,16 +200,14 @@ initial begin
     // Loop through all test images
     // -----------------------------------------------------------------------
     for (test_num = 0; test_num < num_tests; test_num = test_num + 1) begin
-        current_label = expected_labels[test_num];
+        current_index = test_config[test_num + 1];
+        current_label = label_mem[test_num];
+        pixel_stream  = image_mem[test_num];
         
         $display("========================================================================");
-        $display("TEST IMAGE %0d: Expected label = %0d", test_num, current_label);
+        $display("TEST IMAGE %0d (MNIST index %0d): Expected label = %0d", test_num, current_index, current_label);
         $display("========================================================================");
         
-        // Load pixel data for this test image
-        $sformat(pixel_filename, "MNIST_data_gen/pixels_%0d.mem", test_num);
-        $readmemb(pixel_filename, pixel_stream);
-        
         // Print input image
         $display("Input image (# = white pixel, . = black pixel):");
         $display("+----------------------------+");
@@ -130,54 +224,34 @@ initial begin
         $display("+----------------------------+");
         $display("");
 
-        // Initialise signals
-        ui_in  = 8'b0;
-        uio_in = 8'b0;
-        rst_n  = 1'b0;
-
-        // Reset: hold low for 10 cycles
-        repeat(10) @(posedge clk);
-        #1 rst_n = 1'b1;
-        repeat(2)  @(posedge clk);  // let reset_pipe settle
-
-        // Assert mode=1 → FSM transitions to s_LOAD on next posedge
-        $display("[%0t] Entering LOAD state...", $time);
-        #1 ui_in = 8'b00000001;   // mode=1, no data yet
-        @(posedge clk);
-
-        // Stream 2320 cycles: pixels and weights
-        for (i = 0; i < 2320; i = i + 1) begin
-            #1 ui_in = {5'b0,
-                        weight_stream[i],
-                        (i < 784) ? pixel_stream[i] : 1'b0,
-                        1'b1};    // bit2=weight, bit1=pixel, bit0=mode
-            @(posedge clk);
-        end
-
-        $display("[%0t] LOAD complete. Running inference...", $time);
-        #1 ui_in = 8'b0;   // drop mode
-
-        // Wait for inference layers (~1770 cycles total)
-        repeat(2000) @(posedge clk);
-
-        // Read and check result
-        hw_result = uo_out[3:0];
+        if (windowed && test_num == trace_image) $dumpon;
+        run_image;
+        if (windowed && test_num == trace_image) $dumpoff;
         $display("");
         $display("---------------------------------------------------------------------");
         $display("  Hardware classification: %0d", hw_result);
         $display("  Expected label:          %0d", current_label);
+        $display("  Cycles to done:          %0d", done_cycles);
+        $fdisplay(results_fd, "%0d,%0d,%0d,%0d,%0d,%0d",
+                  test_num, current_index, current_label, hw_result, done_cycles, timed_out);
         
-        if (hw_result == current_label) begin
+        if (hw_result == current_label && !timed_out) begin
             $display("  Result: PASS");
             $display("LOG: %0t : INFO : tb_top : dut.uo_out[3:0] : expected_value: %0d actual_value: %0d", $time, current_label, hw_result);
-            passed_mnist_idx[passed_tests] = test_indices[test_num*2 + 1];
+            passed_mnist_idx[passed_tests] = current_index;
             passed_tests = passed_tests + 1;
         end else begin
             $display("  Result: FAIL");
             $display("LOG: %0t : ERROR : tb_top : dut.uo_out[3:0] : expected_value: %0d actual_value: %0d", $time, current_label, hw_result);
-            failed_mnist_idx[failed_tests] = test_indices[test_num*2 + 1];
+            failed_mnist_idx[failed_tests] = current_index;
             failed_tests = failed_tests + 1;
         end
+        if ((hw_result != current_label || timed_out) && trace_on_fail && windowed) begin
+            $display("  Re-running image %0d with tracing on (dumpfile.fst)", test_num);
+            $dumpon;
+            run_image;
+            $dumpoff;
+        end
         $display("---------------------------------------------------------------------");
         $display("");
         
@@ -212,7 +286,9 @@ initial begin
     end
     $display("");
 
+    $display("Results file: %0s (python3 summarize_results.py %0s)", results_file, results_file);
     $display("========================================================================");
+    $fclose(results_fd);
 
     if (failed_tests == 0) begin
         $display("TEST PASSED");
@@ -224,9 +300,10 @@ initial begin
     $finish;
 end
 
-// ---- Timeout watchdog (increased for multiple tests) ---------------
+// ---- Timeout watchdog (scales with the number of test images) ------
 initial begin
-    #80000000;   // Increased timeout for multiple images
+    #1;
+    #(64'd100000 * (num_tests + 1));   // 10000 cycles per image
     $display("ERROR: simulation timeout!");
     $finish;
 end
@@ -0,0 +1,291 @@
+// Batch driver for the Verilated tt_um_mnist_bnn top.
+//
+// Reads an image bundle written by top_bundle.py, streams every image through
+// the pins exactly as the cocotb tests do (no reset between images), and
+// writes one results record per image: answer, label and the per-state cycle
+// counts read back from perf_counters on uio_out.
+//
+// Usage: obj_dir/Vtt_um_mnist_bnn bundle.bin results.bin [plusargs]
+//   +image=N                  run only bundle image N
+//
+// Tracing is compiled in only with `make TRACE=1`, and even then nothing is
+// written unless a trace plusarg selects a window:
+//   +trace_all                dump the whole run
+//   +trace_image=N            dump only while image N runs
+//   +trace_from=A +trace_to=B dump clock cycles [A, B)
+//   +trace_file=NAME          output file (default top.fst)
+
+#include "Vtt_um_mnist_bnn.h"
+#include "verilated.h"
+#if VM_TRACE
+#include "verilated_fst_c.h"
+#endif
+
+#include <chrono>
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <memory>
+#include <string>
+#include <vector>
+
+// Top-level parameters, passed in by the Makefile to match the -G overrides
+#ifndef PIPE_STAGES
+#define PIPE_STAGES 0
+#endif
+#ifndef CHUNK_BITS
+#define CHUNK_BITS 196
+#endif
+#ifndef EARLY_EXIT
+#define EARLY_EXIT 0
+#endif
+
+static const uint32_t VERSION        = 2;
+static const uint32_t TIMEOUT_CYCLES = 100000;
+
+// perf_counters readout: ui_in[3] enables uio_out, ui_in[7:4] = {counter, byte}
+static const uint8_t PERF_ENABLE = 0x08;
+enum { PERF_STATE, PERF_LOAD, PERF_LAYER_1, PERF_LAYER_2, PERF_LAYER_3, PERF_IMAGES };
+
+#pragma pack(push, 1)
+struct BundleHeader {
+    char     magic[4];
+    uint32_t version, num_images, weight_bits, pixel_bits;
+};
+struct ResultsHeader {
+    char     magic[4];
+    uint32_t version, num_images, first_image;  // bundle index of record 0
+    uint16_t pipe_stages, chunk_bits, early_exit, reserved;
+};
+struct ResultRecord {
+    uint8_t  answer, label;
+    uint16_t status;  // 0 = ok, 1 = timeout
+    uint16_t load, layer_1, layer_2, layer_3;
+};
+#pragma pack(pop)
+
+struct Sim {
+    VerilatedContext*  ctx;
+    Vtt_um_mnist_bnn*  top;
+#if VM_TRACE
+    VerilatedFstC*     tfp = nullptr;
+#endif
+    bool     trace_all   = false;
+    uint32_t trace_image = UINT32_MAX;
+    uint64_t trace_from  = UINT64_MAX;
+    uint64_t trace_to    = UINT64_MAX;
+    uint32_t image  = 0;  // bundle index of the image being run
+    uint64_t cycles = 0;
+
+    explicit Sim(VerilatedContext* c) : ctx(c), top(new Vtt_um_mnist_bnn{c}) {
+        top->ena = 1;
+        top->uio_in = 0;
+        top->ui_in = 0;
+        top->clk = 0;
+        top->rst_n = 1;
+    }
+
+    void open_trace(const std::string& path) {
+#if VM_TRACE
+        Verilated::traceEverOn(true);
+        tfp = new VerilatedFstC;
+        top->trace(tfp, 99);
+        tfp->open(path.c_str());
+#else
+        fprintf(stderr, "Tracing not compiled in (rebuild with make TRACE=1); %s not written\n",
+                path.c_str());
+#endif
+    }
+
+    bool trace_active() const {
+        return trace_all || image == trace_image || (cycles >= trace_from && cycles < trace_to);
+    }
+
+    ~Sim() {
+        top->final();
+#if VM_TRACE
+        if (tfp) {
+            tfp->close();
+            delete tfp;
+        }
+#endif
+        delete top;
+    }
+
+    void dump() {
+#if VM_TRACE
+        if (tfp && trace_active()) tfp->dump(ctx->time());
+#endif
+        ctx->timeInc(1);
+    }
+
+    // One clock: inputs change while clk is low, sampled on the rising edge
+    void tick(uint8_t ui) {
+        top->ui_in = ui;
+        top->clk = 0;
+        top->eval();
+        dump();
+        top->clk = 1;
+        top->eval();
+        dump();
+        cycles++;
+    }
+
+    void reset() {
+        top->rst_n = 0;
+        for (int i = 0; i < 10; i++) tick(0);
+        top->rst_n = 1;
+        for (int i = 0; i < 3; i++) tick(0);  // reset_pipe synchroniser
+    }
+
+    // uio_out is combinational from the counters, so no clock is needed
+    uint16_t perf(int counter) {
+        uint16_t value = 0;
+        for (int byte = 0; byte < 2; byte++) {
+            top->ui_in = PERF_ENABLE | (((counter << 1) | byte) << 4);
+            top->eval();
+            value |= static_cast<uint16_t>(top->uio_out) << (8 * byte);
+        }
+        top->ui_in = 0;
+        top->eval();
+        return value;
+    }
+};
+
+// True if +name was given; *value gets the text after the name
+static bool plusarg(VerilatedContext* ctx, const std::string& name, std::string* value = nullptr) {
+    const std::string match = ctx->commandArgsPlusMatch(name.c_str());
+    if (match.empty()) return false;
+    if (value) *value = match.substr(name.size() + 1);
+    return true;
+}
+
+static inline int get_bit(const uint8_t* packed, uint32_t i) {
+    return (packed[i >> 3] >> (7 - (i & 7))) & 1;
+}
+
+int main(int argc, char** argv) {
+    std::unique_ptr<VerilatedContext> ctx{new VerilatedContext};
+    ctx->commandArgs(argc, argv);
+
+    std::vector<std::string> args;
+    for (int i = 1; i < argc; i++) {
+        if (argv[i][0] != '+') args.push_back(argv[i]);
+    }
+    const std::string bundle_path  = args.size() > 0 ? args[0] : "bundle.bin";
+    const std::string results_path = args.size() > 1 ? args[1] : "results.bin";
+
+    FILE* in = fopen(bundle_path.c_str(), "rb");
+    if (!in) {
+        fprintf(stderr, "Cannot open %s (run `make bundle` first)\n", bundle_path.c_str());
+        return 1;
+    }
+    BundleHeader bh;
+    if (fread(&bh, sizeof(bh), 1, in) != 1 || memcmp(bh.magic, "BNNB", 4) != 0 || bh.version != VERSION) {
+        fprintf(stderr, "%s: not a version %u image bundle\n", bundle_path.c_str(), VERSION);
+        return 1;
+    }
+    const uint32_t w_bytes = (bh.weight_bits + 7) / 8;
+    const uint32_t p_bytes = (bh.pixel_bits + 7) / 8;
+    std::vector<uint8_t> weights(w_bytes);
+    std::vector<uint8_t> images(static_cast<size_t>(bh.num_images) * (p_bytes + 1));
+    if (fread(weights.data(), 1, w_bytes, in) != w_bytes ||
+        fread(images.data(), 1, images.size(), in) != images.size()) {
+        fprintf(stderr, "%s: truncated bundle\n", bundle_path.c_str());
+        return 1;
+    }
+    fclose(in);
+
+    uint32_t first = 0, last = bh.num_images;
+    std::string value;
+    if (plusarg(ctx.get(), "image=", &value)) {
+        first = static_cast<uint32_t>(strtoul(value.c_str(), nullptr, 10));
+        if (first >= bh.num_images) {
+            fprintf(stderr, "+image=%u out of range (%u images)\n", first, bh.num_images);
+            return 1;
+        }
+        last = first + 1;
+    }
+
+    Sim sim(ctx.get());
+    bool tracing = false;
+    if (plusarg(ctx.get(), "trace_all")) {
+        sim.trace_all = tracing = true;
+    }
+    if (plusarg(ctx.get(), "trace_image=", &value)) {
+        sim.trace_image = static_cast<uint32_t>(strtoul(value.c_str(), nullptr, 10));
+        tracing = true;
+    }
+    if (plusarg(ctx.get(), "trace_from=", &value)) {
+        sim.trace_from = strtoull(value.c_str(), nullptr, 10);
+        tracing = true;
+    }
+    if (plusarg(ctx.get(), "trace_to=", &value)) {
+        sim.trace_to = strtoull(value.c_str(), nullptr, 10);
+    }
+    if (tracing) {
+        sim.open_trace(plusarg(ctx.get(), "trace_file=", &value) ? value : "top.fst");
+    }
+
+    std::vector<ResultRecord> results(last - first);
+    sim.reset();
+
+    const auto t0 = std::chrono::steady_clock::now();
+    uint32_t correct = 0, timeouts = 0;
+
+    for (uint32_t n = first; n < last; n++) {
+        const uint8_t* pixels = &images[static_cast<size_t>(n) * (p_bytes + 1)];
+        ResultRecord& r = results[n - first];
+        sim.image = n;
+        r.label = pixels[p_bytes];
+
+        // Mode pulse: IDLE -> LOAD, then one pixel / weight bit per clock.
+        // ui_in[3] stays high with select 0 so uio_out shows the FSM state.
+        sim.tick(PERF_ENABLE | 0x01);
+        for (uint32_t i = 0; i < bh.weight_bits; i++) {
+            const int p = i < bh.pixel_bits ? get_bit(pixels, i) : 0;
+            const int w = get_bit(weights.data(), i);
+            sim.tick(PERF_ENABLE | (w << 2) | (p << 1));
+        }
+        uint32_t waited = 0;
+        do {
+            sim.tick(PERF_ENABLE);
+        } while (sim.top->uio_out != 0 && ++waited < TIMEOUT_CYCLES);
+
+        r.status  = waited >= TIMEOUT_CYCLES ? 1 : 0;
+        r.answer  = sim.top->uo_out & 0xF;
+        r.load    = sim.perf(PERF_LOAD);
+        r.layer_1 = sim.perf(PERF_LAYER_1);
+        r.layer_2 = sim.perf(PERF_LAYER_2);
+        r.layer_3 = sim.perf(PERF_LAYER_3);
+        if (r.status) {
+            timeouts++;
+            sim.reset();
+        }
+        if (r.answer == r.label) correct++;
+    }
+
+    const double secs = std::chrono::duration<double>(std::chrono::steady_clock::now() - t0).count();
+
+    FILE* out = fopen(results_path.c_str(), "wb");
+    if (!out) {
+        fprintf(stderr, "Cannot write %s\n", results_path.c_str());
+        return 1;
+    }
+    ResultsHeader rh = {{'B', 'N', 'N', 'R'}, VERSION, static_cast<uint32_t>(results.size()), first,
+                        PIPE_STAGES, CHUNK_BITS, EARLY_EXIT, 0};
+    fwrite(&rh, sizeof(rh), 1, out);
+    fwrite(results.data(), sizeof(ResultRecord), results.size(), out);
+    fclose(out);
+
+    const uint32_t ran = last - first;
+    printf("Images    : %u (%u timed out)\n", ran, timeouts);
+    printf("Accuracy  : %.2f %%\n", ran ? 100.0 * correct / ran : 0.0);
+    printf("Cycles    : %llu in %.2f s (%.0f cycles/s, %.1f images/s)\n",
+           static_cast<unsigned long long>(sim.cycles), secs,
+           secs > 0 ? sim.cycles / secs : 0.0, secs > 0 ? ran / secs : 0.0);
+    printf("Results   : %s\n", results_path.c_str());
+
+    return timeouts ? 1 : 0;
+}
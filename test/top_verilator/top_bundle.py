@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+top_bundle.py
+Packs verifying-set images into the binary bundle read by sim_batch.cpp, and
+checks the results file it writes against the bit-exact hardware model
+(src/Python311_training/bnn_hw_model.py).
+
+Usage:
+    python3 top_bundle.py pack  [bundle.bin] [num_images]
+    python3 top_bundle.py check [bundle.bin] [results.bin] [failures.txt]
+
+check writes the bundle indices of failing images, one per line, to
+failures.txt (default: not written) for `make retrace`. A results file from
+a +image=N run is checked against bundle image N.
+
+Bundle (little-endian):
+    char[4] 'BNNB', u32 version, u32 num_images, u32 weight_bits, u32 pixel_bits
+    weight stream, packed MSB-first (ceil(weight_bits / 8) bytes)
+    per image: pixel stream packed MSB-first (ceil(pixel_bits / 8) bytes), u8 label
+
+Results (little-endian):
+    char[4] 'BNNR', u32 version, u32 num_images, u32 first_image (bundle index
+    of record 0), u16 pipe_stages, u16 chunk_bits, u16 early_exit, u16 reserved
+    per image: u8 answer, u8 label, u16 status (0 = ok, 1 = timeout),
+               u16 load, u16 layer_1, u16 layer_2, u16 layer_3 cycles (perf_counters)
+"""
+
+import os
+import struct
+import sys
+
+import numpy as np
+
+HERE      = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(HERE, '../../src/Python311_training')
+sys.path.insert(0, MODEL_DIR)
+
+import bnn_hw_model as hw  # noqa: E402
+import bnn_streams as streams  # noqa: E402
+
+BUNDLE_MAGIC   = b'BNNB'
+RESULTS_MAGIC  = b'BNNR'
+VERSION        = 2
+PIXEL_BITS     = 784
+
+BUNDLE_HEADER  = struct.Struct('<4sIIII')
+RESULTS_HEADER = struct.Struct('<4sIIIHHHH')
+RESULT_RECORD  = np.dtype([('answer', 'u1'), ('label', 'u1'), ('status', '<u2'),
+                           ('load', '<u2'), ('layer_1', '<u2'),
+                           ('layer_2', '<u2'), ('layer_3', '<u2')])
+
+
+def write_bundle(path, images, labels, weights):
+    w_bits = streams.weight_stream(weights)
+    with open(path, 'wb') as f:
+        f.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, VERSION, len(images), len(w_bits), PIXEL_BITS))
+        f.write(streams.pack(w_bits).tobytes())
+        records = np.concatenate([streams.pack(streams.pixel_streams(images)),
+                                  labels.reshape(-1, 1).astype(np.uint8)], axis=1)
+        f.write(records.tobytes())
+
+
+def read_bundle(path):
+    """Return (images (N, 28, 28), labels (N,), weight stream bits)."""
+    with open(path, 'rb') as f:
+        magic, version, n, w_len, p_len = BUNDLE_HEADER.unpack(f.read(BUNDLE_HEADER.size))
+        if magic != BUNDLE_MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} image bundle")
+        w_bits = streams.unpack(np.frombuffer(f.read(-(-w_len // 8)), dtype=np.uint8), w_len)
+        p_bytes = -(-p_len // 8)
+        records = np.frombuffer(f.read(n * (p_bytes + 1)), dtype=np.uint8).reshape(n, p_bytes + 1)
+    images = streams.unpack(records[:, :p_bytes], p_len).reshape(n, 28, 28)
+    return images, records[:, p_bytes].copy(), w_bits
+
+
+def read_results(path):
+    """Return (params dict, structured record array)."""
+    with open(path, 'rb') as f:
+        magic, version, n, first, pipe, chunk, early, _ = RESULTS_HEADER.unpack(f.read(RESULTS_HEADER.size))
+        if magic != RESULTS_MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} results file")
+        records = np.frombuffer(f.read(n * RESULT_RECORD.itemsize), dtype=RESULT_RECORD)
+    params = {'first_image': first, 'pipe_stages': pipe, 'chunk_bits': chunk, 'early_exit': bool(early)}
+    return params, records
+
+
+def pack(bundle_path='bundle.bin', num_images=None):
+    images  = hw.load_images()[:num_images]
+    labels  = hw.load_labels()[:len(images)]
+    weights = hw.load_weights()
+    write_bundle(bundle_path, images, labels, weights)
+    print(f"Wrote {len(images)} images to {bundle_path}")
+
+
+def check(bundle_path='bundle.bin', results_path='results.bin', failures_path=None):
+    images, labels, w_bits = read_bundle(bundle_path)
+    params, res = read_results(results_path)
+    first, n = params['first_image'], len(res)
+    if first + n > len(images):
+        raise ValueError(f"{results_path}: images {first}..{first + n - 1} are not all in {bundle_path}")
+    images, labels = images[first:first + n], labels[first:first + n]
+
+    weights = hw.load_weights()
+    if not np.array_equal(w_bits, streams.weight_stream(weights)):
+        print("WARNING: bundle weights differ from weights/*.csv; model uses the CSVs")
+
+    l2_out = hw.layer_two(hw.layer_one(images, weights[0]), weights[1])
+    expected = hw.state_cycles(l2_out, weights[2], params['pipe_stages'],
+                               params['chunk_bits'], params['early_exit'])
+    _, preds = hw.dense_layer3_cycles(l2_out, weights[2], params['chunk_bits'], params['early_exit'])
+
+    errors = 0
+    timeouts = np.flatnonzero(res['status'] != 0)
+    mismatch = np.flatnonzero(res['answer'] != preds)
+    cyc_diff = np.flatnonzero(np.any([res[k] != expected[k] for k in
+                                      ('load', 'layer_1', 'layer_2', 'layer_3')], axis=0))
+    for name, idx in (('timed out', timeouts), ('answer differs from model', mismatch),
+                      ('cycle counts differ from model', cyc_diff)):
+        if len(idx):
+            errors += len(idx)
+            print(f"FAIL: {len(idx)} images {name}, first: {(idx[:10] + first).tolist()}")
+
+    if failures_path:
+        failed = np.union1d(np.union1d(timeouts, mismatch), cyc_diff)
+        with open(failures_path, 'w') as f:
+            f.writelines(f"{i + first}\n" for i in failed)
+
+    total = sum(res[k].astype(np.int64) for k in ('load', 'layer_1', 'layer_2', 'layer_3'))
+    print(f"Images          : {n}")
+    print(f"Parameters      : {params}")
+    print(f"Accuracy        : {100.0 * np.mean(res['answer'] == labels):.2f} %")
+    print(f"Cycles / image  : mean {total.mean():.1f}, min {total.min()}, max {total.max()}")
+    print("PASS" if errors == 0 else f"FAILED: {errors} errors")
+    return errors == 0
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('pack', 'check'):
+        print(__doc__)
+        sys.exit(2)
+    if sys.argv[1] == 'pack':
+        bundle = sys.argv[2] if len(sys.argv) > 2 else 'bundle.bin'
+        num    = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        pack(bundle, num)
+    else:
+        bundle   = sys.argv[2] if len(sys.argv) > 2 else 'bundle.bin'
+        results  = sys.argv[3] if len(sys.argv) > 3 else 'results.bin'
+        failures = sys.argv[4] if len(sys.argv) > 4 else None
+        sys.exit(0 if check(bundle, results, failures) else 1)
+
+
+if __name__ == '__main__':
+    main()